@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark HistoricalAggregator on a synthetic Parquet history
+
+Writes N days of tenant tables with ParquetExporter, then measures a full
+aggregation with one reader thread and with the default thread pool, a
+projected aggregation of a few metric columns, adding day N+1 to the
+rollup of days 1..N (only the new day is read), and merging the persisted
+daily rollups of the window as weekly/monthly --from-history reports do.
+
+Usage:
+    python benchmarks/bench_aggregation.py --days 7 30 --tenants 2000 --columns 100
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from historical_aggregator import DEFAULT_READ_WORKERS, HistoricalAggregator
+from parquet_exporter import ParquetExporter
+
+INSTANCES = 50
+PROJECTED_COLUMNS = ['cpu_used_percent_max', 'memory_used_percent_max', 'qps_avg']
+
+
+def make_tenants(tenants: int, columns: int, rng: random.Random) -> pd.DataFrame:
+    """One day of a synthetic tenants table (tenants spread over INSTANCES instances)"""
+    metric_columns = PROJECTED_COLUMNS + [f'metric_{n}_avg' for n in range(max(columns - 9, 0))]
+    rows = []
+    for n in range(tenants):
+        row = {
+            'region': 'ap-southeast-1',
+            'instance_id': f'ob{n % INSTANCES:012d}',
+            'instance_name': f'instance-{n % INSTANCES}',
+            'tenant_id': f't{n:08d}',
+            'tenant_name': f'tenant_{n}',
+            'tenant_mode': 'MYSQL',
+        }
+        row.update((column, round(rng.uniform(0, 100), 2)) for column in metric_columns)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def write_history(output_dir: str, days: int, tenants: int, columns: int) -> List[str]:
+    """Write days + 1 daily partitions ending today; returns the files, oldest first"""
+    rng = random.Random(42)
+    exporter = ParquetExporter(output_dir=output_dir)
+    today = datetime.now().replace(hour=2, minute=0, second=0, microsecond=0)
+    return [
+        exporter.export_table('tenants', make_tenants(tenants, columns, rng), 'daily', today - timedelta(days=day))
+        for day in range(days, -1, -1)
+    ]
+
+
+def timed(fn: Callable) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        fn()
+        return round(time.perf_counter() - started, 3)
+
+
+def bench(days: int, tenants: int, columns: int) -> Dict:
+    with tempfile.TemporaryDirectory() as output_dir:
+        files = write_history(output_dir, days, tenants, columns)
+        serial = HistoricalAggregator(output_dir, read_workers=1)
+        parallel = HistoricalAggregator(output_dir)
+        previous = parallel.rollup('tenants', files[:-1])
+        with contextlib.redirect_stdout(io.StringIO()):
+            for filepath in files:
+                parallel.update_daily_rollups({'tenants': filepath})
+        return {
+            'days': days,
+            'tenants': tenants,
+            'serial_s': timed(lambda: serial.aggregate_tenants_data(files)),
+            'parallel_s': timed(lambda: parallel.aggregate_tenants_data(files)),
+            'projected_s': timed(lambda: parallel.aggregate_tenants_data(files, columns=PROJECTED_COLUMNS)),
+            'add_day_s': timed(lambda: parallel.rollup('tenants', files, rollup=previous).result()),
+            'rollups_s': timed(lambda: parallel.window_rollup('tenants', days + 1).result()),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark historical aggregation of the Parquet history')
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30], help='Days aggregated (default: 7 30)')
+    parser.add_argument('--tenants', type=int, default=2000, help='Tenant rows per day (default: 2000)')
+    parser.add_argument('--columns', type=int, default=100, help='Tenant columns (default: 100)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [bench(days, args.tenants, args.columns) for days in args.days]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'Days':>5} {'Tenants':>8} {'1 reader':>9} {f'{DEFAULT_READ_WORKERS} readers':>10} "
+          f"{'3 columns':>10} {'Add day':>8} {'Rollups':>8}")
+    for result in results:
+        print(f"{result['days']:>5} {result['tenants']:>8} {result['serial_s']:>9} {result['parallel_s']:>10} "
+              f"{result['projected_s']:>10} {result['add_day_s']:>8} {result['rollups_s']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
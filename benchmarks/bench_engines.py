@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark the threaded, pipelined and async extraction engines against the local mock API server
+
+Starts benchmarks/mock_server.py in a subprocess, runs the full per-instance extraction
+(instance details, utilization metrics, tenant list, tenant details and metrics) with
+each engine and reports wall time, API calls and peak thread count of this process.
+
+Usage:
+    python benchmarks/bench_engines.py --instances 20 --tenants 10 --latency 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from oceanbase_client import OceanBaseReporter
+from async_oceanbase_client import AsyncOceanBaseReporter
+from extraction_pipeline import ExtractionPipeline
+from request_scheduler import RequestScheduler, DEFAULT_RATE_LIMITS
+from mock_server import server_stats, start_mock_server
+
+START_TIME = '2026-01-01T00:00:00'
+END_TIME = '2026-01-02T00:00:00'
+
+
+class ThreadSampler:
+    """Record the peak number of live threads while running"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Don't count the sampler itself
+            self.peak = max(self.peak, threading.active_count() - 1)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def total_calls(endpoint: str) -> int:
+    """Number of API calls served by the mock server so far"""
+    return server_stats(endpoint)['total_calls']
+
+
+def make_reporter(reporter_class, endpoint: str, args):
+    """Create a reporter pointed at the mock server"""
+    rate_limits = None if args.rate_limits else {api: 0 for api in DEFAULT_RATE_LIMITS}
+    return reporter_class(
+        access_key_id='mock-access-key',
+        access_key_secret='mock-access-secret',
+        region='mock-region-1',
+        scheduler=RequestScheduler(
+            max_concurrency=args.max_concurrency,
+            rate_limits=rate_limits,
+            adaptive_concurrency=not args.no_adaptive
+        ),
+        oceanbase_endpoint=endpoint,
+        cms_endpoint=endpoint,
+        protocol='http',
+        metric_workers=args.metric_workers
+    )
+
+
+def run_threaded(reporter: OceanBaseReporter, args) -> List[Dict]:
+    """Extract every instance with the threaded engine"""
+    def process(instance: Dict) -> Dict:
+        instance_id = instance['instance_id']
+        details = reporter.get_instance_details(instance_id)
+        details.update(reporter.get_utilization_metrics(instance_id, START_TIME, END_TIME))
+        details['tenants'] = reporter.fetch_tenants_parallel(
+            instance_id, details['instance_name'], reporter.list_tenants(instance_id),
+            START_TIME, END_TIME, max_workers=args.parallel_workers
+        )
+        return details
+
+    instances = reporter.list_all_instances()
+    return [future.result() for _, future in reporter.scheduler.imap_unordered(
+        process, instances, args.instance_workers
+    )]
+
+
+def run_pipeline(reporter: OceanBaseReporter, args) -> List[Dict]:
+    """Extract every instance with the staged extraction pipeline (threaded reporter)"""
+    results = []
+
+    def collect(idx: int, instance_id: str, result: Tuple) -> None:
+        instance_data, tenants, _, _ = result
+        instance_data['tenants'] = tenants
+        results.append(instance_data)
+
+    pipeline = ExtractionPipeline(
+        {reporter.region: reporter}, START_TIME, END_TIME, period_desc='', on_result=collect,
+        instance_workers=args.instance_workers, tenant_workers=args.parallel_workers, status_interval=0
+    )
+    pipeline.run((reporter.region, instance['instance_id']) for instance in reporter.iter_instances())
+    return results
+
+
+async def run_async(reporter: AsyncOceanBaseReporter, args) -> List[Dict]:
+    """Extract every instance with the async engine"""
+    instance_slots = asyncio.Semaphore(args.instance_workers)
+
+    async def process(instance: Dict) -> Dict:
+        instance_id = instance['instance_id']
+        async with instance_slots:
+            details, utilization, tenants = await asyncio.gather(
+                reporter.get_instance_details(instance_id),
+                reporter.get_utilization_metrics(instance_id, START_TIME, END_TIME),
+                reporter.list_tenants(instance_id)
+            )
+            details.update(utilization)
+            details['tenants'] = await reporter.fetch_tenants_parallel(
+                instance_id, details['instance_name'], tenants,
+                START_TIME, END_TIME, max_workers=args.parallel_workers
+            )
+            return details
+
+    instances = await reporter.list_all_instances()
+    return await asyncio.gather(*(process(instance) for instance in instances))
+
+
+def normalize(results: List[Dict]) -> List[Dict]:
+    """Order instances and tenants so results of both engines can be compared"""
+    for instance in results:
+        # Only the pipeline labels rows with their region
+        instance.pop('region', None)
+        for tenant in instance['tenants']:
+            tenant.pop('region', None)
+        instance['tenants'] = sorted(instance['tenants'], key=lambda t: t['tenant_id'])
+    return sorted(results, key=lambda i: i['instance_id'])
+
+
+def bench(engine: str, endpoint: str, args) -> Tuple[Dict, List[Dict]]:
+    """Run one engine once and return (measurements, results)"""
+    calls_before = total_calls(endpoint)
+    started = time.perf_counter()
+    # Reporter progress output would drown the benchmark table
+    with ThreadSampler() as sampler, contextlib.redirect_stdout(io.StringIO()):
+        if engine == 'async':
+            reporter = make_reporter(AsyncOceanBaseReporter, endpoint, args)
+            results = asyncio.run(run_async(reporter, args))
+        elif engine == 'pipeline':
+            reporter = make_reporter(OceanBaseReporter, endpoint, args)
+            results = run_pipeline(reporter, args)
+        else:
+            reporter = make_reporter(OceanBaseReporter, endpoint, args)
+            results = run_threaded(reporter, args)
+        reporter.scheduler.shutdown()
+    elapsed = time.perf_counter() - started
+    calls = total_calls(endpoint) - calls_before
+    stats = reporter.scheduler.stats()
+    return {
+        'engine': engine,
+        'seconds': round(elapsed, 2),
+        'api_calls': calls,
+        'calls_per_second': round(calls / elapsed, 1) if elapsed else 0,
+        'throttled': stats.get('throttled_errors', 0),
+        'peak_threads': sampler.peak,
+    }, normalize(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the threaded, pipelined and async extraction engines')
+    parser.add_argument('--instances', type=int, default=20, help='Mock instances (default: 20)')
+    parser.add_argument('--tenants', type=int, default=10, help='Tenants per mock instance (default: 10)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock response latency in seconds (default: 0.05)')
+    parser.add_argument('--quota', type=float, default=0.0, help='Mock API quota in requests per second (default: unlimited)')
+    parser.add_argument('--max-concurrency', type=int, default=64, help='API requests in flight (default: 64)')
+    parser.add_argument('--instance-workers', type=int, default=10, help='Instances processed concurrently (default: 10)')
+    parser.add_argument('--parallel-workers', type=int, default=20, help='Tenants processed concurrently per instance (default: 20)')
+    parser.add_argument('--metric-workers', type=int, default=8, help='Metrics per instance/tenant fetched concurrently (default: 8)')
+    parser.add_argument('--rate-limits', action='store_true', help='Apply the default per-API rate limits (off by default)')
+    parser.add_argument('--no-adaptive', action='store_true', help='Keep concurrency fixed at --max-concurrency when throttled')
+    parser.add_argument('--engines', nargs='+', choices=['threaded', 'pipeline', 'async'],
+                        default=['threaded', 'pipeline', 'async'])
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    process, endpoint = start_mock_server([
+        '--instances', str(args.instances), '--tenants', str(args.tenants),
+        '--latency', str(args.latency), '--quota', str(args.quota)
+    ])
+    try:
+        rows, outputs = [], {}
+        for engine in args.engines:
+            row, outputs[engine] = bench(engine, endpoint, args)
+            rows.append(row)
+    finally:
+        process.terminate()
+        process.wait()
+
+    if len(outputs) > 1:
+        first, *others = outputs.values()
+        identical = all(other == first for other in others)
+    else:
+        identical = None
+
+    if args.json:
+        print(json.dumps({'results': rows, 'identical_output': identical}, indent=2))
+        return 0
+
+    print(f"Mock fleet: {args.instances} instances x {args.tenants} tenants, "
+          f"latency {args.latency * 1000:.0f} ms, quota {args.quota or 'unlimited'} req/s, "
+          f"max concurrency {args.max_concurrency}")
+    print(f"{'Engine':<10} {'Seconds':>8} {'API calls':>10} {'Calls/s':>9} {'Throttled':>10} {'Peak threads':>13}")
+    for row in rows:
+        print(f"{row['engine']:<10} {row['seconds']:>8} {row['api_calls']:>10} "
+              f"{row['calls_per_second']:>9} {row['throttled']:>10} {row['peak_threads']:>13}")
+    if identical is not None:
+        print(f"Identical output: {'yes' if identical else 'NO'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Excel report writer on synthetic instance and tenant tables
+
+Compares ExcelExporter's streaming (write-only) workbook with the previous
+approach: pandas ExcelWriter on a normal openpyxl workbook, with the header
+styled afterwards by reading whole columns back. Reports wall time and peak
+Python memory (tracemalloc) per tenant row count.
+
+Usage:
+    python benchmarks/bench_excel_export.py --rows 1000 5000 20000 --columns 100
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from excel_exporter import (
+    ExcelExporter, HEADER_ALIGNMENT, HEADER_BORDER, HEADER_FILL, HEADER_FONT, WIDTH_SAMPLE_ROWS
+)
+
+INSTANCES = 50
+
+
+def make_tables(rows: int, columns: int) -> Dict[str, pd.DataFrame]:
+    """Synthetic capacity and tenant tables (tenant rows spread over INSTANCES instances)"""
+    rng = random.Random(42)
+    metric_columns = [f'metric_{n}_max' for n in range(max(columns - 6, 0))]
+    tenants = []
+    for n in range(rows):
+        tenant = {
+            'region': 'ap-southeast-1',
+            'instance_id': f'ob{n % INSTANCES:012d}',
+            'instance_name': f'instance-{n % INSTANCES}',
+            'tenant_id': f't{n:08d}',
+            'tenant_name': f'tenant_{n}',
+            'tenant_mode': rng.choice(['MYSQL', 'ORACLE']),
+        }
+        tenant.update((column, round(rng.uniform(0, 100), 2)) for column in metric_columns)
+        tenants.append(tenant)
+    instances = [
+        {
+            'region': 'ap-southeast-1',
+            'instance_id': f'ob{n:012d}',
+            'instance_name': f'instance-{n}',
+            'status': 'ONLINE',
+            'total_cpu': 64,
+            'total_memory': 256,
+            'total_storage': 2048,
+            'used_storage': round(rng.uniform(0, 2048), 2),
+            'cpu_avg': round(rng.uniform(0, 100), 2),
+            'memory_avg': round(rng.uniform(0, 100), 2),
+        }
+        for n in range(INSTANCES)
+    ]
+    return {'capacity': pd.DataFrame(instances), 'tenants': pd.DataFrame(tenants)}
+
+
+def export_streaming(exporter: ExcelExporter, tables: Dict[str, pd.DataFrame]) -> None:
+    exporter.export_consolidated_data(tables['capacity'], tables['tenants'], 'Weekly', custom_filename='streaming')
+
+
+def export_pandas(exporter: ExcelExporter, tables: Dict[str, pd.DataFrame]) -> None:
+    """The previous writer: to_excel on a normal workbook, then style the header cell by cell"""
+    filepath = exporter.create_dated_directory('Weekly') / 'pandas.xlsx'
+    sheets = [
+        ('Capacity Assessment', exporter._reorder_capacity_columns(tables['capacity'])),
+        ('Tenants Report', exporter._reorder_tenants_columns(tables['tenants'])),
+        ('Summary Statistics', exporter._generate_summary_statistics(tables['capacity'])),
+    ]
+    with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        for sheet_name, df in sheets:
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            worksheet = writer.sheets[sheet_name]
+            for col_num in range(1, len(df.columns) + 1):
+                cell = worksheet.cell(row=1, column=col_num)
+                cell.fill, cell.font = HEADER_FILL, HEADER_FONT
+                cell.alignment, cell.border = HEADER_ALIGNMENT, HEADER_BORDER
+            for col_num in range(1, len(df.columns) + 1):
+                column_letter = get_column_letter(col_num)
+                column_cells = worksheet[column_letter]
+                max_length = max((len(str(cell.value)) for cell in column_cells[:WIDTH_SAMPLE_ROWS] if cell.value),
+                                 default=0)
+                worksheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
+            worksheet.freeze_panes = 'A2'
+
+
+def measure(fn: Callable, exporter: ExcelExporter, tables: Dict[str, pd.DataFrame]) -> Dict:
+    """Wall time of one export, then peak traced memory of a second one"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        fn(exporter, tables)
+        seconds = time.perf_counter() - started
+
+        tracemalloc.start()
+        fn(exporter, tables)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {'seconds': round(seconds, 2), 'peak_mb': round(peak / 2 ** 20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the streaming Excel writer with pandas ExcelWriter')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 5000, 20000],
+                        help='Tenant rows per run (default: 1000 5000 20000)')
+    parser.add_argument('--columns', type=int, default=100, help='Tenant columns (default: 100)')
+    parser.add_argument('--writers', nargs='+', choices=['streaming', 'pandas'], default=['streaming', 'pandas'])
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    writers = {'streaming': export_streaming, 'pandas': export_pandas}
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        exporter = ExcelExporter(output_dir=output_dir)
+        for rows in args.rows:
+            tables = make_tables(rows, args.columns)
+            for writer in args.writers:
+                result = {'writer': writer, 'rows': rows, 'columns': len(tables['tenants'].columns)}
+                result.update(measure(writers[writer], exporter, tables))
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'Writer':<10} {'Rows':>7} {'Columns':>8} {'Seconds':>8} {'Peak MB':>8}")
+    for result in results:
+        print(f"{result['writer']:<10} {result['rows']:>7} {result['columns']:>8} "
+              f"{result['seconds']:>8} {result['peak_mb']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
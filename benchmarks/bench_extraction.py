@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of main.py against the local mock API server
+
+For every fleet size, starts benchmarks/mock_server.py with that many instances,
+runs main.py against it (--oceanbase-endpoint/--cms-endpoint) with mock
+credentials in a temporary HOME, and reports wall time, API calls (with
+throttled and failed requests), peak RSS of the main.py process and throughput.
+Options after '--' are passed to main.py, so worker settings can be tuned
+without touching the production APIs. Unix only (peak RSS comes from wait4).
+
+Usage:
+    python benchmarks/bench_extraction.py --instances 10 100 1000 --tenants 5 --latency 0.02
+    python benchmarks/bench_extraction.py --instances 100 --error-rate 0.01 -- --instance-workers 15 --parallel-workers 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from mock_server import LATENCY_DISTRIBUTIONS, server_stats, start_mock_server
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Every run fetches everything and leaves no history behind
+DEFAULT_MAIN_ARGS = ['--no-metric-cache', '--no-datapoint-cache', '--no-topology-cache', '--no-history']
+
+MOCK_CREDENTIALS = {
+    'current': 'default',
+    'profiles': [{
+        'name': 'default',
+        'access_key_id': 'mock-access-key',
+        'access_key_secret': 'mock-access-secret',
+        'region_id': 'mock-region-1',
+    }],
+}
+
+
+def run_main(endpoint: str, main_args: List[str], home: str, output_dir: str) -> Dict:
+    """Run main.py once against the mock server; returns exit code, wall time and peak RSS"""
+    command = [
+        sys.executable, str(ROOT / 'main.py'),
+        '--oceanbase-endpoint', endpoint, '--cms-endpoint', endpoint, '--endpoint-protocol', 'http',
+        '--output-dir', output_dir,
+    ] + main_args
+    log_path = Path(output_dir) / 'main.log'
+    with open(log_path, 'w') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=str(ROOT), env=dict(os.environ, HOME=home),
+                                   stdout=log, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - started
+    exit_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    if exit_code != 0:
+        print(f"✗ main.py exited with {exit_code}; last lines of its output:", file=sys.stderr)
+        print(''.join(log_path.read_text().splitlines(keepends=True)[-10:]), file=sys.stderr)
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    peak_rss = rusage.ru_maxrss / 1024 if sys.platform != 'darwin' else rusage.ru_maxrss / 2 ** 20
+    return {'exit_code': exit_code, 'seconds': seconds, 'peak_rss_mb': round(peak_rss, 1)}
+
+
+def bench(instances: int, args, main_args: List[str], home: str) -> Dict:
+    """Benchmark main.py on a fleet of the given size"""
+    process, endpoint = start_mock_server([
+        '--instances', str(instances), '--tenants', str(args.tenants),
+        '--latency', str(args.latency), '--latency-distribution', args.latency_distribution,
+        '--quota', str(args.quota), '--error-rate', str(args.error_rate), '--throttle-rate', str(args.throttle_rate),
+    ])
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = run_main(endpoint, main_args, home, output_dir)
+        calls = server_stats(endpoint)['calls']
+    finally:
+        process.terminate()
+        process.wait()
+
+    seconds = result['seconds']
+    api_calls = sum(calls.values())
+    return {
+        'instances': instances,
+        'tenants': instances * args.tenants,
+        'exit_code': result['exit_code'],
+        'seconds': round(seconds, 2),
+        'api_calls': api_calls,
+        'throttled': calls.get('Throttled', 0),
+        'server_errors': calls.get('ServerError', 0),
+        'peak_rss_mb': result['peak_rss_mb'],
+        'instances_per_second': round(instances / seconds, 2) if seconds else 0,
+        'calls_per_second': round(api_calls / seconds, 1) if seconds else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark main.py end to end against the mock API server',
+        epilog="Options after '--' are passed to main.py (default: " + ' '.join(DEFAULT_MAIN_ARGS) + ')'
+    )
+    parser.add_argument('--instances', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Fleet sizes to benchmark (default: 10 100 1000)')
+    parser.add_argument('--tenants', type=int, default=5, help='Tenants per instance (default: 5)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mean mock response latency in seconds (default: 0.02)')
+    parser.add_argument('--latency-distribution', choices=LATENCY_DISTRIBUTIONS, default='lognormal',
+                        help='Distribution of the mock latency (default: lognormal)')
+    parser.add_argument('--quota', type=float, default=0.0, help='Mock API quota in requests per second (default: unlimited)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503 (default: 0)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with Throttling.User (default: 0)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    argv = sys.argv[1:]
+    main_args = DEFAULT_MAIN_ARGS
+    if '--' in argv:
+        main_args = DEFAULT_MAIN_ARGS + argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as home:
+        credentials = Path(home) / '.aliyun' / 'config.json'
+        credentials.parent.mkdir()
+        credentials.write_text(json.dumps(MOCK_CREDENTIALS))
+        results = [bench(instances, args, main_args, home) for instances in args.instances]
+
+    if args.json:
+        print(json.dumps({'main_args': main_args, 'results': results}, indent=2))
+        return 0 if all(result['exit_code'] == 0 for result in results) else 1
+
+    print(f"Mock fleet: {args.tenants} tenants per instance, latency {args.latency * 1000:.0f} ms "
+          f"({args.latency_distribution}), quota {args.quota or 'unlimited'} req/s, "
+          f"errors {args.error_rate:.1%}, throttling {args.throttle_rate:.1%}")
+    print(f"main.py {' '.join(main_args)}")
+    print(f"{'Instances':>9} {'Tenants':>8} {'Seconds':>8} {'API calls':>10} {'Throttled':>10} {'5xx':>6} "
+          f"{'Peak RSS MB':>12} {'Inst/s':>7} {'Calls/s':>8} {'Exit':>5}")
+    for result in results:
+        print(f"{result['instances']:>9} {result['tenants']:>8} {result['seconds']:>8} {result['api_calls']:>10} "
+              f"{result['throttled']:>10} {result['server_errors']:>6} {result['peak_rss_mb']:>12} "
+              f"{result['instances_per_second']:>7} {result['calls_per_second']:>8} {result['exit_code']:>5}")
+    return 0 if all(result['exit_code'] == 0 for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark of main.py: wall time and import cost of short runs
+
+Runs main.py --help and main.py --list-only (threaded and async engine) against
+the local mock API server and reports the median wall time of --repeat runs.
+One extra run per scenario under `python -X importtime` gives the total import
+time and the slowest top-level imports, and checks that the run did not load
+modules its stage doesn't need (pandas, openpyxl, pyarrow, the CloudMonitor
+SDK); the exit code is 1 if one was loaded. Inventory checks that run every
+few minutes spend most of their time starting up, so track this with the
+other benchmarks.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --instances 100 --top 15 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from bench_extraction import MOCK_CREDENTIALS
+from mock_server import start_mock_server
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules of the reporting and metric stages
+REPORT_MODULES = ['pandas', 'numpy', 'openpyxl', 'pyarrow', 'alibabacloud_cms20190101']
+
+# Scenario name: (main.py arguments, modules the run must not import)
+SCENARIOS = {
+    'help': (['--help'], REPORT_MODULES + ['alibabacloud_oceanbasepro20190901']),
+    'list-only': (['--list-only'], REPORT_MODULES),
+    'list-only-async': (['--list-only', '--engine', 'async'], REPORT_MODULES),
+}
+
+
+def run_main(main_args: List[str], home: str, import_time: bool = False) -> Tuple[float, int, str]:
+    """Run main.py once; returns wall time, exit code and stderr"""
+    command = [sys.executable] + (['-X', 'importtime'] if import_time else []) + [str(ROOT / 'main.py')] + main_args
+    started = time.perf_counter()
+    process = subprocess.run(
+        command, cwd=str(ROOT), env=dict(os.environ, HOME=home),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    return time.perf_counter() - started, process.returncode, process.stderr
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]], set]:
+    """
+    Parse `python -X importtime` output
+
+    Returns:
+        Tuple of (total import seconds, [(top-level module, cumulative seconds)], names of imported modules)
+    """
+    total_us = 0
+    top_level = []
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        total_us += int(self_us)
+        modules.add(name.strip())
+        # Nested imports are indented by two spaces per level
+        if not name[1:].startswith(' '):
+            top_level.append((name.strip(), int(cumulative_us) / 1e6))
+    return total_us / 1e6, sorted(top_level, key=lambda item: -item[1]), modules
+
+
+def bench(name: str, args, endpoint: str, home: str, output_dir: str) -> Dict:
+    """Benchmark one scenario"""
+    main_args, forbidden = SCENARIOS[name]
+    main_args = main_args + [
+        '--oceanbase-endpoint', endpoint, '--cms-endpoint', endpoint, '--endpoint-protocol', 'http',
+        '--output-dir', output_dir,
+    ]
+    runs = [run_main(main_args, home) for _ in range(args.repeat)]
+    _, exit_code, stderr = run_main(main_args, home, import_time=True)
+    import_seconds, top_level, modules = parse_importtime(stderr)
+    loaded = [module for module in forbidden if module in modules]
+    return {
+        'scenario': name,
+        'exit_code': max([exit_code] + [code for _, code, _ in runs], key=abs),
+        'median_seconds': round(statistics.median(seconds for seconds, _, _ in runs), 3),
+        'min_seconds': round(min(seconds for seconds, _, _ in runs), 3),
+        'import_seconds': round(import_seconds, 3),
+        'modules': len(modules),
+        'slowest_imports': [[module, round(seconds, 4)] for module, seconds in top_level[:args.top]],
+        'unexpected_imports': loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark main.py startup and import cost')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario (default: 5)')
+    parser.add_argument('--instances', type=int, default=10, help='Instances of the mock fleet (default: 10)')
+    parser.add_argument('--top', type=int, default=8, help='Slowest top-level imports to show (default: 8)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    process, endpoint = start_mock_server(['--instances', str(args.instances), '--latency', '0'])
+    try:
+        with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as output_dir:
+            credentials = Path(home) / '.aliyun' / 'config.json'
+            credentials.parent.mkdir()
+            credentials.write_text(json.dumps(MOCK_CREDENTIALS))
+            results = [bench(name, args, endpoint, home, output_dir) for name in args.scenarios]
+    finally:
+        process.terminate()
+        process.wait()
+
+    failed = any(result['exit_code'] != 0 or result['unexpected_imports'] for result in results)
+    if args.json:
+        print(json.dumps({'python': sys.version.split()[0], 'results': results}, indent=2))
+        return 1 if failed else 0
+
+    print(f"main.py startup, median of {args.repeat} runs (mock fleet of {args.instances} instances)")
+    print(f"{'Scenario':<16} {'Median s':>9} {'Min s':>7} {'Imports s':>10} {'Modules':>8} {'Exit':>5}")
+    for result in results:
+        print(f"{result['scenario']:<16} {result['median_seconds']:>9} {result['min_seconds']:>7} "
+              f"{result['import_seconds']:>10} {result['modules']:>8} {result['exit_code']:>5}")
+    for result in results:
+        print()
+        print(f"{result['scenario']}: slowest top-level imports")
+        for module, seconds in result['slowest_imports']:
+            print(f"  {seconds * 1000:>8.1f} ms  {module}")
+        if result['unexpected_imports']:
+            print(f"  ✗ Loaded modules it does not need: {', '.join(result['unexpected_imports'])}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
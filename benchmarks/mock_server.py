@@ -0,0 +1,388 @@
+"""
+Local stand-in for the OceanBase and CloudMonitor (CMS) OpenAPI endpoints
+Serves a deterministic synthetic fleet so extraction engines can be benchmarked
+without an Alibaba Cloud account. Request signatures are not checked. Point
+main.py at it with --oceanbase-endpoint/--cms-endpoint HOST:PORT --endpoint-protocol http.
+
+Usage:
+    python benchmarks/mock_server.py --port 18080 --instances 20 --tenants 10 --latency 0.05 --quota 200
+    python benchmarks/mock_server.py --latency 0.05 --latency-distribution lognormal --error-rate 0.01 --throttle-rate 0.02
+"""
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Metrics the real CloudMonitor rejects with HTTP 400 for OceanBase
+UNAVAILABLE_METRICS = {
+    'data_size', 'disk_usage', 'disk_used', 'disk_total', 'network_in', 'network_out',
+    'connection_count', 'max_connections', 'cache_hit_rate', 'io_read_times', 'io_write_times',
+    'io_util', 'sql_count', 'sql_rt', 'sql_select', 'sql_insert', 'sql_update', 'sql_delete',
+    'io_count', 'io_rt', 'io_size', 'io_read_size', 'io_write_size',
+}
+
+# Metrics that are accepted but return no datapoints
+EMPTY_METRICS = {'cache_hit', 'cache_size', 'ob_waiteven_count', 'ob_sql_event', 'uptime'}
+
+# Response latency distributions, all with mean --latency seconds
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+# Sigma of the lognormal distribution: p99 is about 3x the median, a long API tail
+LOGNORMAL_SIGMA = 0.8
+
+
+class MockFleet:
+    """Deterministic synthetic fleet of instances and tenants"""
+
+    def __init__(self, instance_count: int = 10, tenants_per_instance: int = 5, seed: int = 7):
+        """
+        Build the fleet
+
+        Args:
+            instance_count: Number of instances
+            tenants_per_instance: Number of tenants per instance
+            seed: Random seed for instance/tenant attributes
+        """
+        rng = random.Random(seed)
+        self.instances = []
+        self.tenants = {}
+        for i in range(instance_count):
+            instance_id = f'ob{i:012d}'
+            self.instances.append({
+                'InstanceId': instance_id,
+                'InstanceName': f'mock-instance-{i}',
+                'State': 'ONLINE',
+                'Status': 'ONLINE',
+                'Series': rng.choice(['normal', 'normal_ssd', 'history']),
+                'Version': rng.choice(['4.2.1', '4.2.5', '3.2.4']),
+                'Cpu': 32,
+                'Mem': 128,
+                'DiskSize': '1000',
+                'UsedDiskSize': str(rng.randint(100, 900)),
+                'DiskType': 'cloud_essd_pl1',
+                'CreateTime': '2025-01-01T00:00:00Z',
+                'AvailableZones': ['zone-a'],
+                'VpcId': 'vpc-mock',
+            })
+            self.tenants[instance_id] = [
+                {
+                    'TenantId': f't{i:04d}x{j:04d}',
+                    'TenantName': f'tenant_{i}_{j}',
+                    'TenantMode': rng.choice(['MySQL', 'Oracle']),
+                    'CreateTime': '2025-01-02T00:00:00Z',
+                }
+                for j in range(tenants_per_instance)
+            ]
+
+        self._by_id = {inst['InstanceId']: inst for inst in self.instances}
+
+    def instance(self, instance_id: str) -> Optional[Dict]:
+        return self._by_id.get(instance_id)
+
+
+def _series_value(key: str, ts: int) -> float:
+    """Stable pseudo-random value for a (series, timestamp) pair"""
+    return round(random.Random(f'{key}:{ts}').uniform(1.0, 95.0), 2)
+
+
+class MockAliyunHandler(BaseHTTPRequestHandler):
+    """Dispatch OpenAPI RPC actions to the synthetic fleet"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self) -> Dict[str, str]:
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = self.rfile.read(length).decode('utf-8')
+            params.update({k: v[0] for k, v in parse_qs(body).items()})
+        return params
+
+    def _send(self, status: int, payload: Dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/__stats':
+            self._send(200, self.server.stats())
+            return
+        self.do_POST()
+
+    def do_POST(self):
+        params = self._params()
+        action = self.headers.get('x-acs-action') or params.get('Action', '')
+        fault = self.server.fault()
+        if fault == 'throttled':
+            self.server.count('Throttled')
+            self._send(400, {'Code': 'Throttling.User', 'Message': 'Request was denied due to user flow control.'})
+            return
+        delay = self.server.delay()
+        if delay:
+            time.sleep(delay)
+        if fault == 'error':
+            self.server.count('ServerError')
+            self._send(503, {'Code': 'ServiceUnavailable', 'Message': 'The request has failed due to a temporary failure of the server.'})
+            return
+        self.server.count(action)
+        handler = getattr(self, f'_action_{action}', None)
+        if handler is None:
+            self._send(404, {'Code': 'InvalidAction.NotFound', 'Message': action})
+            return
+        status, payload = handler(params)
+        payload.setdefault('RequestId', f'mock-{time.time_ns()}')
+        self._send(status, payload)
+
+    def _page(self, items: List, params: Dict[str, str]):
+        page_size = int(params.get('PageSize') or 10)
+        page_number = int(params.get('PageNumber') or 1)
+        start = (page_number - 1) * page_size
+        return items[start:start + page_size]
+
+    def _action_DescribeInstances(self, params):
+        fleet = self.server.fleet
+        return 200, {
+            'Instances': self._page(fleet.instances, params),
+            'TotalCount': len(fleet.instances),
+        }
+
+    def _action_DescribeInstance(self, params):
+        inst = self.server.fleet.instance(params.get('InstanceId'))
+        if not inst:
+            return 404, {'Code': 'UnknownInstanceId', 'Message': 'instance not found'}
+        tenant_count = len(self.server.fleet.tenants[inst['InstanceId']])
+        return 200, {'Instance': dict(inst, Resource={
+            'Cpu': {'TotalCpu': 64, 'UsedCpu': 4 * tenant_count, 'UnitCpu': 32, 'OriginalTotalCpu': 64},
+            'Memory': {'TotalMemory': 256, 'UsedMemory': 8 * tenant_count, 'UnitMemory': 128, 'OriginalTotalMemory': 256},
+            'DiskSize': {'TotalDiskSize': 2000, 'UsedDiskSize': 40 * tenant_count, 'DataUsedSize': 20 * tenant_count,
+                         'MaxDiskUsedPercent': 30.0, 'UnitDiskSize': 1000, 'OriginalTotalDiskSize': 2000},
+            'LogDiskSize': {'TotalDiskSize': 800, 'LogAssignedSize': 10 * tenant_count,
+                            'MaxLogAssignedPercent': 10.0, 'UnitDiskSize': 400, 'OriginalTotalDiskSize': 800},
+        })}
+
+    def _action_DescribeTenants(self, params):
+        tenants = self.server.fleet.tenants.get(params.get('InstanceId'), [])
+        return 200, {'Tenants': self._page(tenants, params), 'TotalCount': len(tenants)}
+
+    def _action_DescribeTenant(self, params):
+        for tenant in self.server.fleet.tenants.get(params.get('InstanceId'), []):
+            if tenant['TenantId'] == params.get('TenantId'):
+                return 200, {'Tenant': dict(
+                    tenant,
+                    TenantConnections=[{'MaxConnectionNum': 5000}],
+                    TenantResource={
+                        'Cpu': {'TotalCpu': 4, 'UnitCpu': 4},
+                        'Memory': {'TotalMemory': 8, 'UnitMemory': 8},
+                        'DiskSize': {'UsedDiskSize': 12.5},
+                        'LogDiskSize': {'TotalLogDisk': 24, 'UnitLogDisk': 24},
+                        'UnitNum': 1,
+                    },
+                )}
+        return 404, {'Code': 'UnknownTenantId', 'Message': 'tenant not found'}
+
+    def _action_DescribeMetricList(self, params):
+        dimensions = json.loads(params.get('Dimensions') or '[]')
+        metric = params.get('MetricName', '')
+        if metric in UNAVAILABLE_METRICS:
+            return 400, {'Code': 'InvalidParameter', 'Message': f'metric {metric} not supported'}
+        period = int(params.get('Period') or 60)
+        start = int(params.get('StartTime')) // 1000 // period * period
+        end = int(params.get('EndTime')) // 1000
+        length = int(params.get('Length') or 1000)
+        offset = int(params.get('NextToken') or 0)
+
+        series = []
+        for dim in dimensions:
+            cluster = dim.get('obClusterId') or dim.get('instanceId')
+            if 'obTenantId' in dim:
+                series.append({'obClusterId': cluster, 'obTenantId': dim['obTenantId']})
+            elif 'obClusterId' in dim:
+                series.extend({'obClusterId': cluster, 'obTenantId': t['TenantId']}
+                              for t in self.server.fleet.tenants.get(cluster, []))
+            else:
+                series.append({'instanceId': cluster})
+
+        timestamps = range(start, end, period) if metric not in EMPTY_METRICS else range(0)
+        points = []
+        for ts in timestamps:
+            for labels in series:
+                key = f"{metric}:{labels.get('obTenantId') or labels.get('obClusterId') or labels.get('instanceId')}"
+                points.append(dict(labels, timestamp=ts * 1000, Average=_series_value(key, ts)))
+
+        page = points[offset:offset + length]
+        payload = {'Code': '200', 'Success': True, 'Period': str(period), 'Datapoints': json.dumps(page)}
+        if offset + length < len(points):
+            payload['NextToken'] = str(offset + length)
+        return 200, payload
+
+
+class MockAliyunServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fleet and per-action call counters"""
+
+    daemon_threads = True
+    request_queue_size = 1024  # Async clients open many connections at once
+
+    def __init__(
+        self,
+        address,
+        fleet: MockFleet,
+        latency: float = 0.0,
+        quota: float = 0.0,
+        latency_distribution: str = 'fixed',
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 7
+    ):
+        """
+        Initialize mock server
+
+        Args:
+            address: (host, port) to listen on (port 0 picks a free port)
+            fleet: Synthetic fleet to serve
+            latency: Mean seconds added to every API response
+            quota: Requests per second accepted before answering Throttling.User (0 = unlimited)
+            latency_distribution: Distribution of the added latency (see LATENCY_DISTRIBUTIONS)
+            error_rate: Fraction of requests answered with HTTP 503 ServiceUnavailable
+            throttle_rate: Fraction of requests answered with Throttling.User regardless of the quota
+            seed: Random seed for latencies and injected faults
+        """
+        super().__init__(address, MockAliyunHandler)
+        self.fleet = fleet
+        self.latency = latency
+        self.quota = quota
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._calls = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, action: str):
+        with self._lock:
+            self._calls[action] += 1
+
+    def delay(self) -> float:
+        """Latency of one response, drawn from the configured distribution"""
+        if not self.latency:
+            return 0.0
+        with self._lock:
+            if self.latency_distribution == 'uniform':
+                return self._rng.uniform(0, 2 * self.latency)
+            if self.latency_distribution == 'exponential':
+                return self._rng.expovariate(1 / self.latency)
+            if self.latency_distribution == 'lognormal':
+                # Median chosen so that the mean is self.latency
+                return self._rng.lognormvariate(math.log(self.latency) - LOGNORMAL_SIGMA ** 2 / 2, LOGNORMAL_SIGMA)
+        return self.latency
+
+    def fault(self) -> Optional[str]:
+        """Fault injected into one request: 'throttled', 'error' or None"""
+        if self.over_quota():
+            return 'throttled'
+        if not (self.error_rate or self.throttle_rate):
+            return None
+        with self._lock:
+            draw = self._rng.random()
+        if draw < self.throttle_rate:
+            return 'throttled'
+        if draw < self.throttle_rate + self.error_rate:
+            return 'error'
+        return None
+
+    def over_quota(self) -> bool:
+        """Count a request against the one-second quota window"""
+        if not self.quota:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            return self._window_count > self.quota
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'calls': dict(self._calls), 'total_calls': sum(self._calls.values())}
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f'{host}:{port}'
+
+
+def start_mock_server(options: List[str]) -> Tuple[subprocess.Popen, str]:
+    """
+    Start the mock server in a subprocess on a free port
+
+    Args:
+        options: Command-line options of this script, e.g. ['--instances', '20', '--latency', '0.05']
+
+    Returns:
+        (process, 'host:port')
+    """
+    process = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), '--port', '0'] + options,
+        stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline().strip()
+    if not line.startswith('Listening on '):
+        process.kill()
+        raise RuntimeError(f"Mock server failed to start: {line!r}")
+    return process, line[len('Listening on '):]
+
+
+def server_stats(endpoint: str) -> Dict:
+    """Per-action call counters of a running mock server"""
+    with urllib.request.urlopen(f'http://{endpoint}/__stats') as response:
+        return json.load(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock OceanBase/CloudMonitor API server')
+    parser.add_argument('--port', type=int, default=18080, help='Port to listen on (0 = any free port)')
+    parser.add_argument('--instances', type=int, default=10, help='Number of instances (default: 10)')
+    parser.add_argument('--tenants', type=int, default=5, help='Tenants per instance (default: 5)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean seconds added to every response (default: 0)')
+    parser.add_argument('--latency-distribution', choices=LATENCY_DISTRIBUTIONS, default='fixed',
+                        help='Distribution of the added latency (default: fixed)')
+    parser.add_argument('--quota', type=float, default=0.0, help='Requests per second before throttling (default: unlimited)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 503 (default: 0)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with Throttling.User (default: 0)')
+    args = parser.parse_args()
+
+    server = MockAliyunServer(
+        ('127.0.0.1', args.port), MockFleet(args.instances, args.tenants),
+        latency=args.latency, quota=args.quota, latency_distribution=args.latency_distribution,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate
+    )
+    print(f"Listening on {server.endpoint}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
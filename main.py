@@ -5,20 +5,45 @@ Extracts OceanBase instance and tenant information from Alibaba Cloud
 and exports to CSV for capacity assessment.
 """
 import argparse
+import asyncio
+import copy
 import json
+import multiprocessing
+import multiprocessing.connection
+import signal
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
+# Only standard-library modules are imported here: the Alibaba Cloud SDKs, pandas,
+# openpyxl and pyarrow are imported by the stage that needs them, so listing,
+# merging and history runs start without loading what they don't use
 from auth import AliyunAuth
-from oceanbase_client import OceanBaseReporter
-from csv_exporter import CSVExporter
-from excel_exporter import ExcelExporter
+from request_scheduler import RequestScheduler
+from run_profiler import RunProfiler
+from metric_availability import MetricAvailabilityRegistry, DEFAULT_REGISTRY_FILE, DEFAULT_TTL_DAYS
+from datapoint_store import DatapointStore, DEFAULT_STORE_FILE, DEFAULT_RETENTION_DAYS
+from topology_cache import TopologyCache, DEFAULT_TOPOLOGY_FILE, DEFAULT_TTL_HOURS
+from reporter_pool import ReporterPool, OCEANBASE_REGIONS
+from run_checkpoint import RunCheckpoint, new_run_id
+from collector import (
+    ExtractionSession, ReportSchedule, parse_report_time, DAEMON_DIR, DEFAULT_POLL_MINUTES, DEFAULT_REPORT_TIME,
+    POLL_WINDOW, REPORT_FREQUENCIES, REQUEST_CHECK_SECONDS, REQUEST_SUFFIX
+)
+from sharding import (
+    ShardResultWriter, parse_shard_index, read_shard_results, shard_of, shard_results_path
+)
 from datetime import datetime, timedelta
 
+if TYPE_CHECKING:
+    from excel_exporter import ExcelExporter
+
 
 def load_config(config_path: str = 'config/config.json') -> dict:
     """Load configuration from JSON file"""
@@ -30,8 +55,819 @@ def load_config(config_path: str = 'config/config.json') -> dict:
         return {}
 
 
-def main():
-    """Main execution function"""
+def report_period(frequency: str, end_time: datetime, lookback_days: int = None) -> tuple:
+    """
+    Metric window of a report
+
+    Args:
+        frequency: 'daily', 'weekly' or 'monthly'
+        end_time: End of the window
+        lookback_days: Custom window length in days (overrides the frequency)
+
+    Returns:
+        Tuple of (start_time, period description)
+    """
+    if lookback_days:
+        return end_time - timedelta(days=lookback_days), f"Last {lookback_days} days (HIGHEST utilization including P95)"
+    if frequency == 'daily':
+        return end_time - timedelta(days=1), "Last 24 hours"
+    if frequency == 'weekly':
+        return end_time - timedelta(days=7), "Last 7 days (HIGHEST utilization)"
+    return end_time - timedelta(days=30), "Last 30 days (HIGHEST utilization)"
+
+
+def generate_reports(
+    args,
+    period_desc: str,
+    comprehensive_data: list,
+    tenants_data: list,
+    excel_exporter: 'ExcelExporter' = None
+) -> int:
+    """
+    Write the consolidated Excel report of a run
+
+    Args:
+        args: Parsed command-line arguments (output_dir, frequency)
+        period_desc: Description of the report period
+        comprehensive_data: Instance rows
+        tenants_data: Tenant rows
+        excel_exporter: Excel exporter (default: one writing to args.output_dir)
+
+    Returns:
+        Process exit code
+    """
+    # Export comprehensive reports
+    print("=" * 70)
+    print("Generating Reports")
+    print("=" * 70)
+    print(f"Report Type: {args.frequency.upper()}")
+    print()
+
+    # Add frequency suffix to filenames
+    freq_suffix = f"_{args.frequency}" if args.frequency != 'daily' else ""
+
+    # Generate consolidated Excel report with multiple tabs
+    print()
+    print("Generating consolidated Excel report...")
+    if comprehensive_data and tenants_data:
+        # NOTE: connection_utilization_pct calculation removed per user request (2026-01-02)
+        # Previously calculated: (sessions_avg / max_connections) * 100
+        # Column has been removed from the Tenants Report tab
+
+        # One DataFrame per table, shared by every tab and the optional CSV files
+        import pandas as pd
+        from excel_exporter import ExcelExporter
+        from parquet_exporter import ParquetExporter
+        from historical_aggregator import HistoricalAggregator
+        from csv_exporter import CSVExporter
+        df_capacity = pd.DataFrame(comprehensive_data)
+        df_tenants = pd.DataFrame(tenants_data)
+
+        # Determine frequency label for Excel
+        frequency_label = args.frequency.capitalize()
+
+        excel_exporter = excel_exporter or ExcelExporter(output_dir=args.output_dir)
+        excel_exporter.export_consolidated_data(
+            capacity_data=df_capacity,
+            tenants_data=df_tenants,
+            report_frequency=frequency_label
+        )
+
+        # Columnar history read by HistoricalAggregator; daily runs also update the
+        # day's partials that weekly/monthly --from-history reports merge
+        if not args.no_history:
+            history_paths = ParquetExporter(output_dir=args.output_dir).export_report(
+                df_capacity, df_tenants, args.frequency
+            )
+            if args.frequency == 'daily':
+                HistoricalAggregator(output_dir=args.output_dir).update_daily_rollups(history_paths)
+
+        if args.csv:
+            csv_exporter = CSVExporter(output_dir=args.output_dir)
+            csv_exporter.export_comprehensive_report(df_capacity, f'oceanbase_capacity_assessment{freq_suffix}')
+            csv_exporter.export_comprehensive_report(df_tenants, f'oceanbase_tenants{freq_suffix}')
+    else:
+        print("⚠ Skipping Excel report - no instance or tenant data")
+
+    print()
+    print("=" * 70)
+    print(f"✓ Report generation completed successfully")
+    print(f"  Report Type: {args.frequency.upper()}")
+    print(f"  Time Period: {period_desc}")
+    print(f"  Total instances processed: {len(comprehensive_data)}")
+    print(f"  Total tenants found: {len(tenants_data)}")
+    if comprehensive_data and tenants_data:
+        print(f"  Excel report: {args.output_dir}/{datetime.now().strftime('%Y%m%d')}/{frequency_label.capitalize()}/")
+    print("=" * 70)
+
+    return 0
+
+
+def _without_option(argv: list, option: str) -> list:
+    """Command line without an option and its value"""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(option + '='):
+            result.append(arg)
+    return result
+
+
+def report_profile(args, profiler: RunProfiler, run_id: str) -> None:
+    """Print the --profile summary and write it to OUTPUT_DIR/profile/ (one file per shard)"""
+    name = run_id + (f"-shard-{args.shard_index[0]}-of-{args.shard_index[1]}" if args.shard_index else '')
+    print()
+    profiler.print_report()
+    json_path, prom_path = profiler.export(args.output_dir, name)
+    print(f"✓ Profile saved to: {json_path} and {prom_path}")
+
+
+def run_shard_process(argv: list, result_conn) -> None:
+    """Entry point of a --shards worker process"""
+    code = main(argv, result_conn=result_conn)
+    result_conn.close()
+    sys.exit(code)
+
+
+def run_shards(args, argv: list, period_desc: str, checkpoint: RunCheckpoint) -> int:
+    """
+    Run --shards N: one worker process per shard, merging the results they stream back
+
+    Args:
+        args: Parsed command-line arguments
+        argv: Command line of this run (passed on to the workers with --shard-index i/N)
+        period_desc: Description of the report period
+        checkpoint: Checkpoint of the run; the workers skip its completed instances
+
+    Returns:
+        Process exit code
+    """
+    print(f"Running {args.shards} shard processes...")
+    print()
+    context = multiprocessing.get_context('spawn')
+    worker_argv = _without_option(_without_option(argv, '--shards'), '--resume') + ['--resume', checkpoint.run_id]
+    processes = []
+    receivers = {}
+    for shard_index in range(args.shards):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=run_shard_process,
+            args=(worker_argv + ['--shard-index', f'{shard_index}/{args.shards}'], sender),
+            name=f'shard-{shard_index}'
+        )
+        process.start()
+        sender.close()
+        processes.append(process)
+        receivers[receiver] = shard_index
+
+    comprehensive_data = []
+    tenants_data = []
+    for instance_data, instance_tenants in checkpoint.results:
+        comprehensive_data.append(instance_data)
+        tenants_data.extend(instance_tenants)
+    instances_by_shard = [0] * args.shards
+    try:
+        while receivers:
+            for receiver in multiprocessing.connection.wait(list(receivers)):
+                try:
+                    instance_data, instance_tenants = receiver.recv()
+                except EOFError:
+                    del receivers[receiver]
+                    continue
+                checkpoint.record(instance_data, instance_tenants)
+                comprehensive_data.append(instance_data)
+                tenants_data.extend(instance_tenants)
+                instances_by_shard[receivers[receiver]] += 1
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        checkpoint.close()
+        print()
+        print(f"✗ Interrupted after {len(comprehensive_data)} instance(s)")
+        print(f"  Resume with --resume {checkpoint.run_id} --shards {args.shards}")
+        return 130
+
+    for process in processes:
+        process.join()
+
+    print()
+    failed_shards = [shard_index for shard_index, process in enumerate(processes) if process.exitcode != 0]
+    for shard_index, count in enumerate(instances_by_shard):
+        status = '✗ failed' if shard_index in failed_shards else '✓'
+        print(f"  Shard {shard_index}/{args.shards}: {status} ({count} instance(s))")
+    if failed_shards:
+        checkpoint.close()
+        print(f"✗ {len(failed_shards)} shard(s) failed; fetch the missing instances with "
+              f"--resume {checkpoint.run_id} --shards {args.shards}")
+        return 1
+    print()
+
+    result = generate_reports(args, period_desc, comprehensive_data, tenants_data)
+    checkpoint.remove()
+    return result
+
+
+def history_report(args, period_desc: str) -> int:
+    """
+    Run --from-history: build a weekly/monthly report from the daily rollups, without API calls
+
+    Args:
+        args: Parsed command-line arguments
+        period_desc: Description of the report period
+
+    Returns:
+        Process exit code
+    """
+    from historical_aggregator import HistoricalAggregator
+    from excel_exporter import ExcelExporter
+    from csv_exporter import CSVExporter
+
+    aggregator = HistoricalAggregator(output_dir=args.output_dir)
+    if args.frequency == 'weekly':
+        df_capacity, df_tenants = aggregator.generate_weekly_report()
+    else:
+        df_capacity, df_tenants = aggregator.generate_monthly_report()
+    if df_capacity is None or df_capacity.empty or df_tenants.empty:
+        print(f"✗ No daily history in {args.output_dir}/ to build the {args.frequency} report from")
+        return 1
+    print()
+
+    frequency_label = args.frequency.capitalize()
+    ExcelExporter(output_dir=args.output_dir).export_consolidated_data(
+        capacity_data=df_capacity,
+        tenants_data=df_tenants,
+        report_frequency=frequency_label
+    )
+    if args.csv:
+        csv_exporter = CSVExporter(output_dir=args.output_dir)
+        csv_exporter.export_comprehensive_report(df_capacity, f'oceanbase_capacity_assessment_{args.frequency}')
+        csv_exporter.export_comprehensive_report(df_tenants, f'oceanbase_tenants_{args.frequency}')
+
+    print()
+    print("=" * 70)
+    print("✓ Report generation completed successfully")
+    print(f"  Report Type: {args.frequency.upper()}")
+    print(f"  Time Period: {period_desc}")
+    print(f"  Total instances: {len(df_capacity)}")
+    print(f"  Total tenants: {len(df_tenants)}")
+    print(f"  Excel report: {args.output_dir}/{datetime.now().strftime('%Y%m%d')}/{frequency_label}/")
+    print("=" * 70)
+    return 0
+
+
+def merge_shard_reports(args, period_desc: str) -> int:
+    """
+    Run --merge-shards N: build the report from the result files of shards run separately
+
+    Args:
+        args: Parsed command-line arguments
+        period_desc: Description of the report period
+
+    Returns:
+        Process exit code
+    """
+    paths = [shard_results_path(args.output_dir, args.frequency, shard_index, args.merge_shards)
+             for shard_index in range(args.merge_shards)]
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        print(f"✗ Missing shard results: {', '.join(missing)}")
+        return 1
+
+    comprehensive_data = []
+    tenants_data = []
+    for instance_data, instance_tenants in read_shard_results(paths):
+        comprehensive_data.append(instance_data)
+        tenants_data.extend(instance_tenants)
+    print(f"✓ Merged {len(comprehensive_data)} instance(s) from {len(paths)} shard(s)")
+    print()
+
+    return generate_reports(args, period_desc, comprehensive_data, tenants_data)
+
+
+def extract(
+    args,
+    session: ExtractionSession,
+    start_time: datetime,
+    end_time: datetime,
+    period_desc: str,
+    checkpoint: RunCheckpoint = None,
+    result_conn=None
+) -> int:
+    """
+    Extract the instances of a run and write its report
+
+    Args:
+        args: Parsed command-line arguments
+        session: Clients, scheduler and caches of the run
+        start_time: Start of the metric window
+        end_time: End of the metric window
+        period_desc: Description of the report period
+        checkpoint: Journal of completed instances (None for --list-only and --probe-metrics)
+        result_conn: Pipe end receiving (instance_data, tenants) per instance (--shards worker processes)
+
+    Returns:
+        Process exit code
+    """
+    config, regions, reporters, scheduler = session.config, session.regions, session.reporters, session.scheduler
+    metric_registry, datapoint_store, topology_cache = (
+        session.metric_registry, session.datapoint_store, session.topology_cache
+    )
+    use_async, excel_exporter, profiler = session.use_async, session.excel_exporter, scheduler.profiler
+
+    def in_shard(instance_id: str) -> bool:
+        return not args.shard_index or shard_of(instance_id, args.shard_index[1]) == args.shard_index[0]
+
+    def pending(region: str, instance_id: str) -> bool:
+        """Instance of this shard not completed by the resumed run yet"""
+        return in_shard(instance_id) and (checkpoint is None or (region, instance_id) not in checkpoint.completed)
+
+    # Determine which instances to process: (region, instance_id) pairs
+    multi_region = len(reporters) > 1
+    if args.instances and not multi_region:
+        instances = [(regions[0], instance_id) for instance_id in args.instances if pending(regions[0], instance_id)]
+        instance_source = iter(instances)
+        print(f"Processing specified instances: {', '.join(args.instances)}")
+    else:
+        if args.instances:
+            print(f"Looking up specified instances in {len(reporters)} regions: {', '.join(args.instances)}")
+        else:
+            print(f"Discovering all OceanBase instances{' in ' + str(len(reporters)) + ' regions' if multi_region else ''}...")
+        wanted = set(args.instances or [])
+        # Instances are processed as their DescribeInstances page arrives; instances fills up as they do
+        instances = []
+
+        def found(region: str, instance: dict) -> bool:
+            if (wanted and instance['instance_id'] not in wanted) or not pending(region, instance['instance_id']):
+                return False
+            instances.append((region, instance['instance_id']))
+            return True
+
+        def found_all() -> None:
+            print(f"✓ Found {len(instances)} instance(s)")
+            if multi_region:
+                for region in regions:
+                    print(f"    {region}: {sum(1 for r, _ in instances if r == region)}")
+
+        if use_async:
+            async def discover_instances():
+                async for region, instance in reporters.iter_instances_async():
+                    if found(region, instance):
+                        yield region, instance['instance_id']
+                found_all()
+        else:
+            def discover_instances():
+                for region, instance in reporters.iter_instances():
+                    if found(region, instance):
+                        yield region, instance['instance_id']
+                found_all()
+        instance_source = discover_instances()
+
+        # Listing and probing need the whole fleet up front
+        if args.list_only or args.probe_metrics:
+            if use_async:
+                async def collect_instances():
+                    return [instance async for instance in instance_source]
+                asyncio.run(collect_instances())
+            else:
+                list(instance_source)
+            if not instances:
+                print("✗ No OceanBase instances found")
+                return 1
+
+    print()
+
+    if args.list_only:
+        print("List-only mode: Exiting without extracting metrics")
+        return 0
+
+    if args.probe_metrics:
+        for region in regions:
+            summary = reporters[region].probe_metric_availability(
+                [instance_id for instance_region, instance_id in instances if instance_region == region],
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat()
+            )
+        metric_registry.save()
+        scheduler.shutdown()
+        print()
+        print(f"✓ Metric availability registry updated: {metric_registry.path}")
+        print(f"  Available: {summary['available']}, unavailable: {summary['unavailable']}")
+        for key, entry in metric_registry.unavailable().items():
+            print(f"    {key}: {entry['reason']}")
+        return 0
+
+    # Process instances in parallel
+    comprehensive_data = []
+    tenants_data = []
+
+    def prepare_instance_data(instance_details: dict) -> dict:
+        """Copy instance details and add derived capacity fields"""
+        instance_data = instance_details.copy()
+
+        # Calculate disk utilization percentage
+        if instance_details.get('total_storage') and instance_details.get('total_storage') > 0:
+            used_disk = instance_data.get('used_storage', 0)
+            total_disk = instance_details.get('total_storage', 0)
+            if total_disk > 0:
+                disk_util_pct = (used_disk / total_disk) * 100
+                instance_data['disk_utilization_pct'] = round(disk_util_pct, 2)
+
+        return instance_data
+
+    async def process_single_instance_async(region: str, instance_id: str, idx: int) -> tuple:
+        """
+        Process a single OceanBase instance and its tenants (async engine)
+
+        Returns:
+            Tuple of (instance_data, tenants_list, instance_name, success)
+        """
+        reporter = reporters[region]
+        try:
+            # Details first: they identify the instance type for the metric availability registry
+            instance_details, tenants = await asyncio.gather(
+                reporter.get_instance_details(instance_id),
+                reporter.list_tenants(instance_id)
+            )
+            if not instance_details:
+                return None, [], instance_id, False
+
+            instance_name = instance_details.get('instance_name', 'N/A')
+            instance_data = {'region': region}
+            instance_data.update(prepare_instance_data(instance_details))
+            for tenant in tenants:
+                tenant['region'] = region
+
+            async def fetch_tenants() -> list:
+                if not tenants:
+                    return []
+                return await reporter.fetch_tenants_parallel(
+                    instance_id=instance_id,
+                    instance_name=instance_name,
+                    tenants=tenants,
+                    start_time=start_time.isoformat(),
+                    end_time=end_time.isoformat(),
+                    max_workers=args.parallel_workers,
+                    batch_metrics=not args.no_batch_metrics
+                )
+
+            # Utilization metrics and tenant metrics don't depend on each other
+            utilization_metrics, tenants_with_metrics = await asyncio.gather(
+                reporter.get_utilization_metrics(
+                    instance_id,
+                    start_time=start_time.isoformat(),
+                    end_time=end_time.isoformat(),
+                    period_desc=period_desc
+                ),
+                fetch_tenants()
+            )
+            if utilization_metrics:
+                instance_data.update(utilization_metrics)
+
+            return instance_data, tenants_with_metrics, instance_name, True
+
+        except Exception as e:
+            print(f"\n⚠️  Error processing instance {instance_id}: {str(e)}")
+            return None, [], instance_id, False
+
+    completed_count = 0
+    shard_writer = None
+    if args.shard_index:
+        shard_writer = ShardResultWriter(
+            shard_results_path(args.output_dir, args.frequency, args.shard_index[0], args.shard_index[1])
+        )
+
+    # Instances completed before the run was interrupted
+    resumed_count = 0
+    if checkpoint is not None:
+        for instance_data, instance_tenants in checkpoint.results:
+            if in_shard(instance_data['instance_id']):
+                resumed_count += 1
+                comprehensive_data.append(instance_data)
+                tenants_data.extend(instance_tenants)
+                if shard_writer is not None:
+                    shard_writer.write(instance_data, instance_tenants)
+
+    def record_instance_result(idx: int, instance_id: str, result: tuple) -> None:
+        """Collect the result of one processed instance and print progress"""
+        nonlocal completed_count
+        instance_data, instance_tenants, instance_name, success = result
+
+        if success and instance_data:
+            comprehensive_data.append(instance_data)
+            tenants_data.extend(instance_tenants)
+            completed_count += 1
+            if checkpoint is not None:
+                checkpoint.record(instance_data, instance_tenants)
+            if shard_writer is not None:
+                shard_writer.write(instance_data, instance_tenants)
+            if result_conn is not None:
+                result_conn.send((instance_data, instance_tenants))
+
+            region_desc = f" [{instance_data['region']}]" if multi_region else ''
+            print(f"[{completed_count}/{len(instances)}] ✓ Completed: {instance_name} ({instance_id}){region_desc} - {len(instance_tenants)} tenant(s)")
+        else:
+            print(f"[{idx}/{len(instances)}] ✗ Failed: {instance_id}")
+
+    async def process_instances_async() -> None:
+        """Process all instances on one event loop, --instance-workers at a time"""
+        instance_slots = asyncio.Semaphore(args.instance_workers)
+
+        async def run(idx: int, region: str, instance_id: str) -> None:
+            async with instance_slots:
+                result = await process_single_instance_async(region, instance_id, idx)
+            record_instance_result(idx, instance_id, result)
+
+        runs = []
+        idx = 0
+        if args.instances and not multi_region:
+            for region, instance_id in instance_source:
+                idx += 1
+                runs.append(asyncio.ensure_future(run(idx, region, instance_id)))
+        else:
+            async for region, instance_id in instance_source:
+                idx += 1
+                runs.append(asyncio.ensure_future(run(idx, region, instance_id)))
+        await asyncio.gather(*runs)
+
+    if args.instances and not multi_region:
+        print(f"Processing {len(instances)} instances with {args.instance_workers} parallel workers...")
+    else:
+        print(f"Processing instances as they are discovered with {args.instance_workers} parallel workers...")
+    print()
+
+    pipeline = None
+    try:
+        if use_async:
+            asyncio.run(process_instances_async())
+        else:
+            # discover → describe instance → list tenants → describe tenant → fetch metrics → aggregate → sink
+            from extraction_pipeline import ExtractionPipeline, DEFAULT_QUEUE_SIZE, DEFAULT_STATUS_INTERVAL
+            pipeline_config = config.get('pipeline', {})
+            pipeline = ExtractionPipeline(
+                reporters.reporters,
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat(),
+                period_desc=period_desc,
+                on_result=record_instance_result,
+                prepare_instance=prepare_instance_data,
+                instance_workers=args.instance_workers,
+                tenant_workers=args.parallel_workers,
+                batch_metrics=not args.no_batch_metrics,
+                queue_size=args.queue_size or pipeline_config.get('queue_size', DEFAULT_QUEUE_SIZE),
+                status_interval=pipeline_config.get('status_interval', DEFAULT_STATUS_INTERVAL)
+            )
+            pipeline.run(instance_source)
+    except KeyboardInterrupt:
+        # Stop accepting requests; instances already in flight may still complete and are journaled
+        scheduler.shutdown(wait=False)
+        print()
+        print(f"✗ Interrupted after {completed_count} instance(s)")
+        if result_conn is None and checkpoint is not None:
+            print(f"  Resume with --resume {checkpoint.run_id}")
+        return 130
+
+    if not instances and not comprehensive_data and not args.shard_index:
+        print("✗ No OceanBase instances found")
+        if checkpoint is not None:
+            checkpoint.remove()
+        return 1
+
+    print()
+    print(f"✓ Parallel processing completed: {completed_count}/{len(instances)} instances successful"
+          + (f" (+{resumed_count} from run {checkpoint.run_id})" if resumed_count else ''))
+    api_stats = scheduler.stats()
+    print(f"  API calls: {api_stats.get('calls', 0)} "
+          f"(retried: {api_stats.get('retries', 0)}, throttled: {api_stats.get('throttled_errors', 0)}, "
+          f"failed after retries: {api_stats.get('exhausted_retries', 0)}, "
+          f"final concurrency: {api_stats['concurrency_limit']}/{scheduler.max_concurrency})")
+    if api_stats.get('exhausted_retries'):
+        print("  ⚠ Some metrics are missing because API calls kept failing after retries")
+    if pipeline is not None:
+        print("  Pipeline stages (workers, items, throughput, max/avg queue depth):")
+        for stage_name, stage_stats in pipeline.stats().items():
+            print(f"    {stage_name:<18} {stage_stats['workers']:>3}  {stage_stats['processed']:>6} items  "
+                  f"{stage_stats['throughput']:>8.1f}/s  queue {stage_stats['max_queue_depth']}/{stage_stats['avg_queue_depth']:.1f}"
+                  + (f"  errors {stage_stats['errors']}" if stage_stats['errors'] else ''))
+    memo_stats = reporters.memo_stats()
+    print(f"  Request memo: {memo_stats['hits']} duplicate request(s) shared, {memo_stats['misses']} sent")
+    if metric_registry is not None:
+        metric_registry.save()
+        availability = metric_registry.summary()
+        print(f"  Metric availability: {availability['skipped']} queries skipped as known unavailable, "
+              f"{availability['unavailable']} metric(s) without data this run")
+    if topology_cache is not None:
+        topology_cache.save()
+        topology = topology_cache.summary()
+        print(f"  Topology cache: {topology['hits']} instance/tenant detail request(s) saved, "
+              f"{topology['misses']} sent ({topology['invalidated']} because the listing changed)")
+    if datapoint_store is not None:
+        cache_stats = datapoint_store.stats()
+        print(f"  Datapoint cache: {cache_stats['points_cached']} datapoints read from cache, "
+              f"{cache_stats['points_fetched']} fetched in {cache_stats['ranges_fetched']} time range(s)")
+    print()
+
+    if shard_writer is not None:
+        shard_writer.close()
+        print(f"✓ Shard {args.shard_index[0]}/{args.shard_index[1]} results: {shard_writer.path} "
+              f"({shard_writer.count} instance(s))")
+        if args.profile:
+            report_profile(args, profiler, checkpoint.run_id)
+        if result_conn is None:
+            checkpoint.remove()
+        return 0
+
+    with profiler.stage('export'):
+        result = generate_reports(args, period_desc, comprehensive_data, tenants_data, excel_exporter)
+    if args.profile:
+        report_profile(args, profiler, checkpoint.run_id)
+    # The report holds every result now (if writing it fails, the checkpoint stays for --resume)
+    checkpoint.remove()
+    return result
+
+
+def poll(args, session: ExtractionSession, start_time: datetime, end_time: datetime) -> int:
+    """
+    Fill the datapoint store with the datapoints of a --daemon poll
+
+    Lists the instances and their tenants and fetches the time ranges of every
+    enabled metric that the store does not hold yet. Nothing is read back,
+    aggregated or reported: reports recompute their statistics from the store.
+
+    Args:
+        args: Parsed command-line arguments
+        session: Clients, scheduler and caches kept open by the daemon
+        start_time: Start of the poll window
+        end_time: End of the poll window
+
+    Returns:
+        Process exit code
+    """
+    reporters, scheduler = session.reporters, session.scheduler
+    wanted = set(args.instances or [])
+    counts = {'instances': 0, 'datapoints': 0, 'failed': 0}
+
+    def record(datapoints: Optional[int]) -> None:
+        if datapoints is None:
+            counts['failed'] += 1
+        else:
+            counts['instances'] += 1
+            counts['datapoints'] += datapoints
+
+    async def poll_instance_async(region: str, instance_id: str) -> Optional[int]:
+        reporter = reporters[region]
+        try:
+            # Details identify the instance type for the metric availability registry
+            instance_details, tenants = await asyncio.gather(
+                reporter.get_instance_details(instance_id),
+                reporter.list_tenants(instance_id)
+            )
+            if not instance_details:
+                return None
+            return await reporter.collect_datapoints(
+                instance_id, [tenant['tenant_id'] for tenant in tenants],
+                start_time=start_time.isoformat(), end_time=end_time.isoformat(),
+                batch_metrics=not args.no_batch_metrics
+            )
+        except Exception as e:
+            print(f"  ⚠ Error polling instance {instance_id}: {str(e)}")
+            return None
+
+    async def poll_all_async() -> None:
+        instance_slots = asyncio.Semaphore(args.instance_workers)
+
+        async def run(region: str, instance_id: str) -> None:
+            async with instance_slots:
+                record(await poll_instance_async(region, instance_id))
+
+        runs = []
+        async for region, instance in reporters.iter_instances_async():
+            if not wanted or instance['instance_id'] in wanted:
+                runs.append(asyncio.ensure_future(run(region, instance['instance_id'])))
+        await asyncio.gather(*runs)
+
+    def poll_instance(target: tuple) -> Optional[int]:
+        region, instance_id = target
+        reporter = reporters[region]
+        try:
+            if not reporter.get_instance_details(instance_id):
+                return None
+            tenants = reporter.list_tenants(instance_id)
+            return reporter.collect_datapoints(
+                instance_id, [tenant['tenant_id'] for tenant in tenants],
+                start_time=start_time.isoformat(), end_time=end_time.isoformat(),
+                batch_metrics=not args.no_batch_metrics
+            )
+        except Exception as e:
+            print(f"  ⚠ Error polling instance {instance_id}: {str(e)}")
+            return None
+
+    try:
+        if session.use_async:
+            asyncio.run(poll_all_async())
+        else:
+            targets = (
+                (region, instance['instance_id']) for region, instance in reporters.iter_instances()
+                if not wanted or instance['instance_id'] in wanted
+            )
+            for _, future in scheduler.imap_unordered(poll_instance, targets, args.instance_workers):
+                record(future.result())
+    except KeyboardInterrupt:
+        scheduler.shutdown(wait=False)
+        print()
+        print(f"✗ Poll interrupted after {counts['instances']} instance(s)")
+        return 130
+
+    if session.metric_registry is not None:
+        session.metric_registry.save()
+    if session.topology_cache is not None:
+        session.topology_cache.save()
+    cache_stats = session.datapoint_store.stats()
+    api_stats = scheduler.stats()
+    print(f"✓ Polled {counts['instances']} instance(s): {counts['datapoints']} datapoints fetched "
+          f"in {cache_stats['ranges_fetched']} time range(s), {api_stats.get('calls', 0)} API calls"
+          + (f", {counts['failed']} instance(s) failed" if counts['failed'] else ''))
+    return 1 if counts['failed'] and not counts['instances'] else 0
+
+
+def run_daemon(args, session: ExtractionSession) -> int:
+    """
+    Run --daemon: poll the newest datapoints every --poll-minutes and generate scheduled or requested reports
+
+    Every poll only fills the datapoint store with the buckets of the last day it
+    does not hold yet (see poll()); the topology cache serves instance details.
+    Reports are full extractions that recompute their statistics from the store,
+    so their API calls are mostly the listings.
+
+    Args:
+        args: Parsed command-line arguments
+        session: Clients, scheduler and caches kept open by the daemon
+
+    Returns:
+        Process exit code
+    """
+    schedule = ReportSchedule(args.daemon_reports, args.report_time, Path(args.output_dir) / DAEMON_DIR)
+    poll_seconds = args.poll_minutes * 60
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    print(f"Daemon: polling every {args.poll_minutes:g} minutes, "
+          f"{'/'.join(args.daemon_reports) or 'no'} reports at {args.report_time.strftime('%H:%M')}")
+    print(f"  Request a report now: touch {schedule.request_dir}/<daily|weekly|monthly>{REQUEST_SUFFIX}")
+    print()
+
+    result = 0
+    next_poll = time.monotonic()
+    try:
+        while not stop.is_set():
+            for frequency in schedule.due(datetime.now()):
+                report_args = copy.copy(args)
+                report_args.frequency = frequency
+                end_time = datetime.now()
+                start_time, period_desc = report_period(frequency, end_time)
+                print(f"[{end_time:%Y-%m-%d %H:%M:%S}] {frequency.capitalize()} report: {period_desc}")
+                checkpoint = RunCheckpoint.create(
+                    args.output_dir, new_run_id(frequency), frequency, start_time, end_time, period_desc
+                )
+                session.new_run()
+                result = extract(report_args, session, start_time, end_time, period_desc, checkpoint)
+                if result == 130:
+                    return result
+
+            if time.monotonic() >= next_poll:
+                end_time = datetime.now()
+                print(f"[{end_time:%Y-%m-%d %H:%M:%S}] Polling the newest datapoints")
+                session.new_run()
+                result = poll(args, session, end_time - POLL_WINDOW, end_time)
+                if result == 130:
+                    return result
+                next_poll = max(next_poll + poll_seconds, time.monotonic())
+                next_report = schedule.next_report(datetime.now())
+                print(f"Next poll in {args.poll_minutes:g} minutes"
+                      + (f", next scheduled report at {next_report:%Y-%m-%d %H:%M}" if next_report else ''))
+                print()
+
+            # Wake up regularly to pick up report requests
+            stop.wait(min(max(next_poll - time.monotonic(), 0), REQUEST_CHECK_SECONDS))
+    except KeyboardInterrupt:
+        print()
+    finally:
+        session.close()
+    print("✓ Daemon stopped")
+    return 0
+
+
+def main(argv: list = None, result_conn=None):
+    """
+    Main execution function
+
+    Args:
+        argv: Command-line arguments (default: sys.argv[1:])
+        result_conn: Pipe end receiving (instance_data, tenants) per instance (--shards worker processes)
+    """
     parser = argparse.ArgumentParser(
         description='Extract OceanBase capacity assessment reports from Alibaba Cloud'
     )
@@ -49,6 +885,29 @@ def main():
         '--region',
         help='Alibaba Cloud region (overrides config)'
     )
+    parser.add_argument(
+        '--regions',
+        nargs='+',
+        help='Extract several regions in one run into one report, or "all" (config "regions" or every OceanBase region)'
+    )
+    parser.add_argument(
+        '--oceanbase-endpoint',
+        default=None,
+        metavar='HOST[:PORT]',
+        help='OceanBase API endpoint for every region instead of the regional endpoint (e.g. benchmarks/mock_server.py)'
+    )
+    parser.add_argument(
+        '--cms-endpoint',
+        default=None,
+        metavar='HOST[:PORT]',
+        help='CloudMonitor API endpoint for every region instead of the regional endpoint'
+    )
+    parser.add_argument(
+        '--endpoint-protocol',
+        choices=['http', 'https'],
+        default=None,
+        help='Protocol of the API endpoints (default: SDK default, HTTPS)'
+    )
     parser.add_argument(
         '--output-dir',
         default='output',
@@ -83,30 +942,194 @@ def main():
         default=10,
         help='Number of parallel workers for instance processing (default: 10, recommended: 5-15 depending on instance count)'
     )
+    parser.add_argument(
+        '--metric-workers',
+        type=int,
+        default=8,
+        help='Number of metrics of one instance or tenant fetched concurrently (default: 8; the async engine fetches all at once)'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=None,
+        help='Maximum items waiting between extraction pipeline stages (default: config "pipeline.queue_size" or 100; threaded engine)'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=None,
+        help='Maximum number of API requests in flight across all instances and tenants (default: config "scheduler.max_concurrency" or 32)'
+    )
+    parser.add_argument(
+        '--stats-accuracy',
+        type=float,
+        default=0.01,
+        help='Relative error bound for P95 on long metric series, which are summarized with a quantile sketch (default: 0.01 = 1%%)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['threaded', 'async'],
+        default='threaded',
+        help='Extraction engine: threaded (blocking SDK calls on a shared worker pool) or async (SDK async calls on one event loop) - default: threaded'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default='.cache',
+        help='Directory for persistent caches: metric availability registry, datapoint store and topology cache (default: .cache)'
+    )
+    parser.add_argument(
+        '--probe-metrics',
+        action='store_true',
+        help='Query every instance and tenant metric once per instance type, refresh the metric availability registry and exit'
+    )
+    parser.add_argument(
+        '--metric-ttl-days',
+        type=float,
+        default=None,
+        help='Days before metrics recorded as unavailable are queried again (default: config "metric_availability.ttl_days" or 7)'
+    )
+    parser.add_argument(
+        '--no-metric-cache',
+        action='store_true',
+        help='Query every metric and leave the metric availability registry untouched'
+    )
+    parser.add_argument(
+        '--no-datapoint-cache',
+        action='store_true',
+        help='Fetch the whole time window of every metric from CloudMonitor instead of only the ranges missing from the local datapoint store'
+    )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Keep running: poll the newest datapoints every --poll-minutes and generate the --daemon-reports '
+             'at --report-time (or when OUTPUT_DIR/daemon/<frequency>.request appears) from the collected data'
+    )
+    parser.add_argument(
+        '--poll-minutes',
+        type=float,
+        default=DEFAULT_POLL_MINUTES,
+        help=f'Minutes between polls of a --daemon (default: {DEFAULT_POLL_MINUTES}, the metric period)'
+    )
+    parser.add_argument(
+        '--daemon-reports',
+        nargs='*',
+        choices=REPORT_FREQUENCIES,
+        default=['daily'],
+        help='Reports a --daemon generates on schedule: daily every day, weekly on Mondays, monthly on the 1st (default: daily)'
+    )
+    parser.add_argument(
+        '--report-time',
+        type=parse_report_time,
+        default=parse_report_time(DEFAULT_REPORT_TIME),
+        metavar='HH:MM',
+        help=f'Local time of the scheduled reports of a --daemon (default: {DEFAULT_REPORT_TIME})'
+    )
+    parser.add_argument(
+        '--topology-ttl-hours',
+        type=float,
+        default=None,
+        help='Hours before cached instance and tenant details are fetched again (default: config "topology_cache.ttl_hours" or 24)'
+    )
+    parser.add_argument(
+        '--refresh-topology',
+        action='store_true',
+        help='Fetch the details of every instance and tenant and rewrite the topology cache'
+    )
+    parser.add_argument(
+        '--no-topology-cache',
+        action='store_true',
+        help='Fetch instance and tenant details every run and leave the topology cache untouched'
+    )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=None,
+        help='Split the instances across N worker processes by consistent hashing and merge their results into one report'
+    )
+    parser.add_argument(
+        '--shard-index',
+        type=parse_shard_index,
+        default=None,
+        metavar='I/N',
+        help='Extract only shard I of N (0-based) and write its results to OUTPUT_DIR/shards/ instead of a report'
+    )
+    parser.add_argument(
+        '--merge-shards',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Build the report from the results of shards 0..N-1 written by --shard-index runs'
+    )
+    parser.add_argument(
+        '--csv',
+        action='store_true',
+        help='Also write the instance and tenant tables as CSV files to OUTPUT_DIR'
+    )
+    parser.add_argument(
+        '--no-history',
+        action='store_true',
+        help='Do not append the instance and tenant tables to the Parquet history in OUTPUT_DIR/history/'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Record API latency histograms, retries, response bytes and stage times; print the slowest instances and tenants '
+             'and write the run summary to OUTPUT_DIR/profile/ as JSON and Prometheus text'
+    )
+    parser.add_argument(
+        '--from-history',
+        action='store_true',
+        help='Build a weekly or monthly report by merging the daily rollups in OUTPUT_DIR/history/ instead of querying the APIs'
+    )
+    parser.add_argument(
+        '--resume',
+        default=None,
+        metavar='RUN_ID',
+        help='Resume an interrupted run: reuse its time window and completed instances from OUTPUT_DIR/checkpoints/ and fetch only the rest'
+    )
+    parser.add_argument(
+        '--no-batch-metrics',
+        action='store_true',
+        help='Fetch tenant metrics with one CloudMonitor request per tenant per metric instead of one request per metric for all tenants of an instance'
+    )
 
-    args = parser.parse_args()
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv)
 
     print("=" * 70)
     print("OceanBase Capacity Assessment Reporter")
     print("=" * 70)
     print()
 
+    if args.daemon:
+        conflicts = [option for option, value in (
+            ('--shards', args.shards), ('--shard-index', args.shard_index), ('--merge-shards', args.merge_shards),
+            ('--resume', args.resume), ('--from-history', args.from_history), ('--list-only', args.list_only),
+            ('--probe-metrics', args.probe_metrics), ('--no-datapoint-cache', args.no_datapoint_cache),
+        ) if value]
+        if conflicts:
+            print(f"✗ --daemon cannot be combined with {', '.join(conflicts)}")
+            return 1
+
     # Determine time period based on frequency
     end_time = datetime.now()
+    start_time, period_desc = report_period(args.frequency, end_time, args.lookback_days)
 
-    # Check if custom lookback days is specified
-    if args.lookback_days:
-        start_time = end_time - timedelta(days=args.lookback_days)
-        period_desc = f"Last {args.lookback_days} days (HIGHEST utilization including P95)"
-    elif args.frequency == 'daily':
-        start_time = end_time - timedelta(days=1)  # Last 24 hours
-        period_desc = "Last 24 hours"
-    elif args.frequency == 'weekly':
-        start_time = end_time - timedelta(days=7)  # Last 7 days
-        period_desc = "Last 7 days (HIGHEST utilization)"
-    elif args.frequency == 'monthly':
-        start_time = end_time - timedelta(days=30)  # Last 30 days
-        period_desc = "Last 30 days (HIGHEST utilization)"
+    # Completed instances are journaled so that an interrupted run can be resumed
+    checkpoint = None
+    if args.resume:
+        try:
+            # Shard processes of a --shards run only read it: the parent journals their results
+            checkpoint = RunCheckpoint.load(args.output_dir, args.resume, writable=result_conn is None)
+        except FileNotFoundError:
+            print(f"✗ No checkpoint found for run {args.resume} in {args.output_dir}/")
+            return 1
+        args.frequency = checkpoint.frequency
+        start_time, end_time, period_desc = checkpoint.start_time, checkpoint.end_time, checkpoint.period_desc
+    elif not (args.merge_shards or args.from_history or args.list_only or args.probe_metrics or args.daemon):
+        checkpoint = RunCheckpoint.create(
+            args.output_dir, new_run_id(args.frequency), args.frequency, start_time, end_time, period_desc
+        )
 
     print(f"Report Frequency: {args.frequency.upper()}")
     print(f"Time Period: {period_desc}")
@@ -114,8 +1137,28 @@ def main():
         print(f"Custom Lookback: {args.lookback_days} days")
     print(f"Instance Workers: {args.instance_workers} (parallel instance processing)")
     print(f"Tenant Workers: {args.parallel_workers} (parallel tenant metric fetching)")
+    print(f"Metric Workers: {args.metric_workers} (parallel metric queries per instance/tenant)")
+    print(f"Tenant Metrics: {'per-tenant requests' if args.no_batch_metrics else 'batched per instance'}")
+    print(f"Engine: {args.engine}")
+    if args.shard_index:
+        print(f"Shard: {args.shard_index[0]}/{args.shard_index[1]}")
+    if checkpoint is not None and result_conn is None:
+        if args.resume:
+            print(f"Resuming run {checkpoint.run_id}: {len(checkpoint.results)} instance(s) already completed")
+        else:
+            print(f"Run ID: {checkpoint.run_id} (resume with --resume {checkpoint.run_id} if interrupted)")
     print()
 
+    if args.merge_shards:
+        return merge_shard_reports(args, period_desc)
+    if args.from_history:
+        if args.frequency == 'daily':
+            print("✗ --from-history builds weekly or monthly reports from daily runs; use --frequency weekly or monthly")
+            return 1
+        return history_report(args, period_desc)
+    if args.shards and args.shards > 1 and not args.shard_index:
+        return run_shards(args, argv, period_desc, checkpoint)
+
     # Load configuration
     config = load_config(args.config)
 
@@ -123,211 +1166,130 @@ def main():
     try:
         auth = AliyunAuth()
         credentials = auth.get_credentials()
-        region = args.region or config.get('region', credentials['region'])
-        print(f"Using region: {region}")
+        if args.regions == ['all']:
+            regions = config.get('regions') or OCEANBASE_REGIONS
+        elif args.regions:
+            regions = list(dict.fromkeys(args.regions))
+        else:
+            regions = [args.region or config.get('region', credentials['region'])]
+        print(f"Using region{'s' if len(regions) > 1 else ''}: {', '.join(regions)}")
         print()
     except Exception as e:
         print(f"✗ Authentication failed: {str(e)}")
+        if checkpoint is not None and not args.resume:
+            checkpoint.remove()
         return 1
 
-    # Initialize OceanBase client
+    # One scheduler for the whole run: global concurrency cap and per-API rate limits
+    # (shards running at the same time split the account's rate limits evenly)
+    profiler = RunProfiler(enabled=args.profile)
+    scheduler = RequestScheduler.from_config(
+        config,
+        max_concurrency=args.max_concurrency,
+        rate_limit_scale=1 / args.shard_index[1] if args.shard_index else 1.0,
+        profiler=profiler
+    )
+    print(f"API Concurrency: {scheduler.max_concurrency} requests in flight (shared by all workers)")
+    print()
+
+    # Metrics known to return no data for an instance type are skipped until their TTL expires
+    availability_config = config.get('metric_availability', {})
+    metric_registry = None
+    if args.probe_metrics or (not args.list_only and not args.no_metric_cache and availability_config.get('enabled', True)):
+        ttl_days = args.metric_ttl_days
+        if ttl_days is None:
+            ttl_days = availability_config.get('ttl_days', DEFAULT_TTL_DAYS)
+        metric_registry = MetricAvailabilityRegistry(
+            Path(args.cache_dir) / DEFAULT_REGISTRY_FILE,
+            ttl_days=ttl_days,
+            refresh=args.probe_metrics
+        )
+        print(f"Metric Availability: {metric_registry.path} (unavailable metrics re-probed after {ttl_days:g} days)")
+        print()
+
+    # Datapoints fetched by earlier runs are read from disk; only missing time ranges are requested
+    datapoint_config = config.get('datapoint_cache', {})
+    datapoint_store = None
+    if not (args.probe_metrics or args.list_only or args.no_datapoint_cache) and datapoint_config.get('enabled', True):
+        datapoint_store = DatapointStore(
+            Path(args.cache_dir) / DEFAULT_STORE_FILE,
+            retention_days=datapoint_config.get('retention_days', DEFAULT_RETENTION_DAYS)
+        )
+        print(f"Datapoint Cache: {datapoint_store.path}")
+        print()
+
+    # Instance and tenant details of earlier runs are reused until their TTL expires or the listings change
+    topology_config = config.get('topology_cache', {})
+    topology_cache = None
+    if not (args.probe_metrics or args.list_only or args.no_topology_cache) and topology_config.get('enabled', True):
+        ttl_hours = args.topology_ttl_hours
+        if ttl_hours is None:
+            ttl_hours = topology_config.get('ttl_hours', DEFAULT_TTL_HOURS)
+        topology_cache = TopologyCache(
+            Path(args.cache_dir) / DEFAULT_TOPOLOGY_FILE,
+            ttl_hours=ttl_hours,
+            refresh=args.refresh_topology
+        )
+        print(f"Topology Cache: {topology_cache.path} ("
+              + ('refreshing every entry' if args.refresh_topology else f'instance/tenant details reused for {ttl_hours:g} hours')
+              + ')')
+        print()
+
+    # Initialize one OceanBase client pair per region (probing always uses the threaded engine);
+    # the CloudMonitor client is created by the first metric request, so --list-only never builds it
+    use_async = args.engine == 'async' and not args.probe_metrics
     try:
-        reporter = OceanBaseReporter(
+        if use_async:
+            from async_oceanbase_client import AsyncOceanBaseReporter as reporter_class
+        else:
+            from oceanbase_client import OceanBaseReporter as reporter_class
+        reporters = ReporterPool(
+            reporter_class,
+            regions,
             access_key_id=credentials['access_key_id'],
             access_key_secret=credentials['access_key_secret'],
-            region=region
+            stats_accuracy=args.stats_accuracy,
+            scheduler=scheduler,
+            metric_registry=metric_registry,
+            datapoint_store=datapoint_store,
+            topology_cache=topology_cache,
+            metric_workers=args.metric_workers,
+            oceanbase_endpoint=args.oceanbase_endpoint,
+            cms_endpoint=args.cms_endpoint,
+            protocol=args.endpoint_protocol
         )
-        print("✓ OceanBase client initialized")
+        print(f"✓ OceanBase client initialized ({len(reporters)} region(s))")
     except Exception as e:
         print(f"✗ Failed to initialize OceanBase client: {str(e)}")
+        if checkpoint is not None and not args.resume:
+            checkpoint.remove()
         return 1
 
-    # Initialize CSV exporter
-    exporter = CSVExporter(output_dir=args.output_dir)
-    print(f"✓ CSV exporter initialized (output: {args.output_dir}/)")
-
-    # Initialize Excel exporter
-    excel_exporter = ExcelExporter(output_dir=args.output_dir)
-    print(f"✓ Excel exporter initialized")
-    print()
-
-    # Determine which instances to process
-    if args.instances:
-        instance_ids = args.instances
-        print(f"Processing specified instances: {', '.join(instance_ids)}")
-    else:
-        print("Discovering all OceanBase instances...")
-        all_instances = reporter.list_all_instances()
-        if not all_instances:
-            print("✗ No OceanBase instances found")
-            return 1
+    # Listing and probing write no report
+    excel_exporter = None
+    if not (args.list_only or args.probe_metrics):
+        from csv_exporter import CSVExporter
+        from excel_exporter import ExcelExporter
 
-        instance_ids = [inst['instance_id'] for inst in all_instances]
-        print(f"✓ Found {len(instance_ids)} instance(s)")
+        # Initialize CSV exporter
+        exporter = CSVExporter(output_dir=args.output_dir)
+        print(f"✓ CSV exporter initialized (output: {args.output_dir}/)")
 
+        # Initialize Excel exporter
+        excel_exporter = ExcelExporter(output_dir=args.output_dir)
+        print(f"✓ Excel exporter initialized")
     print()
 
-    if args.list_only:
-        print("List-only mode: Exiting without extracting metrics")
-        return 0
-
-    # Process instances in parallel
-    comprehensive_data = []
-    tenants_data = []
-
-    def process_single_instance(instance_id: str, idx: int) -> tuple:
-        """
-        Process a single OceanBase instance and its tenants
-
-        Returns:
-            Tuple of (instance_data, tenants_list, instance_name, success)
-        """
-        try:
-            # Get instance details
-            instance_details = reporter.get_instance_details(instance_id)
-            if not instance_details:
-                return None, [], instance_id, False
-
-            instance_name = instance_details.get('instance_name', 'N/A')
-
-            # Prepare instance data
-            instance_data = instance_details.copy()
-
-            # Calculate disk utilization percentage
-            if instance_details.get('total_storage') and instance_details.get('total_storage') > 0:
-                used_disk = instance_data.get('used_storage', 0)
-                total_disk = instance_details.get('total_storage', 0)
-                if total_disk > 0:
-                    disk_util_pct = (used_disk / total_disk) * 100
-                    instance_data['disk_utilization_pct'] = round(disk_util_pct, 2)
-
-            # Get utilization metrics (avg/min/max/P95)
-            utilization_metrics = reporter.get_utilization_metrics(
-                instance_id,
-                start_time=start_time.isoformat(),
-                end_time=end_time.isoformat(),
-                period_desc=period_desc
-            )
-            if utilization_metrics:
-                instance_data.update(utilization_metrics)
-
-            # Get tenants
-            tenants = reporter.list_tenants(instance_id)
-
-            # Fetch tenant metrics in parallel
-            tenants_with_metrics = []
-            if tenants:
-                tenants_with_metrics = reporter.fetch_tenants_parallel(
-                    instance_id=instance_id,
-                    instance_name=instance_name,
-                    tenants=tenants,
-                    start_time=start_time.isoformat(),
-                    end_time=end_time.isoformat(),
-                    max_workers=args.parallel_workers
-                )
-
-            return instance_data, tenants_with_metrics, instance_name, True
-
-        except Exception as e:
-            print(f"\n⚠️  Error processing instance {instance_id}: {str(e)}")
-            return None, [], instance_id, False
-
-    # Use ThreadPoolExecutor for parallel instance processing
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    print(f"Processing {len(instance_ids)} instances with {args.instance_workers} parallel workers...")
-    print()
-
-    completed_count = 0
-    with ThreadPoolExecutor(max_workers=args.instance_workers) as executor:
-        # Submit all instance processing tasks
-        future_to_instance = {
-            executor.submit(process_single_instance, instance_id, idx): (instance_id, idx)
-            for idx, instance_id in enumerate(instance_ids, 1)
-        }
-
-        # Process results as they complete
-        for future in as_completed(future_to_instance):
-            instance_id, idx = future_to_instance[future]
-            try:
-                instance_data, instance_tenants, instance_name, success = future.result()
-
-                if success and instance_data:
-                    comprehensive_data.append(instance_data)
-                    tenants_data.extend(instance_tenants)
-                    completed_count += 1
-
-                    print(f"[{completed_count}/{len(instance_ids)}] ✓ Completed: {instance_name} ({instance_id}) - {len(instance_tenants)} tenant(s)")
-                else:
-                    print(f"[{idx}/{len(instance_ids)}] ✗ Failed: {instance_id}")
-
-            except Exception as e:
-                print(f"[{idx}/{len(instance_ids)}] ✗ Exception processing {instance_id}: {str(e)}")
-
-    print()
-    print(f"✓ Parallel processing completed: {completed_count}/{len(instance_ids)} instances successful")
-    print()
-
-    # Export comprehensive reports
-    print("=" * 70)
-    print("Generating Reports")
-    print("=" * 70)
-    print(f"Report Type: {args.frequency.upper()}")
-    print()
-
-    # Add frequency suffix to filenames
-    freq_suffix = f"_{args.frequency}" if args.frequency != 'daily' else ""
-
-    # Generate consolidated Excel report with multiple tabs
-    print()
-    print("Generating consolidated Excel report...")
-    if comprehensive_data and tenants_data:
-        # Create temporary CSV files for Excel generation
-        import tempfile
-        import os
-
-        # Create temporary CSV files
-        temp_dir = tempfile.mkdtemp()
-        capacity_csv_path = os.path.join(temp_dir, f'oceanbase_capacity_assessment{freq_suffix}.csv')
-        tenants_csv_path = os.path.join(temp_dir, f'oceanbase_tenants{freq_suffix}.csv')
-
-        # NOTE: connection_utilization_pct calculation removed per user request (2026-01-02)
-        # Previously calculated: (sessions_avg / max_connections) * 100
-        # Column has been removed from the Tenants Report tab
-
-        # Export to temporary CSV files
-        import pandas as pd
-        pd.DataFrame(comprehensive_data).to_csv(capacity_csv_path, index=False)
-        pd.DataFrame(tenants_data).to_csv(tenants_csv_path, index=False)
-
-        # Determine frequency label for Excel
-        frequency_label = args.frequency.capitalize()
-
-        # Generate Excel report from temporary CSV files
-        excel_exporter.export_consolidated_report(
-            capacity_csv_path=capacity_csv_path,
-            tenants_csv_path=tenants_csv_path,
-            report_frequency=frequency_label
-        )
-
-        # Clean up temporary files
-        import shutil
-        shutil.rmtree(temp_dir)
-    else:
-        print("⚠ Skipping Excel report - CSV files not available")
-
-    print()
-    print("=" * 70)
-    print(f"✓ Report generation completed successfully")
-    print(f"  Report Type: {args.frequency.upper()}")
-    print(f"  Time Period: {period_desc}")
-    print(f"  Total instances processed: {len(comprehensive_data)}")
-    print(f"  Total tenants found: {len(tenants_data)}")
-    if comprehensive_data and tenants_data:
-        print(f"  Excel report: {args.output_dir}/{datetime.now().strftime('%Y%m%d')}/{frequency_label.capitalize()}/")
-    print("=" * 70)
-
-    return 0
+    session = ExtractionSession(
+        config, regions, reporters, scheduler, excel_exporter, use_async=use_async,
+        metric_registry=metric_registry, datapoint_store=datapoint_store, topology_cache=topology_cache
+    )
+    if args.daemon:
+        return run_daemon(args, session)
+    try:
+        return extract(args, session, start_time, end_time, period_desc, checkpoint, result_conn)
+    finally:
+        session.close()
 
 
 if __name__ == '__main__':
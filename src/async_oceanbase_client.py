@@ -0,0 +1,726 @@
+"""
+Asyncio OceanBase client
+Drives every OceanBase and CloudMonitor request from one event loop using the SDK's *_async methods
+"""
+import asyncio
+import functools
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from alibabacloud_oceanbasepro20190901 import models as oceanbase_models
+from oceanbase_client import OceanBaseReporter
+from request_scheduler import RequestScheduler
+from retry import is_permanent_error
+from request_memo import RequestMemo
+from run_profiler import NO_STAGE, profiled
+from metric_availability import SCOPE_INSTANCE, SCOPE_TENANT
+
+
+class AdaptiveSlots:
+    """asyncio counterpart of the scheduler's concurrency gate, following its adaptive limit"""
+
+    def __init__(self, scheduler: RequestScheduler):
+        """
+        Initialize gate
+
+        Args:
+            scheduler: Scheduler whose concurrency_limit caps the requests in flight
+        """
+        self._scheduler = scheduler
+        self._cond = asyncio.Condition()
+        self._in_flight = 0
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self._scheduler.concurrency_limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self._in_flight -= 1
+            # Wake as many waiters as there are free slots (the limit may have grown)
+            self._cond.notify(max(self._scheduler.concurrency_limit - self._in_flight, 1))
+
+
+class AsyncOceanBaseReporter(OceanBaseReporter):
+    """
+    OceanBaseReporter variant built on the SDK's async methods
+
+    Every request is a coroutine on a single event loop instead of a blocking call
+    on a worker thread, so thousands of metric requests can be in flight without
+    a thread per request. Requests in flight are capped by the scheduler's
+    (adaptive) concurrency limit, draw rate-limit tokens from the same buckets
+    and follow the same retry policy as the threaded engine. Waiting requests
+    are served in FIFO order (no priorities).
+
+    Public methods have the same names, arguments and results as OceanBaseReporter
+    but are coroutines and must be awaited.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize async reporter (same arguments as OceanBaseReporter)"""
+        super().__init__(*args, **kwargs)
+        self._slots: Optional[AdaptiveSlots] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _request_slots(self) -> AdaptiveSlots:
+        """Concurrency cap for the running event loop (recreated if the reporter is reused by another loop)"""
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = AdaptiveSlots(self.scheduler)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _call(self, api: str, fn: Callable[..., Awaitable], request):
+        """
+        Send one API request through the request memo (identical requests of the run are shared)
+
+        Args:
+            api: API name used for rate limiting and memo keys (e.g. 'describe_metric_list')
+            fn: SDK *_async method
+            request: SDK request model
+
+        Returns:
+            SDK response
+        """
+        return await self.request_memo.acall(RequestMemo.key(api, request), self._send, api, fn, request)
+
+    async def _send(self, api: str, fn: Callable[..., Awaitable], request):
+        """
+        Send one API request under the global limits, retrying throttled and transient failures
+
+        Args:
+            api: API name used for rate limiting (e.g. 'describe_metric_list')
+            fn: SDK *_async method
+            request: SDK request model
+
+        Returns:
+            SDK response
+        """
+        attempt = 0
+        while True:
+            delay = self.scheduler.reserve(api)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            profiler = self.scheduler.profiler
+            started = None
+            try:
+                async with self._request_slots():
+                    started = time.monotonic()
+                    response = await fn(request)
+            except Exception as e:
+                if started is not None:
+                    profiler.record_call(api, time.monotonic() - started, error=True)
+                attempt += 1
+                backoff = self.scheduler.retry_delay(api, e, attempt)
+                if backoff is None:
+                    raise
+                await asyncio.sleep(backoff)
+            else:
+                profiler.record_call(api, time.monotonic() - started, response)
+                self.scheduler.record_success()
+                return response
+
+    async def _iter_describe_pages(
+        self,
+        api: str,
+        fn: Callable[..., Awaitable],
+        make_request: Callable[[int], object],
+        label: str,
+        stage: Optional[str] = None
+    ) -> AsyncIterator[object]:
+        """
+        Walk every page of a paginated Describe* API (async counterpart of _iter_describe_pages)
+
+        Args:
+            api: API name (e.g. 'describe_instances')
+            fn: SDK *_async method taking the request
+            make_request: Builds the request for a page number (1-based)
+            label: What is listed, for error messages (e.g. 'instances')
+            stage: Profiler stage the page requests are timed as (e.g. 'discovery')
+
+        Yields:
+            Response bodies, one per page, in page order
+        """
+        async def fetch_page(page_number: int):
+            with self.scheduler.profiler.stage(stage) if stage else NO_STAGE:
+                return (await self._call(api, fn, make_request(page_number))).body
+
+        try:
+            first_page = await fetch_page(1)
+        except Exception as e:
+            print(f"Error listing {label}: {str(e)}")
+            return
+        yield first_page
+
+        page_count = -(-(first_page.total_count or 0) // self.DESCRIBE_PAGE_SIZE)
+        pages = [(page_number, asyncio.ensure_future(fetch_page(page_number)))
+                 for page_number in range(2, page_count + 1)]
+        try:
+            for page_number, task in pages:
+                try:
+                    yield await task
+                except Exception as e:
+                    print(f"⚠ Error listing {label} (page {page_number}/{page_count}): {str(e)}")
+        finally:
+            for _, task in pages:
+                task.cancel()
+
+    async def iter_instances(self) -> AsyncIterator[Dict]:
+        """
+        Stream all OceanBase instances in the region, page by page
+
+        Yields:
+            Instance information dictionaries as their page arrives
+        """
+        async for body in self._iter_describe_pages(
+            'describe_instances',
+            self.oceanbase_client.describe_instances_async,
+            lambda page_number: oceanbase_models.DescribeInstancesRequest(
+                page_number=page_number, page_size=self.DESCRIBE_PAGE_SIZE
+            ),
+            'instances',
+            stage='discovery'
+        ):
+            self._observe_instances(body)
+            for instance in self._parse_instances(body):
+                yield instance
+
+    async def list_all_instances(self) -> List[Dict]:
+        """
+        List all OceanBase instances in the region with pagination
+
+        Returns:
+            List of instance information dictionaries
+        """
+        return [instance async for instance in self.iter_instances()]
+
+    @profiled('instance_details')
+    async def get_instance_details(self, instance_id: str) -> Optional[Dict]:
+        """
+        Get detailed information about a specific OceanBase instance
+        Includes capacity allocation metrics (allocated vs total resources)
+
+        Args:
+            instance_id: OceanBase instance ID
+
+        Returns:
+            Dictionary with instance details including capacity allocation
+        """
+        cached = self._cached_topology(instance_id)
+        if cached is not None:
+            return cached
+        try:
+            request = oceanbase_models.DescribeInstanceRequest(
+                instance_id=instance_id
+            )
+            response = await self._call(
+                'describe_instance', self.oceanbase_client.describe_instance_async, request
+            )
+            self._remember_instance_profile(response.body.instance)
+            return self._cache_topology(self._parse_instance_details(response.body.instance), instance_id)
+        except Exception as e:
+            print(f"Error getting instance details for {instance_id}: {str(e)}")
+            return None
+
+    async def iter_tenants(self, instance_id: str) -> AsyncIterator[Dict]:
+        """
+        Stream all tenants of an OceanBase instance, page by page
+
+        Args:
+            instance_id: OceanBase instance ID
+
+        Yields:
+            Tenant information dictionaries as their page arrives
+        """
+        async for body in self._iter_describe_pages(
+            'describe_tenants',
+            self.oceanbase_client.describe_tenants_async,
+            lambda page_number: oceanbase_models.DescribeTenantsRequest(
+                instance_id=instance_id, page_number=page_number, page_size=self.DESCRIBE_PAGE_SIZE
+            ),
+            f'tenants for instance {instance_id}'
+        ):
+            self._observe_tenants(instance_id, body)
+            for tenant in self._parse_tenants(body):
+                yield tenant
+
+    @profiled('tenant_fetch')
+    async def list_tenants(self, instance_id: str) -> List[Dict]:
+        """
+        List all tenants in an OceanBase instance with pagination
+
+        Args:
+            instance_id: OceanBase instance ID
+
+        Returns:
+            List of tenant information dictionaries
+        """
+        return self._observe_tenant_set(instance_id, [tenant async for tenant in self.iter_tenants(instance_id)])
+
+    @profiled('tenant_fetch', per_tenant=True)
+    async def get_tenant_details(self, instance_id: str, tenant_id: str) -> Optional[Dict]:
+        """
+        Get detailed tenant information including resource allocation
+
+        Args:
+            instance_id: OceanBase instance ID
+            tenant_id: Tenant ID
+
+        Returns:
+            Dictionary with detailed tenant information including allocated resources
+        """
+        cached = self._cached_topology(instance_id, tenant_id)
+        if cached is not None:
+            return cached
+        try:
+            request = oceanbase_models.DescribeTenantRequest(
+                instance_id=instance_id,
+                tenant_id=tenant_id
+            )
+            response = await self._call(
+                'describe_tenant', self.oceanbase_client.describe_tenant_async, request
+            )
+            return self._cache_topology(self._parse_tenant_details(response.body), instance_id, tenant_id)
+        except Exception as e:
+            print(f"Error getting tenant details for {tenant_id}: {str(e)}")
+            return None
+
+    async def _describe_metric_page(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str,
+        next_token: Optional[str] = None
+    ):
+        """Fetch one DescribeMetricList page"""
+        request = self._metric_list_request(metric_name, dimensions, start_ms, end_ms, next_token)
+        return await self._call('describe_metric_list', self._describe_metric_list_checked_async, request)
+
+    async def _describe_metric_list_checked_async(self, request):
+        """Send DescribeMetricList and raise errors reported in the response body"""
+        response = await self.cms_client.describe_metric_list_async(request)
+        self._check_metric_response(response)
+        return response
+
+    async def iter_metric_datapoints(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Iterate over ALL datapoints of a metric query page by page
+        With a datapoint store, only the time ranges missing from the store are requested
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string
+            start_ms: Start time (milliseconds since epoch)
+            end_ms: End time (milliseconds since epoch)
+
+        Yields:
+            List of datapoint dictionaries for each non-empty page
+        """
+        store = self.datapoint_store
+        if store is None:
+            async for page in self._iter_api_datapoints(metric_name, dimensions, start_ms, end_ms):
+                yield page
+            return
+
+        fetched = await self._fill_datapoints(metric_name, dimensions, start_ms, end_ms)
+        pages = store.read(
+            metric_name, dimensions, self.METRIC_PERIOD, int(start_ms), int(end_ms),
+            page_size=self.METRIC_PAGE_LENGTH, fetched=fetched
+        )
+        while True:
+            page = await self._store_call(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    async def _store_call(self, fn: Callable, *args, **kwargs):
+        """Run a blocking datapoint store (SQLite) call on the default executor, off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    async def _fill_datapoints(self, metric_name: str, dimensions: str, start_ms: str, end_ms: str) -> int:
+        """Fetch the time ranges of a metric query that are missing from the datapoint store"""
+        store = self.datapoint_store
+        fetched = 0
+        missing = await self._store_call(
+            store.missing_ranges, metric_name, dimensions, self.METRIC_PERIOD, int(start_ms), int(end_ms)
+        )
+        for range_start, range_end in missing:
+            datapoints = []
+            async for page in self._iter_api_datapoints(
+                metric_name, dimensions, str(range_start), str(range_end)
+            ):
+                datapoints.extend(page)
+            await self._store_call(
+                store.add, metric_name, dimensions, self.METRIC_PERIOD, range_start, range_end, datapoints
+            )
+            fetched += len(datapoints)
+        return fetched
+
+    async def _iter_api_datapoints(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Iterate over ALL DescribeMetricList datapoints page by page, following NextToken
+        The next page is requested while the caller processes the current one
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string
+            start_ms: Start time (milliseconds since epoch)
+            end_ms: End time (milliseconds since epoch)
+
+        Yields:
+            List of datapoint dictionaries for each non-empty page
+        """
+        response = await self._describe_metric_page(metric_name, dimensions, start_ms, end_ms)
+        next_page = None
+        try:
+            while True:
+                next_token = response.body.next_token
+                next_page = None
+                if next_token:
+                    next_page = asyncio.ensure_future(self._describe_metric_page(
+                        metric_name, dimensions, start_ms, end_ms, next_token
+                    ))
+
+                if response.body.datapoints:
+                    datapoints = json.loads(response.body.datapoints)
+                    self.scheduler.profiler.record_datapoints(len(datapoints))
+                    if datapoints:
+                        yield datapoints
+
+                if next_page is None:
+                    break
+                response = await next_page
+        finally:
+            # Consumer stopped early or a page failed: don't leave a prefetch running
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def get_metrics(
+        self,
+        instance_id: str,
+        metric_name: str,
+        period: int = 300,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Get CloudMonitor metrics for an OceanBase instance
+
+        Args:
+            instance_id: OceanBase instance ID
+            metric_name: Metric name (e.g., 'cpu_usage', 'memory_percent')
+            period: Data aggregation period in seconds (default: 300)
+            start_time: Start time in ISO format
+            end_time: End time in ISO format
+
+        Returns:
+            Dictionary with metric data including avg, min, max, P95
+            (None if the metric is unavailable or known to be unavailable)
+        """
+        if not self._metric_enabled(instance_id, metric_name, SCOPE_INSTANCE):
+            return None
+        try:
+            start_ms, end_ms = self._metric_time_window(start_time, end_time)
+            stats = self._new_stats()
+            datapoint_count = 0
+            async for page in self.iter_metric_datapoints(
+                metric_name, self._instance_dimensions(instance_id), start_ms, end_ms
+            ):
+                datapoint_count += self._add_instance_datapoints(instance_id, page, stats)
+            self._observe_metric(instance_id, metric_name, SCOPE_INSTANCE, datapoint_count > 0)
+            return self._summarize_instance_stats(metric_name, stats, datapoint_count)
+        except Exception as e:
+            self._observe_metric(instance_id, metric_name, SCOPE_INSTANCE, False, e)
+            if is_permanent_error(e):
+                print(f"  Warning: Metrics unavailable for {metric_name}: {str(e)[:80]}")
+            else:
+                print(f"  ⚠ Warning: {metric_name} failed after retries: {str(e)[:80]}")
+            return None
+
+    @profiled('tenant_fetch', per_tenant=True)
+    async def get_tenant_metrics(
+        self,
+        instance_id: str,
+        tenant_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        metric_names: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Get comprehensive OceanBase tenant metrics including CPU, memory, sessions, and I/O
+        All metrics of the tenant are queried concurrently (one query per metric)
+
+        Args:
+            instance_id: OceanBase instance ID
+            tenant_id: Tenant ID
+            start_time: Start time in ISO format (optional)
+            end_time: End time in ISO format (optional)
+            metric_names: Subset of TENANT_METRIC_MAP keys to fetch (default: all)
+
+        Returns:
+            Dictionary with comprehensive tenant metrics (for weekly/monthly: HIGHEST values)
+        """
+        start_ms, end_ms = self._metric_time_window(start_time, end_time)
+        dimensions = self._tenant_dimensions(instance_id, tenant_id)
+
+        async def fetch_metric(metric_name: str, output_field: str) -> Dict:
+            try:
+                stats = self._new_stats()
+                async for page in self.iter_metric_datapoints(metric_name, dimensions, start_ms, end_ms):
+                    for dp in page:
+                        value = self._tenant_value(dp)
+                        if value is not None:
+                            stats.add(value)
+                self._observe_metric(instance_id, metric_name, SCOPE_TENANT, bool(stats))
+                return self._summarize_tenant_stats(metric_name, output_field, stats)
+            except Exception as e:
+                self._observe_metric(instance_id, metric_name, SCOPE_TENANT, False, e)
+                self._report_tenant_metric_error(metric_name, tenant_id, e)
+                return {}
+
+        results = await asyncio.gather(*(
+            fetch_metric(metric_name, output_field)
+            for metric_name, output_field in self.TENANT_METRIC_MAP.items()
+            if (metric_names is None or metric_name in metric_names)
+            and self._metric_enabled(instance_id, metric_name, SCOPE_TENANT)
+        ))
+
+        metrics = {}
+        for result in results:
+            metrics.update(result)
+        return metrics
+
+    @profiled('tenant_fetch')
+    async def get_tenant_metrics_batch(
+        self,
+        instance_id: str,
+        tenant_ids: List[str],
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Get tenant metrics for ALL tenants of an instance with one CloudMonitor query per metric
+        All metrics are queried concurrently
+
+        Args:
+            instance_id: OceanBase instance ID
+            tenant_ids: Tenant IDs to collect metrics for
+            start_time: Start time in ISO format (optional)
+            end_time: End time in ISO format (optional)
+
+        Returns:
+            Tuple of ({tenant_id: metrics_dict}, failed_metric_names), as in OceanBaseReporter
+        """
+        start_ms, end_ms = self._metric_time_window(start_time, end_time)
+        dimensions = self._tenant_dimensions(instance_id)
+
+        async def fetch_metric(metric_name: str) -> Dict:
+            stats_by_tenant = {tenant_id: self._new_stats() for tenant_id in tenant_ids}
+            async for page in self.iter_metric_datapoints(metric_name, dimensions, start_ms, end_ms):
+                self._split_tenant_datapoints(page, stats_by_tenant)
+            self._observe_metric(instance_id, metric_name, SCOPE_TENANT, any(stats_by_tenant.values()))
+            return stats_by_tenant
+
+        metric_items = [
+            (metric_name, output_field) for metric_name, output_field in self.TENANT_METRIC_MAP.items()
+            if self._metric_enabled(instance_id, metric_name, SCOPE_TENANT)
+        ]
+        results = await asyncio.gather(
+            *(fetch_metric(metric_name) for metric_name, _ in metric_items),
+            return_exceptions=True
+        )
+
+        metrics_by_tenant = {tenant_id: {} for tenant_id in tenant_ids}
+        failed_metrics = []
+        for (metric_name, output_field), result in zip(metric_items, results):
+            if isinstance(result, Exception):
+                if self._batch_metric_failed(instance_id, metric_name, result):
+                    failed_metrics.append(metric_name)
+                continue
+            for tenant_id, stats in result.items():
+                metrics_by_tenant[tenant_id].update(
+                    self._summarize_tenant_stats(metric_name, output_field, stats)
+                )
+
+        return metrics_by_tenant, failed_metrics
+
+    async def fetch_tenants_parallel(
+        self,
+        instance_id: str,
+        instance_name: str,
+        tenants: List[Dict],
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        max_workers: int = 5,
+        batch_metrics: bool = True
+    ) -> List[Dict]:
+        """
+        Fetch tenant details and metrics concurrently on the event loop
+
+        Args:
+            instance_id: OceanBase instance ID
+            instance_name: Instance name for labeling
+            tenants: List of tenant dictionaries
+            start_time: Start time in ISO format
+            end_time: End time in ISO format
+            max_workers: Maximum number of tenants processed concurrently (default: 5)
+            batch_metrics: Fetch CloudMonitor metrics for all tenants with one query per metric
+                           (default: True), with the same fallbacks as the threaded engine
+
+        Returns:
+            List of tenant dictionaries with metrics
+        """
+        batch_results = None
+        failed_metrics = []
+        if batch_metrics and tenants:
+            batch_results, failed_metrics = await self.get_tenant_metrics_batch(
+                instance_id,
+                [tenant['tenant_id'] for tenant in tenants],
+                start_time=start_time,
+                end_time=end_time
+            )
+            # No data for any tenant (e.g. cluster-wide dimension not supported): use per-tenant path
+            if not any(batch_results.values()):
+                print(f"    ⚠ Batch metric query returned no data for {instance_id}, falling back to per-tenant queries")
+                batch_results = None
+
+        if not tenants:
+            return []
+
+        tenant_slots = asyncio.Semaphore(max(max_workers, 1))
+
+        async def fetch_single_tenant(tenant: Dict) -> Dict:
+            """Fetch metrics for a single tenant"""
+            async with tenant_slots:
+                try:
+                    # Add instance context
+                    tenant['instance_id'] = instance_id
+                    tenant['instance_name'] = instance_name
+
+                    # Get detailed tenant resource allocation (from DescribeTenant API)
+                    tenant_details = await self.get_tenant_details(instance_id, tenant['tenant_id'])
+                    if tenant_details:
+                        tenant.update(tenant_details)
+
+                    # Get comprehensive tenant metrics (from CloudMonitor API)
+                    if batch_results is not None:
+                        tenant_metrics = dict(batch_results.get(tenant['tenant_id'], {}))
+                        if failed_metrics:
+                            tenant_metrics.update(await self.get_tenant_metrics(
+                                instance_id,
+                                tenant['tenant_id'],
+                                start_time=start_time,
+                                end_time=end_time,
+                                metric_names=failed_metrics
+                            ))
+                    else:
+                        tenant_metrics = await self.get_tenant_metrics(
+                            instance_id,
+                            tenant['tenant_id'],
+                            start_time=start_time,
+                            end_time=end_time
+                        )
+                    if tenant_metrics:
+                        tenant.update(tenant_metrics)
+
+                    return self.convert_tenant_disk_metrics(tenant)
+                except Exception as e:
+                    print(f"      ⚠ Error fetching metrics for tenant {tenant.get('tenant_id', 'unknown')}: {str(e)}")
+                    return tenant
+
+        mode_desc = "batched metrics" if batch_results is not None else "per-tenant metrics"
+        print(f"    Fetching metrics for {len(tenants)} tenants (async mode, {max_workers} concurrent, {mode_desc})...")
+
+        tenants_with_metrics = []
+        for completed in asyncio.as_completed([fetch_single_tenant(tenant) for tenant in tenants]):
+            tenants_with_metrics.append(await completed)
+
+            # Progress update every 10 tenants
+            if len(tenants_with_metrics) % 10 == 0:
+                print(f"      Progress: {len(tenants_with_metrics)}/{len(tenants)} tenants processed...")
+
+        print(f"    ✓ Completed fetching metrics for {len(tenants_with_metrics)} tenant(s)")
+        return tenants_with_metrics
+
+    @profiled('utilization')
+    async def get_utilization_metrics(
+        self,
+        instance_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        period_desc: str = "last 24 hours"
+    ) -> Dict:
+        """
+        Get ALL instance-level CloudMonitor metrics with avg/min/max/P95
+        All metrics are queried concurrently
+
+        Args:
+            instance_id: OceanBase instance ID
+            start_time: Start time in ISO format (optional)
+            end_time: End time in ISO format (optional)
+            period_desc: Description of the period (for logging)
+
+        Returns:
+            Dictionary with ALL available instance metrics (for weekly/monthly: HIGHEST values)
+        """
+        print(f"  Fetching ALL instance metrics ({period_desc})...")
+
+        # Instance metrics followed by the legacy CPU/memory summary queries (shared by the request memo)
+        metric_names = list(self.INSTANCE_METRIC_MAP) + ['cpu_usage', 'memory_percent']
+        results = await asyncio.gather(*(
+            self.get_metrics(instance_id, metric_name, start_time=start_time, end_time=end_time)
+            for metric_name in metric_names
+        ))
+
+        metrics = {}
+        for output_prefix, metric_data in zip(self.INSTANCE_METRIC_MAP.values(), results):
+            self._add_utilization_fields(metrics, output_prefix, metric_data)
+        cpu_metrics, mem_metrics = results[-2:]
+        self._add_legacy_utilization(metrics, cpu_metrics, mem_metrics)
+
+        return metrics
+
+    async def collect_datapoints(
+        self,
+        instance_id: str,
+        tenant_ids: List[str],
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        batch_metrics: bool = True
+    ) -> int:
+        """
+        Fetch the datapoints of an instance and its tenants that are missing from the datapoint store
+        All queries are sent concurrently; see OceanBaseReporter.collect_datapoints()
+
+        Returns:
+            Number of datapoints fetched
+        """
+        start_ms, end_ms = self._metric_time_window(start_time, end_time)
+
+        async def fill(metric_name: str, scope: str, dimensions: str) -> int:
+            try:
+                return await self._fill_datapoints(metric_name, dimensions, start_ms, end_ms)
+            except Exception as e:
+                self._collection_failed(instance_id, metric_name, scope, e)
+                return 0
+
+        results = await asyncio.gather(*(
+            fill(metric_name, scope, dimensions)
+            for metric_name, scope, dimensions, _ in self._collection_queries(instance_id, tenant_ids, batch_metrics)
+        ))
+        return sum(results)
@@ -0,0 +1,172 @@
+"""
+Long-running collector (--daemon)
+Keeps the clients, scheduler and caches of a run open between extractions, so a
+daemon can poll CloudMonitor for the newest datapoints on a schedule and build
+daily, weekly and monthly reports from the datapoints it has collected
+"""
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from run_profiler import RunProfiler
+
+DAEMON_DIR = 'daemon'
+REQUEST_SUFFIX = '.request'
+REPORT_FREQUENCIES = ('daily', 'weekly', 'monthly')
+
+DEFAULT_POLL_MINUTES = 60
+DEFAULT_REPORT_TIME = '00:15'
+
+# Seconds between checks for report requests while a daemon waits for the next poll
+REQUEST_CHECK_SECONDS = 10
+
+# Window of every poll: the datapoint store only fetches what is missing from it,
+# so polls request the newest buckets and fill gaps of up to a day (e.g. a restart)
+POLL_WINDOW = timedelta(days=1)
+
+
+class ExtractionSession:
+    """Objects of a run that outlive one extraction: clients, scheduler and caches"""
+
+    def __init__(
+        self,
+        config: Dict,
+        regions: List[str],
+        reporters,
+        scheduler,
+        excel_exporter,
+        use_async: bool = False,
+        metric_registry=None,
+        datapoint_store=None,
+        topology_cache=None
+    ):
+        """
+        Initialize session
+
+        Args:
+            config: Full configuration dictionary
+            regions: Regions of the run
+            reporters: ReporterPool with one reporter per region
+            scheduler: Request scheduler shared by the reporters
+            excel_exporter: Excel exporter of the reports
+            use_async: Reporters are AsyncOceanBaseReporter (--engine async)
+            metric_registry: Metric availability registry (optional)
+            datapoint_store: Datapoint store (optional)
+            topology_cache: Topology cache (optional)
+        """
+        self.config = config
+        self.regions = regions
+        self.reporters = reporters
+        self.scheduler = scheduler
+        self.excel_exporter = excel_exporter
+        self.use_async = use_async
+        self.metric_registry = metric_registry
+        self.datapoint_store = datapoint_store
+        self.topology_cache = topology_cache
+
+    def new_run(self) -> None:
+        """Reset per-run state (request memos, statistics, profiler) before the next extraction"""
+        self.reporters.new_run()
+        self.scheduler.reset_stats()
+        self.scheduler.profiler = RunProfiler(enabled=self.scheduler.profiler.enabled)
+        if self.metric_registry is not None:
+            self.metric_registry.new_run()
+        if self.datapoint_store is not None:
+            self.datapoint_store.new_run()
+        if self.topology_cache is not None:
+            self.topology_cache.new_run()
+
+    def close(self) -> None:
+        """Close the datapoint store"""
+        if self.datapoint_store is not None:
+            self.datapoint_store.close()
+
+
+def parse_report_time(value: str) -> dt_time:
+    """argparse type of --report-time: 'HH:MM' (local time)"""
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except ValueError:
+        raise ValueError(f"expected HH:MM, got {value!r}")
+
+
+class ReportSchedule:
+    """
+    Reports a daemon generates: scheduled ones and requested ones
+
+    Daily reports are due every day at report_time, weekly reports on Mondays
+    and monthly reports on the 1st of the month at the same time. A report is
+    requested by creating OUTPUT_DIR/daemon/<frequency>.request; the daemon
+    deletes the file when it picks the request up.
+    """
+
+    def __init__(
+        self,
+        frequencies: List[str],
+        report_time: dt_time,
+        request_dir: str,
+        now: Optional[datetime] = None
+    ):
+        """
+        Initialize schedule
+
+        Args:
+            frequencies: Scheduled report frequencies ('daily', 'weekly', 'monthly')
+            report_time: Local time of day of scheduled reports
+            request_dir: Directory watched for <frequency>.request files
+            now: Start time of the daemon (default: now); reports whose time
+                 already passed today are not generated until their next slot
+        """
+        self.frequencies = list(frequencies)
+        self.report_time = report_time
+        self.request_dir = Path(request_dir)
+        self.request_dir.mkdir(parents=True, exist_ok=True)
+        now = now or datetime.now()
+        self._last: Dict[str, date] = {
+            frequency: now.date() for frequency in self.frequencies if now.time() >= report_time
+        }
+
+    @staticmethod
+    def _scheduled_on(frequency: str, day: date) -> bool:
+        if frequency == 'weekly':
+            return day.weekday() == 0
+        if frequency == 'monthly':
+            return day.day == 1
+        return True
+
+    def next_report(self, now: datetime) -> Optional[datetime]:
+        """Time of the next scheduled report, or None if no frequency is scheduled"""
+        for days in range(32):
+            day = now.date() + timedelta(days=days)
+            slot = datetime.combine(day, self.report_time)
+            if slot < now or all(self._last.get(frequency) == day for frequency in self.frequencies):
+                continue
+            if any(self._scheduled_on(frequency, day) for frequency in self.frequencies):
+                return slot
+        return None
+
+    def due(self, now: datetime) -> List[str]:
+        """
+        Reports to generate now, in frequency order
+
+        Args:
+            now: Current local time
+
+        Returns:
+            Frequencies whose scheduled time passed since the last check, plus requested ones
+        """
+        due = []
+        if now.time() >= self.report_time:
+            for frequency in self.frequencies:
+                if self._last.get(frequency) != now.date() and self._scheduled_on(frequency, now.date()):
+                    self._last[frequency] = now.date()
+                    due.append(frequency)
+
+        for path in sorted(self.request_dir.glob(f'*{REQUEST_SUFFIX}')):
+            frequency = path.name[:-len(REQUEST_SUFFIX)]
+            path.unlink()
+            if frequency not in REPORT_FREQUENCIES:
+                print(f"⚠ Ignoring report request {path.name}: use daily, weekly or monthly{REQUEST_SUFFIX}")
+            elif frequency not in due:
+                due.append(frequency)
+        return sorted(due, key=REPORT_FREQUENCIES.index)
@@ -4,7 +4,7 @@ CSV Exporter for OceanBase capacity assessment reports
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Union
 
 
 class CSVExporter:
@@ -260,20 +260,20 @@ class CSVExporter:
 
     def export_comprehensive_report(
         self,
-        data: List[Dict],
+        data: Union[pd.DataFrame, List[Dict]],
         filename_prefix: str = 'oceanbase_capacity_assessment'
     ) -> str:
         """
         Export comprehensive capacity assessment report to CSV
 
         Args:
-            data: List of comprehensive data dictionaries
+            data: DataFrame or list of comprehensive data dictionaries
             filename_prefix: Prefix for the CSV filename
 
         Returns:
             Path to the created CSV file
         """
-        if not data:
+        if len(data) == 0:
             print("No data to export")
             return None
 
@@ -281,7 +281,7 @@ class CSVExporter:
         filename = f"{filename_prefix}_{timestamp}.csv"
         filepath = self.output_dir / filename
 
-        df = pd.DataFrame(data)
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
         df.to_csv(filepath, index=False)
 
         print(f"✓ Comprehensive report saved to: {filepath}")
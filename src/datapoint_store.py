@@ -0,0 +1,281 @@
+"""
+Local time-series cache of CloudMonitor datapoints (SQLite)
+Weekly and monthly runs re-read the days fetched by earlier runs from disk and
+only request the time ranges that are not cached yet
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+DEFAULT_STORE_FILE = 'datapoints.sqlite'
+
+# Datapoints older than this are deleted when the store is opened
+DEFAULT_RETENTION_DAYS = 40
+
+# CloudMonitor may still revise a period bucket for a while after it closes;
+# newer buckets are reused for the rest of the run but fetched again on the next run
+DEFAULT_SETTLE_SECONDS = 3600
+
+# Seconds to wait for another process holding the database write lock
+SQLITE_BUSY_TIMEOUT = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datapoints (
+    metric_name TEXT NOT NULL,
+    dimensions TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    labels TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (metric_name, dimensions, period, ts, labels)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    metric_name TEXT NOT NULL,
+    dimensions TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    PRIMARY KEY (metric_name, dimensions, period, start_ms)
+) WITHOUT ROWID;
+"""
+
+
+def _labels(dp: Dict) -> str:
+    """Identity of the series a datapoint belongs to (its string dimensions, e.g. obTenantId)"""
+    return json.dumps({key: value for key, value in dp.items() if isinstance(value, str)}, sort_keys=True)
+
+
+class DatapointStore:
+    """
+    Raw DescribeMetricList datapoints keyed by (metric, dimensions, period, timestamp, series)
+
+    A query is identified by its metric name and dimensions JSON, so per-tenant and
+    cluster-wide (all tenants) queries are cached separately. For each query the
+    store keeps the time ranges already fetched (aligned to the period); callers
+    fetch the missing ranges with missing_ranges()/add() and read the whole
+    window back with read(). Each datapoint is returned in the window if its
+    period bucket overlaps the window, as the API does.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+        settle_seconds: int = DEFAULT_SETTLE_SECONDS
+    ):
+        """
+        Open (or create) the store and delete expired datapoints
+
+        Args:
+            path: SQLite database file
+            retention_days: Days of datapoints to keep (default: 40)
+            settle_seconds: Seconds after a bucket closes before it is cached for good (default: 3600)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.settle_seconds = settle_seconds
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        # Shard processes share the file; wait for their write transactions instead of failing
+        self._conn = sqlite3.connect(str(self.path), timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._stats = {'ranges_fetched': 0, 'points_fetched': 0, 'points_cached': 0}
+        # Ranges fetched while the store is open, including buckets that are not settled yet
+        self._session_coverage: Dict[Tuple[str, str, int], List[Tuple[int, int]]] = {}
+        self._readers = threading.local()
+        self._reader_conns: List[sqlite3.Connection] = []
+        # Day-aligned so that cached ranges stay aligned to any period that divides a day
+        self.prune(int(time.time() - retention_days * 86400) // 86400 * 86400 * 1000)
+
+    @staticmethod
+    def _window_start(start_ms: int, period: int) -> int:
+        # The bucket containing start_ms overlaps the window
+        period_ms = period * 1000
+        return start_ms // period_ms * period_ms
+
+    def _coverage(self, metric_name: str, dimensions: str, period: int) -> List[Tuple[int, int]]:
+        return self._conn.execute(
+            'SELECT start_ms, end_ms FROM coverage WHERE metric_name=? AND dimensions=? AND period=? '
+            'ORDER BY start_ms',
+            (metric_name, dimensions, period)
+        ).fetchall()
+
+    def missing_ranges(
+        self,
+        metric_name: str,
+        dimensions: str,
+        period: int,
+        start_ms: int,
+        end_ms: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Time ranges of a window that have to be fetched from CloudMonitor
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string of the query
+            period: Aggregation period in seconds
+            start_ms: Window start (milliseconds since epoch)
+            end_ms: Window end (milliseconds since epoch)
+
+        Returns:
+            List of (start_ms, end_ms) ranges, oldest first (empty if fully cached)
+        """
+        cursor = self._window_start(start_ms, period)
+        missing = []
+        with self._lock:
+            coverage = sorted(
+                self._coverage(metric_name, dimensions, period)
+                + self._session_coverage.get((metric_name, dimensions, period), [])
+            )
+        for covered_start, covered_end in coverage:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end_ms:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end_ms:
+            missing.append((cursor, end_ms))
+        return missing
+
+    def add(
+        self,
+        metric_name: str,
+        dimensions: str,
+        period: int,
+        start_ms: int,
+        end_ms: int,
+        datapoints: List[Dict]
+    ) -> None:
+        """
+        Store the datapoints fetched for one range and mark its settled part as cached
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string of the query
+            period: Aggregation period in seconds
+            start_ms: Start of the fetched range (milliseconds since epoch)
+            end_ms: End of the fetched range (milliseconds since epoch)
+            datapoints: Every datapoint returned for the range
+        """
+        period_ms = period * 1000
+        settled_ms = int((time.time() - self.settle_seconds) * 1000)
+        # Only whole buckets that closed before the settle cutoff count as cached
+        covered_end = min(end_ms, settled_ms) // period_ms * period_ms
+        rows = [
+            (metric_name, dimensions, period, int(dp['timestamp']), _labels(dp), json.dumps(dp))
+            for dp in datapoints if dp.get('timestamp') is not None
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO datapoints VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._session_coverage.setdefault((metric_name, dimensions, period), []).append((start_ms, end_ms))
+            if covered_end > start_ms:
+                self._add_coverage(metric_name, dimensions, period, start_ms, covered_end)
+            self._stats['ranges_fetched'] += 1
+            self._stats['points_fetched'] += len(rows)
+
+    def _add_coverage(self, metric_name: str, dimensions: str, period: int, start_ms: int, end_ms: int) -> None:
+        # Merge the new range with overlapping or adjacent ranges
+        merged: List[List[int]] = []
+        for covered_start, covered_end in sorted(
+            self._coverage(metric_name, dimensions, period) + [(start_ms, end_ms)]
+        ):
+            if merged and covered_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], covered_end)
+            else:
+                merged.append([covered_start, covered_end])
+        self._conn.execute(
+            'DELETE FROM coverage WHERE metric_name=? AND dimensions=? AND period=?',
+            (metric_name, dimensions, period)
+        )
+        self._conn.executemany(
+            'INSERT INTO coverage VALUES (?, ?, ?, ?, ?)',
+            [(metric_name, dimensions, period, merged_start, merged_end) for merged_start, merged_end in merged]
+        )
+
+    def read(
+        self,
+        metric_name: str,
+        dimensions: str,
+        period: int,
+        start_ms: int,
+        end_ms: int,
+        page_size: int = 1440,
+        fetched: int = 0
+    ) -> Iterator[List[Dict]]:
+        """
+        Read the cached datapoints of a window
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string of the query
+            period: Aggregation period in seconds
+            start_ms: Window start (milliseconds since epoch)
+            end_ms: Window end (milliseconds since epoch)
+            page_size: Datapoints per yielded page (default: 1440)
+            fetched: Datapoints of the window fetched from the API by the caller (for statistics)
+
+        Yields:
+            Lists of datapoint dictionaries in timestamp order
+        """
+        count = 0
+        try:
+            cursor = self._reader().execute(
+                'SELECT data FROM datapoints WHERE metric_name=? AND dimensions=? AND period=? '
+                'AND ts>=? AND ts<? ORDER BY ts',
+                (metric_name, dimensions, period, self._window_start(start_ms, period), end_ms)
+            )
+            rows = cursor.fetchmany(page_size)
+            while rows:
+                count += len(rows)
+                yield [json.loads(data) for (data,) in rows]
+                rows = cursor.fetchmany(page_size)
+        finally:
+            with self._lock:
+                self._stats['points_cached'] += max(count - fetched, 0)
+
+    def _reader(self) -> sqlite3.Connection:
+        # Reads stream pages through a connection per thread: an open cursor neither holds
+        # the lock between pages nor is reset by the writes of other threads
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+            self._readers.conn = conn
+            with self._lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    def prune(self, before_ms: int) -> None:
+        """Delete datapoints and cached ranges older than before_ms"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM datapoints WHERE ts<?', (before_ms,))
+            self._conn.execute('DELETE FROM coverage WHERE end_ms<=?', (before_ms,))
+            self._conn.execute('UPDATE coverage SET start_ms=? WHERE start_ms<?', (before_ms, before_ms))
+
+    def new_run(self) -> None:
+        """Start another run on the open store (--daemon): forget unsettled ranges and statistics, delete expired datapoints"""
+        with self._lock:
+            self._stats = {'ranges_fetched': 0, 'points_fetched': 0, 'points_cached': 0}
+            self._session_coverage = {}
+        self.prune(int(time.time() - self.retention_days * 86400) // 86400 * 86400 * 1000)
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of ranges and datapoints fetched from the API and datapoints served from the cache"""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns = []
+            self._conn.close()
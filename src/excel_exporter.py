@@ -5,11 +5,41 @@ Exports multi-tab Excel workbooks with comprehensive reports
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+# Rows (header included) sampled for column widths
+WIDTH_SAMPLE_ROWS = 20
+
+# Header styling
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+HEADER_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+
+# Rows converted to Python values at a time while streaming a sheet
+CHUNK_ROWS = 1000
+
+
+def _excel_rows(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """
+    Rows of a DataFrame as lists of Python values openpyxl can write
+
+    Converted a chunk at a time with vectorized operations; missing values become empty cells.
+    """
+    for offset in range(0, len(df), chunk_rows):
+        chunk = df.iloc[offset:offset + chunk_rows].astype(object)
+        yield from chunk.where(chunk.notna(), None).values.tolist()
+
 
 class ExcelExporter:
     """Export OceanBase data to Excel format with multiple tabs"""
@@ -39,54 +69,45 @@ class ExcelExporter:
         dated_dir.mkdir(exist_ok=True, parents=True)
         return dated_dir
 
-    def _apply_header_formatting(self, worksheet, num_columns: int):
+    def _write_sheet(self, workbook: openpyxl.Workbook, sheet_name: str, df: pd.DataFrame):
         """
-        Apply professional formatting to worksheet headers
+        Stream a DataFrame into a new sheet of a write-only workbook
+
+        Rows are written one at a time, so memory stays flat however many rows
+        the sheet has. Column widths are computed from the header and the first
+        rows before any row is written, as a write-only sheet needs them up front.
 
         Args:
-            worksheet: openpyxl worksheet object
-            num_columns: Number of columns in the sheet
+            workbook: Write-only openpyxl workbook
+            sheet_name: Name of the new sheet
+            df: Rows of the sheet
         """
-        # Header styling
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-        # Border styling
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        # Apply to header row
-        for col_num in range(1, num_columns + 1):
-            cell = worksheet.cell(row=1, column=col_num)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = thin_border
-
-        # Auto-adjust column widths
-        for col_num in range(1, num_columns + 1):
-            column_letter = get_column_letter(col_num)
-            max_length = 0
-            column_cells = worksheet[column_letter]
-
-            for cell in column_cells[:20]:  # Check first 20 rows for width
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
+        worksheet = workbook.create_sheet(title=sheet_name)
 
+        # Auto-adjust column widths from the first WIDTH_SAMPLE_ROWS rows, header included
+        sample = [list(df.columns)] + list(_excel_rows(df.head(WIDTH_SAMPLE_ROWS - 1)))
+        for col_num in range(1, len(df.columns) + 1):
+            max_length = max((len(str(row[col_num - 1])) for row in sample if row[col_num - 1]), default=0)
             adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+            worksheet.column_dimensions[get_column_letter(col_num)].width = adjusted_width
 
         # Freeze the header row
         worksheet.freeze_panes = 'A2'
 
+        # Pre-styled header cells
+        header = []
+        for column in df.columns:
+            cell = WriteOnlyCell(worksheet, value=str(column))
+            cell.fill = HEADER_FILL
+            cell.font = HEADER_FONT
+            cell.alignment = HEADER_ALIGNMENT
+            cell.border = HEADER_BORDER
+            header.append(cell)
+        worksheet.append(header)
+
+        for row in _excel_rows(df):
+            worksheet.append(row)
+
     def export_consolidated_report(
         self,
         capacity_csv_path: str,
@@ -96,7 +117,7 @@ class ExcelExporter:
     ) -> str:
         """
         Export consolidated report with multiple tabs in a single Excel file
-        Reads from CSV files generated by the daily/weekly/monthly extraction
+        Reads from CSV files written earlier (see export_consolidated_data() for in-memory data)
 
         Args:
             capacity_csv_path: Path to capacity assessment CSV file
@@ -110,19 +131,40 @@ class ExcelExporter:
         # Read CSV files
         try:
             df_capacity = pd.read_csv(capacity_csv_path)
-            capacity_data = df_capacity.to_dict('records')
         except Exception as e:
             print(f"Warning: Could not read capacity CSV {capacity_csv_path}: {e}")
             df_capacity = pd.DataFrame()
-            capacity_data = []
 
         try:
             df_tenants = pd.read_csv(tenants_csv_path)
-            tenants_data = df_tenants.to_dict('records')
         except Exception as e:
             print(f"Warning: Could not read tenants CSV {tenants_csv_path}: {e}")
             df_tenants = pd.DataFrame()
-            tenants_data = []
+
+        return self.export_consolidated_data(df_capacity, df_tenants, report_frequency, custom_filename)
+
+    def export_consolidated_data(
+        self,
+        capacity_data: Union[pd.DataFrame, List[Dict]],
+        tenants_data: Union[pd.DataFrame, List[Dict]],
+        report_frequency: str = 'Daily',
+        custom_filename: Optional[str] = None
+    ) -> str:
+        """
+        Export consolidated report with multiple tabs in a single Excel file
+        Every tab is built from one DataFrame per table, without a round trip through files
+
+        Args:
+            capacity_data: Instance rows (DataFrame or list of dictionaries)
+            tenants_data: Tenant rows (DataFrame or list of dictionaries)
+            report_frequency: 'Daily', 'Weekly', or 'Monthly'
+            custom_filename: Optional custom filename (without extension)
+
+        Returns:
+            Path to the created Excel file
+        """
+        df_capacity = capacity_data if isinstance(capacity_data, pd.DataFrame) else pd.DataFrame(capacity_data)
+        df_tenants = tenants_data if isinstance(tenants_data, pd.DataFrame) else pd.DataFrame(tenants_data)
 
         # Create dated directory
         output_dir = self.create_dated_directory(report_frequency)
@@ -136,38 +178,26 @@ class ExcelExporter:
 
         filepath = output_dir / filename
 
-        # Create Excel writer
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Tab 1: Capacity Assessment
-            if not df_capacity.empty:
-                df_capacity_ordered = self._reorder_capacity_columns(df_capacity)
-                df_capacity_ordered.to_excel(writer, sheet_name='Capacity Assessment', index=False)
-
-                # Apply formatting
-                worksheet = writer.sheets['Capacity Assessment']
-                self._apply_header_formatting(worksheet, len(df_capacity_ordered.columns))
+        # Write-only workbook: rows are streamed to the file instead of kept as cell objects
+        workbook = openpyxl.Workbook(write_only=True)
 
-            # Tab 2: Tenants Report
-            if not df_tenants.empty:
-                df_tenants_ordered = self._reorder_tenants_columns(df_tenants)
-                df_tenants_ordered.to_excel(writer, sheet_name='Tenants Report', index=False)
+        # Tab 1: Capacity Assessment
+        if not df_capacity.empty:
+            self._write_sheet(workbook, 'Capacity Assessment', self._reorder_capacity_columns(df_capacity))
 
-                # Apply formatting
-                worksheet = writer.sheets['Tenants Report']
-                self._apply_header_formatting(worksheet, len(df_tenants_ordered.columns))
+        # Tab 2: Tenants Report
+        if not df_tenants.empty:
+            self._write_sheet(workbook, 'Tenants Report', self._reorder_tenants_columns(df_tenants))
 
-            # Tab 3: Summary Statistics
-            if capacity_data:
-                summary_df = self._generate_summary_statistics(capacity_data)
-                summary_df.to_excel(writer, sheet_name='Summary Statistics', index=False)
+        # Tab 3: Summary Statistics
+        if not df_capacity.empty:
+            self._write_sheet(workbook, 'Summary Statistics', self._generate_summary_statistics(df_capacity))
 
-                # Apply formatting
-                worksheet = writer.sheets['Summary Statistics']
-                self._apply_header_formatting(worksheet, len(summary_df.columns))
+        workbook.save(filepath)
 
         print(f"✓ Consolidated {report_frequency} report saved to: {filepath}")
-        print(f"  - Capacity Assessment: {len(capacity_data)} instances")
-        print(f"  - Tenants Report: {len(tenants_data)} tenants")
+        print(f"  - Capacity Assessment: {len(df_capacity)} instances")
+        print(f"  - Tenants Report: {len(df_tenants)} tenants")
         print(f"  - Report Type: {report_frequency}")
 
         return str(filepath)
@@ -193,7 +223,7 @@ class ExcelExporter:
         df_renamed = df.rename(columns=rename_map)
 
         column_order = [
-            'instance_id', 'instance_name', 'status', 'series',
+            'region', 'instance_id', 'instance_name', 'status', 'series',
 
             # CPU Capacity Allocation (Capacity Center fields)
             'total_cpu', 'allocated_cpu', 'available_cpu',
@@ -276,7 +306,7 @@ class ExcelExporter:
 
         # Column order as specified by user
         column_order = [
-            'instance_id', 'instance_name', 'tenant_id', 'tenant_name',
+            'region', 'instance_id', 'instance_name', 'tenant_id', 'tenant_name',
             'tenant_mode',
 
             # Tenant Resource Allocation
@@ -340,9 +370,8 @@ class ExcelExporter:
 
         return df[final_columns]
 
-    def _generate_summary_statistics(self, capacity_data: List[Dict]) -> pd.DataFrame:
-        """Generate summary statistics from capacity data"""
-        df = pd.DataFrame(capacity_data)
+    def _generate_summary_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Generate summary statistics from the capacity DataFrame"""
 
         summary_rows = []
 
@@ -353,6 +382,14 @@ class ExcelExporter:
             'Unit': 'count'
         })
 
+        # Regions (multi-region runs)
+        if 'region' in df.columns and df['region'].nunique() > 1:
+            summary_rows.append({
+                'Metric': 'Regions',
+                'Value': df['region'].nunique(),
+                'Unit': 'count'
+            })
+
         # Online instances
         if 'status' in df.columns:
             online_count = len(df[df['status'] == 'ONLINE'])
@@ -451,7 +488,7 @@ class ExcelExporter:
         # Aggregate weekly data (you can customize aggregation logic)
         weekly_capacity = self._aggregate_reports(daily_reports, 'weekly')
 
-        return self.export_consolidated_report(
+        return self.export_consolidated_data(
             capacity_data=weekly_capacity,
             tenants_data=[],  # You can aggregate tenant data similarly
             report_frequency='Weekly',
@@ -482,7 +519,7 @@ class ExcelExporter:
         # Aggregate monthly data
         monthly_capacity = self._aggregate_reports(daily_reports, 'monthly')
 
-        return self.export_consolidated_report(
+        return self.export_consolidated_data(
             capacity_data=monthly_capacity,
             tenants_data=[],  # You can aggregate tenant data similarly
             report_frequency='Monthly',
@@ -0,0 +1,460 @@
+"""
+Staged producer/consumer extraction pipeline
+discover → describe instance → list tenants → describe tenant → fetch metrics → aggregate → sink,
+each stage with its own worker budget and a bounded input queue
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from oceanbase_client import OceanBaseReporter
+
+# Items waiting in each stage queue; a full queue blocks the upstream stage (backpressure)
+DEFAULT_QUEUE_SIZE = 100
+
+# Seconds between pipeline status lines (0 disables them)
+DEFAULT_STATUS_INTERVAL = 30
+
+_STOP = object()
+
+
+class PipelineStage:
+    """One pipeline stage: a bounded input queue drained by a fixed number of worker threads"""
+
+    def __init__(self, name: str, fn: Callable, workers: int, queue_size: int):
+        """
+        Initialize stage
+
+        Args:
+            name: Stage name, used by emit() and in statistics
+            fn: Callable taking (item, emit) for every item of the stage
+            workers: Worker threads draining the queue
+            queue_size: Maximum items waiting in the queue (0 = unbounded)
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = max(workers, 1)
+        self.queue: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.puts = 0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def stats(self) -> Dict:
+        """Processed items, errors, queue depth and throughput of the stage"""
+        active = (self.last_end - self.first_start) if self.first_start and self.last_end else 0.0
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'errors': self.errors,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'avg_queue_depth': self.depth_total / self.puts if self.puts else 0.0,
+            'busy_seconds': self.busy_seconds,
+            'throughput': self.processed / active if active > 0 else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    Generic staged pipeline with bounded queues
+
+    Stage functions receive (item, emit) and pass work downstream with
+    emit(stage_name, item), which blocks while the target queue is full.
+    Stages must form a DAG (no stage may emit into itself or an upstream
+    stage), so blocking puts cannot deadlock. run() feeds the source items
+    into the first stage from the calling thread and returns once every
+    emitted item has been processed.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, status_interval: float = DEFAULT_STATUS_INTERVAL):
+        """
+        Initialize pipeline
+
+        Args:
+            queue_size: Maximum items waiting per stage (default: 100)
+            status_interval: Seconds between status lines while running, 0 to disable (default: 30)
+        """
+        self.queue_size = queue_size
+        self.status_interval = status_interval
+        self.stages: Dict[str, PipelineStage] = {}
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._source = PipelineStage('discover', None, 1, 0)
+
+    def add_stage(self, name: str, fn: Callable, workers: int) -> None:
+        """
+        Add a stage (in pipeline order)
+
+        Args:
+            name: Stage name
+            fn: Callable taking (item, emit)
+            workers: Worker threads of the stage
+        """
+        self.stages[name] = PipelineStage(name, fn, workers, self.queue_size)
+
+    def emit(self, stage_name: str, item) -> None:
+        """Queue an item for a stage, blocking while its queue is full"""
+        stage = self.stages[stage_name]
+        with self._cond:
+            self._in_flight += 1
+        stage.queue.put(item)
+        depth = stage.queue.qsize()
+        with self._cond:
+            stage.puts += 1
+            stage.depth_total += depth
+            stage.max_depth = max(stage.max_depth, depth)
+
+    def _worker(self, stage: PipelineStage) -> None:
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                return
+            started = time.monotonic()
+            with self._cond:
+                stage.busy += 1
+                if stage.first_start is None:
+                    stage.first_start = started
+            try:
+                stage.fn(item, self.emit)
+            except Exception as e:
+                with self._cond:
+                    stage.errors += 1
+                print(f"⚠ Pipeline stage {stage.name} failed: {str(e)}")
+            finished = time.monotonic()
+            with self._cond:
+                stage.busy -= 1
+                stage.processed += 1
+                stage.busy_seconds += finished - started
+                stage.last_end = finished
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def _print_status(self) -> None:
+        parts = [f"{name} {stage.queue.qsize()} queued/{stage.busy} busy/{stage.processed} done"
+                 for name, stage in self.stages.items()]
+        print(f"  Pipeline: {', '.join(parts)}")
+
+    def _monitor(self, finished: threading.Event) -> None:
+        while not finished.wait(self.status_interval):
+            self._print_status()
+
+    def run(self, items: Iterable, first_stage: str) -> None:
+        """
+        Feed items into first_stage and wait until the pipeline is drained
+
+        Args:
+            items: Source items (may be a generator that keeps producing while stages run)
+            first_stage: Stage receiving the source items
+        """
+        threads = [
+            threading.Thread(target=self._worker, args=(stage,), name=f'pipeline-{name}-{n}', daemon=True)
+            for name, stage in self.stages.items()
+            for n in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished = threading.Event()
+        if self.status_interval and self.status_interval > 0:
+            threading.Thread(target=self._monitor, args=(finished,), name='pipeline-monitor', daemon=True).start()
+
+        source = self._source
+        source.first_start = time.monotonic()
+        try:
+            for item in items:
+                self.emit(first_stage, item)
+                source.processed += 1
+                source.last_end = time.monotonic()
+            with self._cond:
+                self._cond.wait_for(lambda: self._in_flight == 0)
+        finally:
+            finished.set()
+
+        # Every queue is empty now; stop the workers
+        for stage in self.stages.values():
+            for _ in range(stage.workers):
+                stage.queue.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Statistics of every stage, the source ('discover') first"""
+        with self._cond:
+            stats = {self._source.name: self._source.stats()}
+            stats.update((name, stage.stats()) for name, stage in self.stages.items())
+        return stats
+
+
+class InstanceJob:
+    """One instance travelling through the extraction pipeline"""
+
+    def __init__(self, idx: int, region: str, instance_id: str, reporter: OceanBaseReporter):
+        """
+        Initialize job
+
+        Args:
+            idx: 1-based discovery order
+            region: Region of the instance
+            instance_id: OceanBase instance ID
+            reporter: Reporter bound to the instance's region
+        """
+        self.idx = idx
+        self.region = region
+        self.instance_id = instance_id
+        self.reporter = reporter
+        self.instance_name = instance_id
+        self.details: Optional[Dict] = None
+        self.utilization: Optional[Dict] = None
+        self.tenants: List[Dict] = []
+        self.tenant_details: Dict[str, Optional[Dict]] = {}
+        self.tenant_metrics: Dict[str, Dict] = {}
+        self.success = False
+        # Parts the aggregate stage still has to receive before the instance is complete
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def expect(self, parts: int) -> None:
+        """Announce parts before emitting them to the aggregate stage"""
+        with self._lock:
+            self._pending += parts
+
+    def receive(self) -> bool:
+        """Count one received part; True once every announced part arrived"""
+        with self._lock:
+            self._pending -= 1
+            return self._pending == 0
+
+
+class ExtractionPipeline:
+    """
+    Extract instances and tenants through a staged pipeline on threaded reporters
+
+    Stages and their worker budgets:
+    - describe_instance, list_tenants: instance_workers each
+    - describe_tenant, fetch_metrics: tenant_workers each (instance utilization,
+      per-tenant or batched tenant metrics)
+    - aggregate, sink: one worker each
+
+    A slow instance only occupies the workers handling its own items, so other
+    instances keep moving through the earlier stages. Instances of several
+    regions share the same stages, each using its region's reporter, and every
+    instance and tenant row gets a 'region' field. Results reach on_result
+    in completion order as the same (instance_data, tenants, instance_name, success)
+    tuples the per-instance workers used to return.
+    """
+
+    def __init__(
+        self,
+        reporters: Dict[str, OceanBaseReporter],
+        start_time: str,
+        end_time: str,
+        period_desc: str,
+        on_result: Callable[[int, str, Tuple], None],
+        prepare_instance: Optional[Callable[[Dict], Dict]] = None,
+        instance_workers: int = 10,
+        tenant_workers: int = 20,
+        batch_metrics: bool = True,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        status_interval: float = DEFAULT_STATUS_INTERVAL
+    ):
+        """
+        Initialize extraction pipeline
+
+        Args:
+            reporters: Threaded OceanBase reporter of every region ({region: reporter})
+            start_time: Start time in ISO format
+            end_time: End time in ISO format
+            period_desc: Period description for utilization output
+            on_result: Called with (idx, instance_id, result tuple) for every instance, from the sink stage
+            prepare_instance: Builds the instance row from instance details (default: a copy)
+            instance_workers: Workers of the describe_instance and list_tenants stages (default: 10)
+            tenant_workers: Workers of the describe_tenant and fetch_metrics stages (default: 20)
+            batch_metrics: Fetch tenant metrics with one query per metric for all tenants of an instance
+            queue_size: Maximum items waiting per stage (default: 100)
+            status_interval: Seconds between status lines, 0 to disable (default: 30)
+        """
+        self.reporters = reporters
+        self.start_time = start_time
+        self.end_time = end_time
+        self.period_desc = period_desc
+        self.on_result = on_result
+        self.prepare_instance = prepare_instance or dict
+        self.tenant_workers = tenant_workers
+        self.batch_metrics = batch_metrics
+
+        self.pipeline = Pipeline(queue_size=queue_size, status_interval=status_interval)
+        self.pipeline.add_stage('describe_instance', self._describe_instance, instance_workers)
+        self.pipeline.add_stage('list_tenants', self._list_tenants, instance_workers)
+        self.pipeline.add_stage('describe_tenant', self._describe_tenant, tenant_workers)
+        self.pipeline.add_stage('fetch_metrics', self._fetch_metrics, tenant_workers)
+        self.pipeline.add_stage('aggregate', self._aggregate, 1)
+        self.pipeline.add_stage('sink', self._sink, 1)
+
+    def run(self, instances: Iterable[Tuple[str, str]]) -> None:
+        """
+        Extract every instance and wait until all results reached on_result
+
+        Args:
+            instances: (region, instance_id) pairs (may be a discovery generator)
+        """
+        self.pipeline.run(
+            (InstanceJob(idx, region, instance_id, self.reporters[region])
+             for idx, (region, instance_id) in enumerate(instances, 1)),
+            'describe_instance'
+        )
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-stage statistics (see Pipeline.stats())"""
+        return self.pipeline.stats()
+
+    def _describe_instance(self, job: InstanceJob, emit: Callable) -> None:
+        """Instance details; the instance is then listed and its utilization fetched in parallel"""
+        try:
+            job.details = job.reporter.get_instance_details(job.instance_id)
+        except Exception as e:
+            print(f"\n⚠️  Error processing instance {job.instance_id}: {str(e)}")
+        if not job.details:
+            emit('sink', job)
+            return
+
+        job.instance_name = job.details.get('instance_name', 'N/A')
+        # Utilization metrics and the tenant listing
+        job.expect(2)
+        emit('fetch_metrics', ('instance', job, None))
+        emit('list_tenants', job)
+
+    def _list_tenants(self, job: InstanceJob, emit: Callable) -> None:
+        try:
+            job.tenants = job.reporter.list_tenants(job.instance_id)
+        except Exception as e:
+            print(f"Error listing tenants for instance {job.instance_id}: {str(e)}")
+            job.tenants = []
+
+        batch = self.batch_metrics and bool(job.tenants)
+        # Details of every tenant, plus either one batch query or metrics per tenant
+        job.expect(len(job.tenants) + (1 if batch else len(job.tenants)))
+        for tenant in job.tenants:
+            tenant['region'] = job.region
+            tenant['instance_id'] = job.instance_id
+            tenant['instance_name'] = job.instance_name
+            emit('describe_tenant', (job, tenant))
+        if batch:
+            emit('fetch_metrics', ('batch', job, None))
+        emit('aggregate', (job, 'tenants', None, None))
+
+    def _describe_tenant(self, item: Tuple[InstanceJob, Dict], emit: Callable) -> None:
+        job, tenant = item
+        details = None
+        try:
+            details = job.reporter.get_tenant_details(job.instance_id, tenant['tenant_id'])
+        except Exception as e:
+            print(f"Error getting tenant details for {tenant['tenant_id']}: {str(e)}")
+        emit('aggregate', (job, 'tenant_details', tenant['tenant_id'], details))
+        if not self.batch_metrics:
+            emit('fetch_metrics', ('tenant', job, tenant))
+
+    def _fetch_metrics(self, item: Tuple[str, InstanceJob, Optional[Dict]], emit: Callable) -> None:
+        kind, job, tenant = item
+        if kind == 'instance':
+            utilization = None
+            try:
+                utilization = job.reporter.get_utilization_metrics(
+                    job.instance_id,
+                    start_time=self.start_time,
+                    end_time=self.end_time,
+                    period_desc=self.period_desc
+                )
+            except Exception as e:
+                print(f"\n⚠️  Error fetching utilization metrics for {job.instance_id}: {str(e)}")
+            emit('aggregate', (job, 'utilization', None, utilization))
+        elif kind == 'tenant':
+            metrics = {}
+            try:
+                metrics = job.reporter.get_tenant_metrics(
+                    job.instance_id, tenant['tenant_id'], start_time=self.start_time, end_time=self.end_time
+                )
+            except Exception as e:
+                print(f"      ⚠ Error fetching metrics for tenant {tenant['tenant_id']}: {str(e)}")
+            emit('aggregate', (job, 'tenant_metrics', tenant['tenant_id'], metrics))
+        else:
+            metrics_by_tenant = {}
+            try:
+                metrics_by_tenant = self._fetch_batch_metrics(job)
+            except Exception as e:
+                print(f"      ⚠ Error fetching tenant metrics for {job.instance_id}: {str(e)}")
+            emit('aggregate', (job, 'batch_metrics', None, metrics_by_tenant))
+
+    def _fetch_batch_metrics(self, job: InstanceJob) -> Dict[str, Dict]:
+        """Batched tenant metrics of an instance, with the same per-tenant fallbacks as fetch_tenants_parallel"""
+        tenant_ids = [tenant['tenant_id'] for tenant in job.tenants]
+        batch_results, failed_metrics = job.reporter.get_tenant_metrics_batch(
+            job.instance_id, tenant_ids, start_time=self.start_time, end_time=self.end_time
+        )
+        # No data for any tenant (e.g. cluster-wide dimension not supported): use per-tenant queries
+        if not any(batch_results.values()):
+            print(f"    ⚠ Batch metric query returned no data for {job.instance_id}, falling back to per-tenant queries")
+            batch_results, failed_metrics = {}, None
+        elif not failed_metrics:
+            return {tenant_id: dict(batch_results.get(tenant_id, {})) for tenant_id in tenant_ids}
+
+        fallback = job.reporter.scheduler.map(
+            lambda tenant_id: job.reporter.get_tenant_metrics(
+                job.instance_id, tenant_id, start_time=self.start_time, end_time=self.end_time,
+                metric_names=failed_metrics
+            ),
+            tenant_ids,
+            self.tenant_workers
+        )
+        metrics_by_tenant = {}
+        for tenant_id, tenant_metrics in zip(tenant_ids, fallback):
+            metrics_by_tenant[tenant_id] = dict(batch_results.get(tenant_id, {}))
+            metrics_by_tenant[tenant_id].update(tenant_metrics)
+        return metrics_by_tenant
+
+    def _aggregate(self, item: Tuple[InstanceJob, str, Optional[str], object], emit: Callable) -> None:
+        """Merge the parts of an instance; the complete instance goes to the sink"""
+        job, kind, tenant_id, payload = item
+        if kind == 'utilization':
+            job.utilization = payload
+        elif kind == 'tenant_details':
+            job.tenant_details[tenant_id] = payload
+        elif kind == 'tenant_metrics':
+            job.tenant_metrics[tenant_id] = payload
+        elif kind == 'batch_metrics':
+            job.tenant_metrics.update(payload)
+        if not job.receive():
+            return
+
+        # The instance reaches the sink either way, so a failure is reported instead of losing the instance
+        try:
+            instance_data = {'region': job.region}
+            instance_data.update(self.prepare_instance(job.details))
+            if job.utilization:
+                instance_data.update(job.utilization)
+            for tenant in job.tenants:
+                if job.tenant_details.get(tenant['tenant_id']):
+                    tenant.update(job.tenant_details[tenant['tenant_id']])
+                if job.tenant_metrics.get(tenant['tenant_id']):
+                    tenant.update(job.tenant_metrics[tenant['tenant_id']])
+                job.reporter.convert_tenant_disk_metrics(tenant)
+        except Exception as e:
+            print(f"\n⚠️  Error processing instance {job.instance_id}: {str(e)}")
+            emit('sink', job)
+            return
+        job.details = instance_data
+        job.success = True
+        emit('sink', job)
+
+    def _sink(self, job: InstanceJob, emit: Callable) -> None:
+        if job.success:
+            result = (job.details, job.tenants, job.instance_name, True)
+        else:
+            result = (None, [], job.instance_id, False)
+        self.on_result(job.idx, job.instance_id, result)
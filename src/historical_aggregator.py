@@ -1,29 +1,565 @@
 """
 Historical Data Aggregator for OceanBase Reports
-Aggregates daily CSV reports into weekly and monthly summaries
+Aggregates daily reports (Parquet history or CSV files) into weekly and monthly summaries
 """
+import json
+import math
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import glob
 
+from metric_stats import DEFAULT_RELATIVE_ACCURACY, QuantileSketch
+from parquet_exporter import HISTORY_DIR, TABLES
+
+
+def report_date(filepath: str) -> str:
+    """
+    Extraction date (YYYYMMDD) of a daily report file
+
+    Parquet files take it from their date=YYYYMMDD partition directory, CSV files
+    from their name (oceanbase_capacity_assessment_YYYYMMDD_HHMMSS.csv).
+    """
+    path = Path(filepath)
+    if path.suffix == '.parquet':
+        return path.parent.name.split('=', 1)[1]
+    return path.name.split('_')[-2]
+
+
+def read_report(filepath: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a daily report file, optionally only some of its columns
+
+    Parquet files only read the requested column chunks; dictionary-encoded
+    string columns come back as plain strings.
+
+    Args:
+        filepath: Parquet or CSV report file
+        columns: Columns to read (default: all; columns missing from the file are ignored)
+
+    Returns:
+        DataFrame of the report
+    """
+    if Path(filepath).suffix != '.parquet':
+        if columns is None:
+            return pd.read_csv(filepath)
+        wanted = set(columns)
+        return pd.read_csv(filepath, usecols=lambda column: column in wanted)
+
+    if columns is not None:
+        available = set(pq.read_schema(filepath).names)
+        columns = [column for column in columns if column in available]
+    table = pq.read_table(filepath, columns=columns)
+    table = table.cast(pa.schema([
+        pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+        for field in table.schema
+    ]))
+    return table.to_pandas()
+
+
+# Capacity metrics containing one of these names keep their HIGHEST value; other
+# numeric capacity columns take the latest value
+UTILIZATION_COLUMNS = ('cpu_avg', 'cpu_max', 'cpu_p95',
+                       'memory_avg', 'memory_max', 'memory_p95',
+                       'disk_utilization_pct')
+
+KEY_COLUMNS = {
+    'capacity': ['instance_id'],
+    'tenants': ['instance_id', 'tenant_id'],
+}
+
+# Descriptive columns: latest value per instance, first value per tenant
+CATEGORICAL_COLUMNS = {
+    'capacity': ('instance_name', 'status', 'series', 'zones', 'version',
+                 'create_time', 'expire_time', 'disk_type'),
+    'tenants': ('instance_name', 'tenant_name', 'status', 'tenant_mode', 'charset'),
+}
+
+# Partial statistic of each role, and how partials of the same statistic combine
+ROLE_STATS = {
+    'max': ('max',),
+    'last': ('last',),
+    'first': ('first',),
+    'min_max_mean': ('min', 'max', 'sum', 'count'),
+}
+MERGE_STATS = {'max': 'max', 'min': 'min', 'last': 'last', 'first': 'first', 'sum': 'sum', 'count': 'sum'}
+
+DEFAULT_READ_WORKERS = 8
+
+# Per-day partials of daily runs: history/rollups/<table>/date=YYYYMMDD.parquet
+ROLLUP_DIR = 'rollups'
+
+# Metrics combined across days also keep a quantile sketch of their daily values:
+# QuantileSketch bucket counts, so the sketches of any days merge by adding counts
+SKETCH_ROLES = ('min_max_mean', 'max')
+# Capacity statistics of a metric series (e.g. qps_avg) keep their latest value, but are sketched too
+SERIES_SUFFIXES = ('_avg', '_min', '_max', '_p95')
+SKETCH_ACCURACY = DEFAULT_RELATIVE_ACCURACY
+SKETCH_QUANTILE = 0.95
+
+
+@lru_cache(maxsize=None)
+def column_roles(table: str, columns: Tuple[Tuple[str, bool], ...]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Aggregation role of every column of a report table, computed once per set of columns
+
+    Args:
+        table: 'capacity' or 'tenants'
+        columns: (column name, is numeric) in table order
+
+    Returns:
+        (column, role) in output order; role is 'max', 'last', 'first' or 'min_max_mean'
+    """
+    keys = KEY_COLUMNS[table]
+    roles = {}
+    for column, numeric in columns:
+        if not numeric or column in keys:
+            continue
+        if table == 'tenants':
+            roles[column] = 'min_max_mean'
+        elif any(util in column for util in UTILIZATION_COLUMNS):
+            # Get HIGHEST utilization
+            roles[column] = 'max'
+        else:
+            # For capacity metrics, take the latest value
+            roles[column] = 'last'
+
+    present = {column for column, _ in columns}
+    for column in CATEGORICAL_COLUMNS[table]:
+        if column in present:
+            roles[column] = 'last' if table == 'capacity' else 'first'
+    return tuple(roles.items())
+
+
+def rollup_path(output_dir: str, table: str, date_str: str) -> Path:
+    """Persisted partials of one day of a table (see HistoricalAggregator.update_daily_rollups())"""
+    return Path(output_dir) / HISTORY_DIR / ROLLUP_DIR / table / f'date={date_str}.parquet'
+
+
+def sketch_counts(values: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    QuantileSketch bucket counts of many values, computed in one pass
+
+    Args:
+        values: Key columns, 'metric' and 'value' (no missing values)
+        keys: Columns identifying an instance or tenant
+
+    Returns:
+        Key columns, 'metric', 'sign' (-1, 0, 1), 'bucket' (QuantileSketch key) and 'count'
+    """
+    value = values['value'].to_numpy(dtype='float64')
+    magnitude = np.abs(value)
+    indexable = magnitude > QuantileSketch.MIN_INDEXABLE
+    bucket = np.zeros(len(value), dtype='int64')
+    bucket[indexable] = np.ceil(np.log(magnitude[indexable]) * (1 / math.log(QuantileSketch(SKETCH_ACCURACY).gamma)))
+    counts = values[keys + ['metric']].assign(sign=np.where(indexable, np.sign(value), 0).astype('int8'), bucket=bucket)
+    return counts.groupby(keys + ['metric', 'sign', 'bucket'], sort=False, observed=True).size().rename('count').reset_index()
+
+
+def sketch_rows(counts: pd.DataFrame, keys: List[str], index: pd.Index) -> np.ndarray:
+    """Positions in a rollup's rows of the instances/tenants of bucket counts"""
+    return index.get_indexer(pd.MultiIndex.from_frame(counts[keys]) if len(keys) > 1 else pd.Index(counts[keys[0]]))
+
+
+def sketch_quantiles(counts: pd.DataFrame, keys: List[str], index: pd.Index, q: float) -> pd.DataFrame:
+    """
+    Nearest-rank quantile of every sketch (as QuantileSketch.quantile_at_rank())
+
+    Args:
+        counts: Bucket counts (see sketch_counts())
+        keys: Columns identifying an instance or tenant
+        index: Rows of the rollup
+        q: Quantile in [0, 1]
+
+    Returns:
+        One column per metric and one row per instance/tenant (NaN without values)
+    """
+    if counts.empty:
+        return pd.DataFrame(index=index)
+    metrics = pd.Categorical(counts['metric'])
+    sign = counts['sign'].to_numpy()
+    bucket = counts['bucket'].to_numpy()
+    # Values in sorted order within each sketch: negative buckets from the highest key down, zero, positive buckets up
+    group = metrics.codes.astype('int64') * len(index) + sketch_rows(counts, keys, index)
+    order = np.lexsort((sign * bucket, sign, group))
+    group, sign, bucket = group[order], sign[order], bucket[order]
+    count = counts['count'].to_numpy()[order]
+
+    cumulative = count.cumsum()
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    lengths = np.diff(np.r_[starts, len(group)])
+    within = cumulative - np.repeat(cumulative[starts] - count[starts], lengths)
+    total = np.repeat(within[np.r_[starts[1:], len(group)] - 1], lengths)
+    rank = np.minimum((total * q).astype('int64'), total - 1)
+    found = np.flatnonzero(within > rank)
+    found = found[np.r_[True, group[found][1:] != group[found][:-1]]]
+
+    # Midpoint of the bucket, as QuantileSketch
+    gamma = QuantileSketch(SKETCH_ACCURACY).gamma
+    values = np.full(len(metrics.categories) * len(index), np.nan)
+    values[group[found]] = sign[found] * 2 * gamma ** bucket[found].astype('float64') / (gamma + 1)
+    return pd.DataFrame(values.reshape(len(metrics.categories), len(index)).T, index=index, columns=metrics.categories)
+
+
+def sketch_array(rows: np.ndarray, counts: pd.DataFrame, size: int) -> pa.StructArray:
+    """
+    Arrow column of the sketches of one metric, with the fields of QuantileSketch.to_dict()
+
+    Args:
+        rows: Positions of the bucket counts in the rollup's rows
+        counts: Bucket counts of the metric (see sketch_counts())
+        size: Number of rows of the rollup
+
+    Returns:
+        Struct array of positive and negative (bucket key to count maps) and zero_count, one per row
+    """
+    order = np.lexsort((counts['bucket'].to_numpy(), rows))
+    rows, sign = rows[order], counts['sign'].to_numpy()[order]
+    bucket, count = counts['bucket'].to_numpy()[order], counts['count'].to_numpy()[order]
+    fields = {}
+    for name, value in (('positive', 1), ('negative', -1)):
+        part = sign == value
+        offsets = np.r_[0, np.bincount(rows[part], minlength=size).cumsum()]
+        fields[name] = pa.MapArray.from_arrays(
+            pa.array(offsets, pa.int32()), pa.array(bucket[part], pa.int32()), pa.array(count[part], pa.int64())
+        )
+    zero = sign == 0
+    fields['zero_count'] = pa.array(np.bincount(rows[zero], weights=count[zero], minlength=size).astype('int64'))
+    return pa.StructArray.from_arrays(list(fields.values()), names=list(fields))
+
+
+def sketch_counts_from_array(array: pa.StructArray) -> Dict[str, np.ndarray]:
+    """Bucket counts of a sketch column written by sketch_array(): 'row', 'sign', 'bucket' and 'count' arrays"""
+    parts = []
+    for name, sign in (('positive', 1), ('negative', -1)):
+        maps = array.field(name)
+        parts.append((
+            np.repeat(np.arange(len(maps)), np.diff(maps.offsets.to_numpy())),
+            np.full(len(maps.keys), sign, dtype='int8'), maps.keys.to_numpy(), maps.items.to_numpy()
+        ))
+    zero = array.field('zero_count').to_numpy()
+    rows = np.flatnonzero(zero)
+    parts.append((rows, np.zeros(len(rows), dtype='int8'), np.zeros(len(rows), dtype='int64'), zero[rows]))
+    return {
+        name: np.concatenate([part[position] for part in parts]).astype(dtype)
+        for position, (name, dtype) in enumerate((('row', 'int64'), ('sign', 'int8'), ('bucket', 'int64'), ('count', 'int64')))
+    }
+
+
+class Rollup:
+    """
+    Mergeable partial aggregates of daily reports, per instance (capacity) or tenant (tenants)
+
+    Every statistic of the aggregated report is kept as a partial that can be
+    combined with the partials of more days: max, min, latest/first value, and
+    sum and count for means. Adding a day therefore only reads that day, and
+    rollups of separate periods (e.g. single days) merge into longer ones.
+
+    With sketches, the metrics (see SKETCH_ROLES) also keep QuantileSketch bucket
+    counts of their values, and the result gets a <column>_daily_p95 column: the
+    95th percentile of the days, within the sketch's relative accuracy.
+    """
+
+    def __init__(self, table: str, sketches: bool = False):
+        """
+        Initialize an empty rollup
+
+        Args:
+            table: 'capacity' or 'tenants'
+            sketches: Keep quantile sketches of the metrics (see SKETCH_ROLES)
+        """
+        self.table = table
+        self.keys = KEY_COLUMNS[table]
+        self.use_sketches = sketches
+        self.roles: Dict[str, str] = {}
+        self.files: List[str] = []
+        self.partials: Optional[pd.DataFrame] = None
+        # Bucket counts of all sketched metrics (see sketch_counts())
+        self.sketches: Optional[pd.DataFrame] = None
+
+    @property
+    def dates(self) -> List[str]:
+        """Report dates (YYYYMMDD) of the files in the rollup"""
+        return sorted({report_date(filepath) for filepath in self.files})
+
+    def _partials(self, df: pd.DataFrame, roles: Dict[str, str]) -> pd.DataFrame:
+        """Partial statistics of a batch of rows: one groupby, one reduction per statistic"""
+        grouped = df.groupby(self.keys, sort=True)
+        columns_by_stat: Dict[str, List[str]] = {}
+        for column, role in roles.items():
+            for stat in ROLE_STATS[role]:
+                columns_by_stat.setdefault(stat, []).append(column)
+
+        parts = []
+        for stat, stat_columns in columns_by_stat.items():
+            if stat == 'sum':
+                part = grouped[stat_columns].sum(min_count=1)
+            else:
+                part = getattr(grouped[stat_columns], stat)()
+            parts.append(part.add_suffix(f'|{stat}'))
+        return pd.concat(parts, axis=1)
+
+    def _sketches(self, df: pd.DataFrame, roles: Dict[str, str]) -> Optional[pd.DataFrame]:
+        """Sketch bucket counts of the metrics of a batch of rows, counted in one groupby"""
+        columns = [
+            column for column, role in roles.items()
+            if column not in CATEGORICAL_COLUMNS[self.table] and (
+                role in SKETCH_ROLES or (self.table == 'capacity' and column.endswith(SERIES_SUFFIXES))
+            )
+        ]
+        if not columns:
+            return None
+
+        values = df[self.keys + columns].melt(id_vars=self.keys, var_name='metric', value_name='value')
+        return sketch_counts(values.dropna(subset=['value']), self.keys)
+
+    def add(self, df: pd.DataFrame, file_paths: List[str]) -> None:
+        """
+        Add the rows of daily reports that are newer than everything in the rollup
+
+        Args:
+            df: Rows of the reports, in chronological order
+            file_paths: Report files the rows come from
+        """
+        new_roles = dict(column_roles(
+            self.table,
+            tuple((str(column), pd.api.types.is_numeric_dtype(dtype)) for column, dtype in df.dtypes.items())
+        ))
+        for column, role in self.roles.items():
+            if column in df.columns and role != new_roles.get(column):
+                # Roles are fixed by the first batch; a metric that is empty in this
+                # batch is read back as text, so coerce it to numbers
+                new_roles[column] = role
+                if column not in CATEGORICAL_COLUMNS[self.table]:
+                    df[column] = pd.to_numeric(df[column], errors='coerce')
+        for column, role in new_roles.items():
+            self.roles.setdefault(column, role)
+
+        self._merge([self._partials(df, new_roles)], [self._sketches(df, new_roles)] if self.use_sketches else [])
+        self.files.extend(file_paths)
+
+    def _merge(self, partials: List[pd.DataFrame], sketches: List[Optional[pd.DataFrame]]) -> None:
+        """Combine newer partials (oldest first) into the rollup with one groupby"""
+        levels = list(range(len(self.keys)))
+        counts = [batch for batch in [self.sketches] + sketches if batch is not None]
+        if len(counts) > 1:
+            self.sketches = (
+                pd.concat(counts, ignore_index=True)
+                .groupby(self.keys + ['metric', 'sign', 'bucket'], sort=False, observed=True)['count'].sum().reset_index()
+            )
+        elif counts:
+            self.sketches = counts[0]
+
+        if self.partials is not None:
+            partials = [self.partials] + partials
+        if len(partials) == 1:
+            self.partials = partials[0]
+            return
+
+        combined = pd.concat(partials)
+        grouped = combined.groupby(level=levels, sort=True)
+        columns_by_merge: Dict[str, List[str]] = {}
+        for column in combined.columns:
+            columns_by_merge.setdefault(MERGE_STATS[column.rsplit('|', 1)[1]], []).append(column)
+
+        parts = []
+        for merge, merge_columns in columns_by_merge.items():
+            if merge == 'sum':
+                parts.append(grouped[merge_columns].sum(min_count=1))
+            else:
+                parts.append(getattr(grouped[merge_columns], merge)())
+        self.partials = pd.concat(parts, axis=1)[list(combined.columns)]
+
+    def merge(self, others: List['Rollup']) -> None:
+        """
+        Add rollups of the same table covering later periods
+
+        Args:
+            others: Rollups in chronological order, whose reports are all newer than this rollup's
+        """
+        others = [other for other in others if other.partials is not None]
+        if not others:
+            return
+        for other in others:
+            for column, role in other.roles.items():
+                self.roles.setdefault(column, role)
+            self.files.extend(other.files)
+        self._merge(
+            [other.partials for other in others],
+            [other.sketches for other in others] if self.use_sketches else []
+        )
+
+    def result(self) -> pd.DataFrame:
+        """
+        Aggregated report of the rollup
+
+        Returns:
+            Capacity: one row per instance with the HIGHEST utilization and latest
+            capacity values. Tenants: one row per tenant with <metric>_min/_max/_mean
+            and <column>_first for descriptive columns.
+        """
+        if self.partials is None:
+            return pd.DataFrame()
+
+        quantiles = pd.DataFrame(index=self.partials.index)
+        if self.sketches is not None:
+            quantiles = sketch_quantiles(self.sketches, self.keys, self.partials.index, SKETCH_QUANTILE)
+            # Bucket midpoints are approximate; never report outside the exact range
+            for stat, bound in (('min', np.fmax), ('max', np.fmin)):
+                limits = self.partials.reindex(columns=[f'{column}|{stat}' for column in quantiles.columns]).to_numpy()
+                quantiles[:] = np.where(np.isnan(quantiles), quantiles, bound(quantiles.to_numpy(), limits))
+
+        columns = {}
+        for column, role in self.roles.items():
+            if role == 'min_max_mean':
+                columns[f'{column}_min'] = self.partials[f'{column}|min']
+                columns[f'{column}_max'] = self.partials[f'{column}|max']
+                columns[f'{column}_mean'] = self.partials[f'{column}|sum'] / self.partials[f'{column}|count']
+            elif self.table == 'tenants':
+                columns[f'{column}_{role}'] = self.partials[f'{column}|{role}']
+            else:
+                columns[column] = self.partials[f'{column}|{role}']
+            if column in quantiles.columns:
+                columns[f'{column}_daily_p{round(SKETCH_QUANTILE * 100)}'] = quantiles[column]
+        result = pd.DataFrame(columns, index=self.partials.index).reset_index()
+
+        # Add metadata
+        dates = [report_date(filepath) for filepath in self.files]
+        if self.table == 'capacity':
+            metadata = {'period_start': min(dates), 'period_end': max(dates), 'num_days_analyzed': len(self.files)}
+        else:
+            metadata = {'aggregation_start': min(dates), 'aggregation_end': max(dates),
+                        'num_reports_aggregated': len(self.files)}
+        return result.assign(**metadata)
+
+    def save(self, path: str) -> None:
+        """
+        Write the rollup to a Parquet file (see load())
+
+        Metrics with at most one value per instance/tenant (e.g. a day with a
+        single run) are stored as that value instead of min/max/sum/count, and
+        sketches as struct columns with the fields of QuantileSketch.to_dict().
+        """
+        partials = self.partials
+        single = [
+            column for column, role in self.roles.items()
+            if role == 'min_max_mean' and not (partials[f'{column}|count'] > 1).any()
+        ]
+        if single:
+            values = partials[[f'{column}|min' for column in single]]
+            values.columns = [f'{column}|value' for column in single]
+            dropped = {f'{column}|{stat}' for column in single for stat in ROLE_STATS['min_max_mean']}
+            partials = pd.concat([partials[[c for c in partials.columns if c not in dropped]], values], axis=1)
+        table = pa.Table.from_pandas(partials, preserve_index=True)
+        if self.sketches is not None:
+            rows = sketch_rows(self.sketches, self.keys, self.partials.index)
+            for column, positions in self.sketches.groupby('metric', sort=False, observed=True).indices.items():
+                table = table.append_column(
+                    f'{column}|sketch', sketch_array(rows[positions], self.sketches.iloc[positions], len(partials))
+                )
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'rollup'] = json.dumps({
+            'table': self.table,
+            'sketches': self.use_sketches,
+            'sketch_accuracy': SKETCH_ACCURACY,
+            'roles': self.roles,
+            'files': self.files,
+        }).encode()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table.replace_schema_metadata(metadata), path, compression='zstd')
+
+    @classmethod
+    def load(cls, path: str) -> 'Rollup':
+        """Read a rollup written by save()"""
+        table = pq.read_table(path)
+        info = json.loads(table.schema.metadata[b'rollup'])
+        rollup = cls(info['table'], sketches=info.get('sketches', False))
+        rollup.roles = info['roles']
+        rollup.files = info['files']
+
+        sketch_columns = [name for name in table.column_names if name.endswith('|sketch')]
+        partials = table.select([name for name in table.column_names if name not in sketch_columns]).to_pandas()
+        single = [name for name in partials.columns if name.endswith('|value')]
+        if single:
+            values = partials[single].to_numpy(dtype='float64')
+            columns = [name.rsplit('|', 1)[0] for name in single]
+            expanded = [
+                pd.DataFrame(values, index=partials.index, columns=[f'{column}|{stat}' for column in columns])
+                for stat in ('min', 'max', 'sum')
+            ]
+            expanded.append(pd.DataFrame(
+                (~np.isnan(values)).astype('int64'), index=partials.index, columns=[f'{column}|count' for column in columns]
+            ))
+            partials = pd.concat([partials.drop(columns=single)] + expanded, axis=1)
+        rollup.partials = partials
+        # Sketches of another accuracy or an earlier format don't merge: those days count without them
+        metrics = [
+            name for name in sketch_columns
+            if pa.types.is_struct(table.schema.field(name).type) and info.get('sketch_accuracy') == SKETCH_ACCURACY
+        ]
+        if metrics:
+            counts = [sketch_counts_from_array(table.column(name).combine_chunks()) for name in metrics]
+            rows = np.concatenate([metric_counts['row'] for metric_counts in counts])
+            sketches = partials.index.to_frame(index=False).iloc[rows].reset_index(drop=True)
+            sketches['metric'] = pd.Categorical.from_codes(
+                np.repeat(np.arange(len(metrics)), [len(metric_counts['row']) for metric_counts in counts]),
+                [name.rsplit('|', 1)[0] for name in metrics]
+            )
+            for name in ('sign', 'bucket', 'count'):
+                sketches[name] = np.concatenate([metric_counts[name] for metric_counts in counts])
+            rollup.sketches = sketches
+        return rollup
+
 
 class HistoricalAggregator:
     """Aggregate historical daily reports into weekly/monthly summaries"""
 
-    def __init__(self, output_dir: str = 'output'):
+    def __init__(self, output_dir: str = 'output', read_workers: int = DEFAULT_READ_WORKERS):
         """
         Initialize Historical Aggregator
 
         Args:
-            output_dir: Directory containing daily CSV reports
+            output_dir: Directory containing daily CSV reports and the Parquet history
+            read_workers: Report files read concurrently (default: 8)
         """
         self.output_dir = Path(output_dir)
+        self.read_workers = read_workers
+
+    def find_daily_history(self, days_back: int = 7) -> Dict[str, List[str]]:
+        """
+        Find the Parquet files of daily runs from the past N days
+
+        Only the date partitions inside the window are listed; files of other
+        days and of weekly/monthly runs are never opened.
+
+        Args:
+            days_back: Number of days to look back
+
+        Returns:
+            Dictionary with 'capacity' and 'tenants' lists of file paths (chronological)
+        """
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        reports = {}
+        for table in TABLES:
+            reports[table] = []
+            daily_dir = self.output_dir / HISTORY_DIR / table / 'frequency=daily'
+            for partition in sorted(daily_dir.glob('date=*')):
+                if datetime.strptime(partition.name.split('=', 1)[1], '%Y%m%d') >= cutoff_date:
+                    reports[table].extend(str(path) for path in sorted(partition.glob('*.parquet')))
+        return reports
 
     def find_daily_reports(self, days_back: int = 7) -> Dict[str, List[str]]:
         """
-        Find daily CSV reports from the past N days
+        Find daily reports from the past N days
+
+        Days in the Parquet history are read from there; CSV reports are used
+        for days without history (e.g. runs from before the history existed).
 
         Args:
             days_back: Number of days to look back
@@ -31,17 +567,19 @@ class HistoricalAggregator:
         Returns:
             Dictionary with 'capacity' and 'tenants' lists of file paths
         """
+        history = self.find_daily_history(days_back)
         reports = {
             'capacity': [],
             'tenants': []
         }
 
-        # Search for capacity assessment files
-        capacity_pattern = str(self.output_dir / 'oceanbase_capacity_assessment_*.csv')
+        # Search for capacity assessment files (daily runs only: weekly and monthly
+        # CSV files are named oceanbase_capacity_assessment_weekly_YYYYMMDD_HHMMSS.csv)
+        capacity_pattern = str(self.output_dir / 'oceanbase_capacity_assessment_[0-9]*.csv')
         capacity_files = glob.glob(capacity_pattern)
 
         # Search for tenants files
-        tenants_pattern = str(self.output_dir / 'oceanbase_tenants_*.csv')
+        tenants_pattern = str(self.output_dir / 'oceanbase_tenants_[0-9]*.csv')
         tenants_files = glob.glob(tenants_pattern)
 
         # Filter by date (last N days)
@@ -68,185 +606,190 @@ class HistoricalAggregator:
             except (ValueError, IndexError):
                 continue
 
-        # Sort by filename (chronological)
-        reports['capacity'].sort()
-        reports['tenants'].sort()
+        # Days covered by the history, then chronological order
+        for table in ('capacity', 'tenants'):
+            history_dates = {report_date(path) for path in history[table]}
+            csv_reports = [path for path in reports[table] if report_date(path) not in history_dates]
+            reports[table] = sorted(csv_reports + history[table], key=lambda path: (report_date(path), path))
 
         return reports
 
-    def aggregate_capacity_data(self, file_paths: List[str]) -> pd.DataFrame:
+    def read_reports(self, file_paths: List[str], columns: Optional[List[str]] = None) -> List[pd.DataFrame]:
         """
-        Aggregate capacity assessment data from multiple daily reports
-        Extracts the HIGHEST utilization metrics across all days
+        Read daily report files concurrently, in the order given
 
         Args:
-            file_paths: List of CSV file paths to aggregate
+            file_paths: Parquet or CSV report files
+            columns: Columns to read (default: all)
 
         Returns:
-            Aggregated DataFrame with highest utilization metrics
+            DataFrames of the files that could be read
         """
-        if not file_paths:
-            return pd.DataFrame()
-
-        all_data = []
-        for filepath in file_paths:
+        def read(filepath: str) -> Optional[pd.DataFrame]:
             try:
-                df = pd.read_csv(filepath)
-                # Add extraction date
-                filename = Path(filepath).name
-                date_str = filename.split('_')[-2]
-                df['extraction_date'] = date_str
-                all_data.append(df)
+                return read_report(filepath, columns)
             except Exception as e:
                 print(f"Warning: Could not read {filepath}: {e}")
-                continue
-
-        if not all_data:
-            return pd.DataFrame()
-
-        # Combine all data
-        combined_df = pd.concat(all_data, ignore_index=True)
-
-        # Group by instance_id and get HIGHEST utilization
-        numeric_cols = combined_df.select_dtypes(include=['float64', 'int64']).columns
-
-        agg_dict = {}
-
-        # For utilization metrics, get MAX (highest)
-        utilization_cols = ['cpu_avg', 'cpu_max', 'cpu_p95',
-                           'memory_avg', 'memory_max', 'memory_p95',
-                           'disk_utilization_pct']
-
-        for col in numeric_cols:
-            if col not in ['instance_id']:
-                if any(util in col for util in utilization_cols):
-                    # Get HIGHEST utilization
-                    agg_dict[col] = 'max'
-                else:
-                    # For capacity metrics, take the latest value
-                    agg_dict[col] = 'last'
-
-        # Add categorical columns - take the latest
-        categorical_cols = ['instance_name', 'status', 'series', 'zones', 'version',
-                           'create_time', 'expire_time', 'disk_type']
-        for col in categorical_cols:
-            if col in combined_df.columns:
-                agg_dict[col] = 'last'
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.read_workers) as pool:
+            return [df for df in pool.map(read, file_paths) if df is not None]
+
+    def rollup(
+        self,
+        table: str,
+        file_paths: List[str],
+        columns: Optional[List[str]] = None,
+        rollup: Optional['Rollup'] = None
+    ) -> 'Rollup':
+        """
+        Add daily reports to a rollup, reading only the files it does not contain yet
 
-        grouped = combined_df.groupby('instance_id').agg(agg_dict)
+        Args:
+            table: 'capacity' or 'tenants'
+            file_paths: Daily report files in chronological order
+            columns: Metric columns to aggregate (default: all)
+            rollup: Existing rollup to extend (e.g. Rollup.load() of an earlier week)
 
-        # Reset index to make instance_id a column again
-        result = grouped.reset_index()
+        Returns:
+            The extended rollup (a new one if none was given)
+        """
+        rollup = rollup or Rollup(table)
+        new_files = [filepath for filepath in file_paths if filepath not in rollup.files]
+        if not new_files:
+            return rollup
+
+        if columns is not None:
+            columns = rollup.keys + list(CATEGORICAL_COLUMNS[table]) + list(columns)
+        frames = self.read_reports(new_files, columns)
+        if frames:
+            rollup.add(pd.concat(frames, ignore_index=True), new_files)
+        return rollup
+
+    def aggregate_capacity_data(self, file_paths: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Aggregate capacity assessment data from multiple daily reports
+        Extracts the HIGHEST utilization metrics across all days
 
-        # Add metadata
-        result['period_start'] = min([Path(f).name.split('_')[-2] for f in file_paths])
-        result['period_end'] = max([Path(f).name.split('_')[-2] for f in file_paths])
-        result['num_days_analyzed'] = len(file_paths)
+        Args:
+            file_paths: List of Parquet or CSV file paths to aggregate
+            columns: Metric columns to aggregate (default: all)
 
-        return result
+        Returns:
+            Aggregated DataFrame with highest utilization metrics
+        """
+        if not file_paths:
+            return pd.DataFrame()
+        return self.rollup('capacity', file_paths, columns).result()
 
-    def aggregate_tenants_data(self, file_paths: List[str]) -> pd.DataFrame:
+    def aggregate_tenants_data(self, file_paths: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Aggregate tenants data from multiple daily reports
 
         Args:
-            file_paths: List of CSV file paths to aggregate
+            file_paths: List of Parquet or CSV file paths to aggregate
+            columns: Metric columns to aggregate (default: all)
 
         Returns:
             Aggregated DataFrame with min/max/avg metrics
         """
         if not file_paths:
             return pd.DataFrame()
+        return self.rollup('tenants', file_paths, columns).result()
 
-        all_data = []
-        for filepath in file_paths:
-            try:
-                df = pd.read_csv(filepath)
-                # Add extraction date
-                filename = Path(filepath).name
-                date_str = filename.split('_')[-2]
-                df['extraction_date'] = date_str
-                all_data.append(df)
-            except Exception as e:
-                print(f"Warning: Could not read {filepath}: {e}")
-                continue
-
-        if not all_data:
-            return pd.DataFrame()
-
-        # Combine all data
-        combined_df = pd.concat(all_data, ignore_index=True)
-
-        # Group by instance_id and tenant_id
-        numeric_cols = combined_df.select_dtypes(include=['float64', 'int64']).columns
-
-        agg_dict = {}
-        for col in numeric_cols:
-            if col not in ['instance_id', 'tenant_id']:
-                agg_dict[col] = ['min', 'max', 'mean']
-
-        # Add categorical columns
-        categorical_cols = ['instance_name', 'tenant_name', 'status', 'tenant_mode', 'charset']
-        for col in categorical_cols:
-            if col in combined_df.columns:
-                agg_dict[col] = 'first'
+    def update_daily_rollups(self, paths: Dict[str, str]) -> None:
+        """
+        Add a daily run's history files to the persisted partials of their day
 
-        grouped = combined_df.groupby(['instance_id', 'tenant_id']).agg(agg_dict)
+        Args:
+            paths: Table name to Parquet file of the run (see ParquetExporter.export_report())
+        """
+        for table, filepath in paths.items():
+            path = rollup_path(self.output_dir, table, report_date(filepath))
+            rollup = Rollup.load(path) if path.exists() else Rollup(table, sketches=True)
+            self.rollup(table, [filepath], rollup=rollup).save(path)
+        if paths:
+            print(f"✓ Daily rollups updated: {self.output_dir / HISTORY_DIR / ROLLUP_DIR}/")
+
+    def window_rollup(self, table: str, days_back: int) -> Optional[Rollup]:
+        """
+        Rollup of the past N days, merged from the persisted daily partials
 
-        # Flatten multi-level columns
-        grouped.columns = ['_'.join(col).strip('_') if isinstance(col, tuple) else col
-                          for col in grouped.columns]
+        Days without persisted partials (e.g. CSV reports from before the
+        history existed) are read from their report files instead.
 
-        # Reset index
-        result = grouped.reset_index()
+        Args:
+            table: 'capacity' or 'tenants'
+            days_back: Number of days to look back
 
-        # Add metadata
-        result['aggregation_start'] = min([f.split('_')[-2] for f in file_paths])
-        result['aggregation_end'] = max([f.split('_')[-2] for f in file_paths])
-        result['num_reports_aggregated'] = len(file_paths)
+        Returns:
+            Rollup of the window with quantile sketches, or None if no day has data
+        """
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        files_by_date: Dict[str, List[str]] = {}
+        for filepath in self.find_daily_reports(days_back)[table]:
+            files_by_date.setdefault(report_date(filepath), []).append(filepath)
+        rollups_by_date = {
+            path.stem.split('=', 1)[1]: path
+            for path in (self.output_dir / HISTORY_DIR / ROLLUP_DIR / table).glob('date=*.parquet')
+            if datetime.strptime(path.stem.split('=', 1)[1], '%Y%m%d') >= cutoff_date
+        }
+        if not files_by_date and not rollups_by_date:
+            return None
+
+        # Days in chronological order; persisted partials are loaded concurrently
+        dates = sorted(set(files_by_date) | set(rollups_by_date))
+        with ThreadPoolExecutor(max_workers=self.read_workers) as pool:
+            loaded = dict(zip(
+                [date_str for date_str in dates if date_str in rollups_by_date],
+                pool.map(Rollup.load, [rollups_by_date[date_str] for date_str in dates if date_str in rollups_by_date])
+            ))
+
+        days = []
+        read = 0
+        for date_str in dates:
+            day = loaded.get(date_str) or Rollup(table, sketches=True)
+            # Runs of the day that are not in its partials yet
+            known = {Path(filepath).name for filepath in day.files}
+            files = [filepath for filepath in files_by_date.get(date_str, []) if Path(filepath).name not in known]
+            if files:
+                day = self.rollup(table, files, rollup=day)
+                read += len(files)
+            days.append(day)
+
+        window = Rollup(table, sketches=True)
+        window.merge(days)
+        merged = len(loaded)
+        print(f"  {table}: merged {merged} daily rollup(s), read {read} report file(s)")
+        return window
+
+    def _generate_report(self, days_back: int) -> tuple:
+        rollups = {table: self.window_rollup(table, days_back) for table in TABLES}
+        if rollups['capacity'] is None and rollups['tenants'] is None:
+            print(f"  No daily reports found for the past {days_back} days")
+            return None, None
 
-        return result
+        return tuple(
+            rollup.result() if rollup is not None else pd.DataFrame()
+            for rollup in (rollups['capacity'], rollups['tenants'])
+        )
 
     def generate_weekly_report(self) -> tuple:
         """
-        Generate weekly report from the last 7 days of daily reports
+        Generate weekly report from the last 7 days of daily rollups
 
         Returns:
             Tuple of (capacity_df, tenants_df)
         """
         print("Generating weekly report from historical data...")
-        reports = self.find_daily_reports(days_back=7)
-
-        if not reports['capacity'] and not reports['tenants']:
-            print("  No daily reports found for the past 7 days")
-            return None, None
-
-        print(f"  Found {len(reports['capacity'])} capacity reports")
-        print(f"  Found {len(reports['tenants'])} tenant reports")
-
-        capacity_df = self.aggregate_capacity_data(reports['capacity'])
-        tenants_df = self.aggregate_tenants_data(reports['tenants'])
-
-        return capacity_df, tenants_df
+        return self._generate_report(days_back=7)
 
     def generate_monthly_report(self) -> tuple:
         """
-        Generate monthly report from the last 30 days of daily reports
+        Generate monthly report from the last 30 days of daily rollups
 
         Returns:
             Tuple of (capacity_df, tenants_df)
         """
         print("Generating monthly report from historical data...")
-        reports = self.find_daily_reports(days_back=30)
-
-        if not reports['capacity'] and not reports['tenants']:
-            print("  No daily reports found for the past 30 days")
-            return None, None
-
-        print(f"  Found {len(reports['capacity'])} capacity reports")
-        print(f"  Found {len(reports['tenants'])} tenant reports")
-
-        capacity_df = self.aggregate_capacity_data(reports['capacity'])
-        tenants_df = self.aggregate_tenants_data(reports['tenants'])
-
-        return capacity_df, tenants_df
+        return self._generate_report(days_back=30)
@@ -0,0 +1,208 @@
+"""
+On-disk registry of CloudMonitor metric availability
+Remembers which metrics return data per (region, instance series/version, metric, scope)
+so runs can skip metrics that are known to be empty or rejected (HTTP 400)
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+SCOPE_INSTANCE = 'instance'
+SCOPE_TENANT = 'tenant'
+
+DEFAULT_TTL_DAYS = 7
+DEFAULT_REGISTRY_FILE = 'metric_availability.json'
+
+
+class MetricAvailabilityRegistry:
+    """
+    Availability of metrics per instance type, persisted as JSON
+
+    Decisions during a run use the state loaded at startup, so one tenant
+    without data cannot hide a metric from the other tenants of the same run.
+    The exception is an unavailable record past its TTL: only the first query
+    of the run probes it, and the others follow that query's outcome (skipping
+    the metric while it is in flight), so the re-probe costs one query per
+    instance type instead of one per instance and tenant.
+    Observations are merged on save: a metric is available if any query of
+    the run returned data, and unavailable if every query returned nothing
+    or was rejected. Unavailable metrics are probed again after ttl_days.
+    Metrics expected to be unavailable can be seeded as unavailable, so that
+    they are first queried after ttl_days (or by a probe) instead of by every
+    instance of the first run.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        refresh: bool = False
+    ):
+        """
+        Initialize registry and load the existing file
+
+        Args:
+            path: JSON file holding the registry
+            ttl_days: Days before an unavailable metric is probed again (default: 7)
+            refresh: Query every metric regardless of the registry (probe mode)
+        """
+        self.path = Path(path)
+        self.ttl = timedelta(days=ttl_days)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load()
+        self._observed: Dict[str, Dict] = {}
+        self._seeded: Dict[str, Dict] = {}
+        # Keys of expired records this run is probing again
+        self._probing: Set[str] = set()
+        self.skipped = 0
+
+    @staticmethod
+    def key(region: str, series: str, version: str, metric_name: str, scope: str) -> str:
+        """Registry key of a metric for one instance type"""
+        return f"{region}|{series or 'unknown'}|{version or 'unknown'}|{metric_name}|{scope}"
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('metrics', {})
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            print(f"⚠ Ignoring unreadable metric availability registry {self.path}: {str(e)}")
+            return {}
+
+    def should_query(self, region: str, series: str, version: str, metric_name: str, scope: str) -> bool:
+        """
+        Decide whether a metric is worth a CloudMonitor request
+
+        Returns:
+            False if the metric is recorded as unavailable and the record is within the TTL,
+            or the record expired and another query of this run probes it (or found no data)
+        """
+        if self.refresh:
+            return True
+        key = self.key(region, series, version, metric_name, scope)
+        entry = self._entries.get(key)
+        if entry is None or entry.get('available'):
+            return True
+        checked_at = datetime.fromisoformat(entry['checked_at'])
+        with self._lock:
+            if datetime.now() - checked_at >= self.ttl:
+                # The first query of the run probes the metric again; later ones follow its outcome
+                observed = self._observed.get(key)
+                if observed is not None and observed['available']:
+                    return True
+                if observed is None and key not in self._probing:
+                    self._probing.add(key)
+                    return True
+            self.skipped += 1
+        return False
+
+    def seed_unavailable(
+        self,
+        region: str,
+        series: str,
+        version: str,
+        metric_name: str,
+        scope: str,
+        reason: str
+    ) -> bool:
+        """
+        Record a metric expected to be unavailable unless the registry already knows it
+
+        Args:
+            region, series, version, metric_name, scope: Registry key parts
+            reason: Why the metric is expected to be unavailable
+
+        Returns:
+            True if the metric was seeded and should not be queried (False when probing
+            or when the registry has a record of it, which should_query() decides on)
+        """
+        key = self.key(region, series, version, metric_name, scope)
+        if self.refresh or key in self._entries:
+            return False
+        with self._lock:
+            if key not in self._seeded:
+                self._seeded[key] = {
+                    'available': False,
+                    'checked_at': datetime.now().isoformat(timespec='seconds'),
+                    'reason': reason,
+                }
+            self.skipped += 1
+        return True
+
+    def record(
+        self,
+        region: str,
+        series: str,
+        version: str,
+        metric_name: str,
+        scope: str,
+        has_data: bool,
+        reason: Optional[str] = None
+    ) -> None:
+        """
+        Record the outcome of one metric query
+
+        Args:
+            region, series, version, metric_name, scope: Registry key parts
+            has_data: True if the query returned at least one datapoint
+            reason: Why the metric is unavailable (e.g. 'no data', error code)
+        """
+        key = self.key(region, series, version, metric_name, scope)
+        with self._lock:
+            observed = self._observed.get(key)
+            if observed is None or (has_data and not observed['available']):
+                self._observed[key] = {
+                    'available': has_data,
+                    'checked_at': datetime.now().isoformat(timespec='seconds'),
+                    'reason': None if has_data else (reason or 'no data'),
+                }
+
+    def new_run(self) -> None:
+        """Start another run after save() (--daemon): this run's observations are in the registry now"""
+        with self._lock:
+            self._observed = {}
+            self._seeded = {}
+            self._probing = set()
+            self.skipped = 0
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of metrics observed available/unavailable in this run and requests skipped"""
+        with self._lock:
+            available = sum(1 for entry in self._observed.values() if entry['available'])
+            return {
+                'available': available,
+                'unavailable': len(self._observed) - available,
+                'skipped': self.skipped,
+            }
+
+    def unavailable(self) -> Dict[str, Dict]:
+        """Registry entries (including this run's observations) of unavailable metrics"""
+        with self._lock:
+            merged = dict(self._seeded)
+            merged.update(self._entries)
+            merged.update(self._observed)
+        return {key: entry for key, entry in sorted(merged.items()) if not entry['available']}
+
+    def save(self) -> None:
+        """Merge this run's observations into the registry file (atomic replace)"""
+        # Re-read the file: other processes (e.g. shards) may have saved since it was loaded
+        entries = self._load()
+        with self._lock:
+            # Seeds never replace a record, e.g. one saved by another shard in the meantime
+            for key, entry in self._seeded.items():
+                entries.setdefault(key, entry)
+            entries.update(self._observed)
+            self._entries = entries
+            data = {'updated_at': datetime.now().isoformat(timespec='seconds'), 'metrics': entries}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f'{self.path.suffix}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,292 @@
+"""
+Streaming statistics for CloudMonitor metric series
+Exact count/min/max/mean plus mergeable quantile sketches (DDSketch style)
+"""
+import math
+from typing import Dict, Iterable, List, Optional
+
+# Default relative error bound for sketched quantiles (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Series up to this many values keep exact quantiles; longer series switch to the sketch
+DEFAULT_EXACT_LIMIT = 1024
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch with a relative error guarantee (DDSketch)
+
+    Every value x is counted in bucket ceil(log_gamma(|x|)), so any quantile is
+    returned within relative_accuracy of the true value. Memory grows with the
+    log of the value range, not with the number of values, and two sketches with
+    the same accuracy merge by adding bucket counts.
+    """
+
+    # Values closer to zero than this are counted as zero
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Initialize an empty sketch
+
+        Args:
+            relative_accuracy: Relative error bound for quantiles, between 0 and 1 (default: 0.01)
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be between 0 and 1, got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._multiplier = 1 / math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    @property
+    def gamma(self) -> float:
+        """Ratio between the bounds of a bucket: bucket k holds values in (gamma^(k-1), gamma^k]"""
+        return self._gamma
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) * self._multiplier)
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Add a value (optionally with a repeat count)"""
+        if value > self.MIN_INDEXABLE:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + count
+        elif value < -self.MIN_INDEXABLE:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Merge another sketch with the same relative accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile_at_rank(self, rank: int) -> Optional[float]:
+        """
+        Value at a 0-based rank in sorted order
+
+        Args:
+            rank: 0-based rank (0 = smallest value)
+
+        Returns:
+            Approximate value, or None if the sketch is empty
+        """
+        if not self.count:
+            return None
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-compatible dictionary"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(k): v for k, v in self.positive.items()},
+            'negative': {str(k): v for k, v in self.negative.items()},
+            'zero_count': self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        """Rebuild a sketch serialized with to_dict()"""
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {int(k): v for k, v in data.get('positive', {}).items()}
+        sketch.negative = {int(k): v for k, v in data.get('negative', {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = sum(sketch.positive.values()) + sum(sketch.negative.values()) + sketch.zero_count
+        return sketch
+
+
+class MetricStats:
+    """
+    Single-pass, mergeable accumulator for one metric series
+
+    count/min/max/mean are always exact. Quantiles are exact while the series has
+    at most exact_limit values; beyond that the values are folded into a
+    QuantileSketch and quantiles carry its relative error bound. Accumulators can
+    be merged across pages, tenants, days and instances.
+    """
+
+    SAMPLE_SIZE = 5
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        exact_limit: int = DEFAULT_EXACT_LIMIT
+    ):
+        """
+        Initialize an empty accumulator
+
+        Args:
+            relative_accuracy: Relative error bound for sketched quantiles (default: 0.01)
+            exact_limit: Maximum number of values kept for exact quantiles (default: 1024)
+        """
+        self.relative_accuracy = relative_accuracy
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.sample: List[float] = []  # First few raw values, for debug warnings
+        self._values: Optional[List[float]] = []  # None once switched to the sketch
+        self._sketch: Optional[QuantileSketch] = None
+
+    def _to_sketch(self) -> None:
+        self._sketch = QuantileSketch(self.relative_accuracy)
+        for value in self._values:
+            self._sketch.add(value)
+        self._values = None
+
+    def add(self, value: float) -> None:
+        """Add a single value"""
+        value = float(value)
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self.sample) < self.SAMPLE_SIZE:
+            self.sample.append(value)
+
+        if self._values is not None:
+            self._values.append(value)
+            if len(self._values) > self.exact_limit:
+                self._to_sketch()
+        else:
+            self._sketch.add(value)
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add a batch of values (e.g. one page of datapoints)"""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'MetricStats') -> 'MetricStats':
+        """
+        Merge another accumulator into this one
+
+        Args:
+            other: Accumulator with the same relative accuracy
+
+        Returns:
+            self, to allow chaining
+        """
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sample.extend(other.sample[:self.SAMPLE_SIZE - len(self.sample)])
+
+        if self._values is not None and other._values is not None \
+                and len(self._values) + len(other._values) <= self.exact_limit:
+            self._values.extend(other._values)
+            return self
+
+        if self._values is not None:
+            self._to_sketch()
+        if other._values is not None:
+            for value in other._values:
+                self._sketch.add(value)
+        else:
+            self._sketch.merge(other._sketch)
+        return self
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Arithmetic mean of all values"""
+        return self.total / self.count if self.count else None
+
+    @property
+    def is_exact(self) -> bool:
+        """True while quantiles are computed from the raw values"""
+        return self._values is not None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Nearest-rank percentile (value at 0-based rank int(n*q), as in the previous sort-based code)
+
+        Args:
+            q: Quantile between 0 and 1 (e.g. 0.95)
+
+        Returns:
+            Percentile value, or None if no values were added
+        """
+        if not self.count:
+            return None
+        rank = min(int(self.count * q), self.count - 1)
+        if self._values is not None:
+            return sorted(self._values)[rank]
+        # Sketch buckets are approximate; never report outside the exact range
+        return min(max(self._sketch.quantile_at_rank(rank), self.min), self.max)
+
+    def p95(self) -> Optional[float]:
+        """95th percentile"""
+        return self.percentile(0.95)
+
+    def p99(self) -> Optional[float]:
+        """99th percentile"""
+        return self.percentile(0.99)
+
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-compatible dictionary"""
+        data = {
+            'relative_accuracy': self.relative_accuracy,
+            'exact_limit': self.exact_limit,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'sample': self.sample,
+        }
+        if self._values is not None:
+            data['values'] = self._values
+        else:
+            data['sketch'] = self._sketch.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MetricStats':
+        """Rebuild an accumulator serialized with to_dict()"""
+        stats = cls(data['relative_accuracy'], data.get('exact_limit', DEFAULT_EXACT_LIMIT))
+        stats.count = data['count']
+        stats.total = data['total']
+        stats.min = data['min']
+        stats.max = data['max']
+        stats.sample = list(data.get('sample', []))
+        if 'sketch' in data:
+            stats._values = None
+            stats._sketch = QuantileSketch.from_dict(data['sketch'])
+        else:
+            stats._values = list(data.get('values', []))
+        return stats
+
+    def __bool__(self) -> bool:
+        return self.count > 0
@@ -1,20 +1,213 @@
 """
 OceanBase Client for extracting instance and tenant information
 """
-from typing import List, Dict, Optional
+import json
+import threading
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from alibabacloud_oceanbasepro20190901.client import Client as OceanBaseClient
 from alibabacloud_oceanbasepro20190901 import models as oceanbase_models
 from alibabacloud_tea_openapi import models as api_models
-from alibabacloud_cms20190101.client import Client as CmsClient
-from alibabacloud_cms20190101 import models as cms_models
+from metric_stats import MetricStats, DEFAULT_RELATIVE_ACCURACY
+from request_scheduler import RequestScheduler, PRIORITY_INSTANCE, PRIORITY_TENANT
+from retry import ApiResponseError, is_permanent_error
+from metric_availability import MetricAvailabilityRegistry, SCOPE_INSTANCE, SCOPE_TENANT
+from datapoint_store import DatapointStore
+from request_memo import RequestMemo
+from run_profiler import NO_STAGE, profiled
+from topology_cache import TopologyCache, instance_fingerprint, tenant_fingerprint
+
+if TYPE_CHECKING:
+    # The CloudMonitor SDK is imported when the first metric is requested (listing runs never need it)
+    from alibabacloud_cms20190101.client import Client as CmsClient
+    from alibabacloud_cms20190101 import models as cms_models
 
 
 class OceanBaseReporter:
     """Client for extracting OceanBase metrics and information"""
 
-    def __init__(self, access_key_id: str, access_key_secret: str, region: str):
+    # Tenant-level CloudMonitor metrics: {metric_name: output_field}
+    # Lists every known metric; metrics that return no data (or a 400 error) for an
+    # instance type are recorded by the metric availability registry and skipped
+    # on later runs until they are probed again (see metric_availability.py).
+    # UNVERIFIED_TENANT_METRICS are only queried through the registry
+    # UPDATED: Renamed metrics to follow consistent pattern (qps_*, tps_*, sessions_*, connection_*)
+    TENANT_METRIC_MAP = {
+        # CPU metrics
+        'cpu_usage_percent_tenant': 'cpu_usage_percent',
+        'cpu_usage_avg_cores_tenant': 'cpu_usage_avg_cores',  # May not be available for all tenants
+
+        # Memory metrics
+        'memory_usage_tenant': 'memory_usage_percent',
+        # MemStore metrics
+        'memstore_percent_tenant': 'memstore_percent',
+        'memstore_used_tenant': 'memstore_used_mb',
+        'memstore_total_tenant': 'memstore_total_mb',
+
+        # Session/Connection metrics (renamed to sessions_* pattern)
+        'active_sessions_tenant': 'sessions',
+        'all_session': 'connection',
+
+        # SQL Performance metrics (renamed to qps_* pattern)
+        'sql_all_count': 'qps',
+        'sql_all_rt': 'sql_avg_rt_ms',
+        # SQL breakdown by type
+        'sql_select_count': 'sql_select_qps',
+        'sql_insert_count': 'sql_insert_qps',
+        'sql_update_count': 'sql_update_qps',
+        'sql_delete_count': 'sql_delete_qps',
+        'sql_replace_count': 'sql_replace_qps',
+
+        # Transaction metrics (renamed to tps_* pattern)
+        'transaction_count': 'tps',
+        # 'transaction_rt': 'transaction_avg_rt_us',  # Often returns NaN (has data, so the registry can't skip it)
+        'transaction_partition_count': 'transaction_partition_tps',
+        'trans_commit_log_count': 'trans_commit_log_count',
+        'trans_commit_log_sync_rt': 'trans_commit_log_sync_rt_ms',
+
+        # Transaction log size
+        'clog_trans_log_total_size': 'clog_trans_log_size_mb',
+
+        # I/O metrics
+        'io_count': 'io_ops_per_sec',  # 400 error in testing
+        'io_rt': 'io_avg_rt_us',  # 400 error in testing
+        'io_size': 'io_throughput_bytes',  # 400 error in testing
+        'io_read_count': 'io_read_ops_per_sec',
+        'io_write_count': 'io_write_ops_per_sec',
+        'io_read_rt': 'io_read_rt_us',
+        'io_write_rt': 'io_write_rt_us',
+        'io_read_size': 'io_read_bytes_per_sec',  # 400 error in testing
+        'io_write_size': 'io_write_bytes_per_sec',  # 400 error in testing
+
+        # Cache metrics
+        'cache_hit': 'cache_hit_rate_percent',
+        'cache_size': 'cache_size_mb',
+
+        # Queue metrics
+        'request_queue_time': 'request_queue_time_us',
+
+        # Database wait events
+        'ob_waiteven_count': 'wait_event_count',
+        'ob_sql_event': 'sql_event_count',
+
+        # Storage metrics
+        # Note: These metrics will be fetched and merged into tenant data
+        'ob_tenant_log_disk_total_bytes': 'log_disk_total_bytes',
+        'ob_tenant_log_disk_used_bytes': 'log_disk_used_bytes',
+        'ob_tenant_data_disk_total_bytes': 'data_disk_total_bytes',  # For Allocated_Disk
+        'ob_tenant_server_required_size': 'server_required_size_gb',
+        'ob_tenant_server_data_size': 'data_size_gb',
+        'ob_tenant_binlog_disk_used': 'binlog_disk_used_gb',
+
+        # Network metrics
+        'net_recv': 'network_recv_bytes_per_sec',
+        'net_send': 'network_sent_bytes_per_sec',
+
+        # Uptime
+        'uptime': 'uptime_seconds',
+    }
+
+    # Instance-level CloudMonitor metrics: {metric_name: output_prefix}
+    # Lists every known metric; unavailable ones are skipped via the metric availability registry.
+    # UNVERIFIED_INSTANCE_METRICS are only queried through the registry
+    INSTANCE_METRIC_MAP = {
+        # CPU metrics
+        'cpu_usage': 'cpu',
+        'cpu_percent': 'cpu_percent',
+
+        # Memory metrics
+        'memory_percent': 'memory',
+        'memstore_percent': 'memstore_percent',
+
+        # QPS/TPS metrics
+        'qps': 'qps',
+        'tps': 'tps',
+        'qps_rt': 'qps_rt_ms',
+        'tps_rt': 'tps_rt_ms',
+
+        # Active sessions
+        'active_session': 'active_sessions',
+
+        # Data size
+        'data_size': 'data_size_gb',  # 400 error in testing
+
+        # Disk metrics - disk utilization is calculated from DescribeInstance instead
+        'disk_usage': 'disk_usage_percent',  # 400 error in testing
+        'disk_used': 'disk_used_gb',  # 400 error in testing
+        'disk_total': 'disk_total_gb',  # 400 error in testing
+
+        # Network metrics
+        'network_in': 'network_in_bytes_per_sec',  # 400 error in testing
+        'network_out': 'network_out_bytes_per_sec',  # 400 error in testing
+
+        # Connection metrics
+        'connection_count': 'connection_count',  # 400 error in testing
+        'max_connections': 'max_connections_limit',  # 400 error in testing
+
+        # Cache metrics
+        'cache_hit_rate': 'cache_hit_rate_percent',  # 400 error in testing
+
+        # I/O metrics
+        'io_read_bytes': 'io_read_bytes_per_sec',
+        'io_write_bytes': 'io_write_bytes_per_sec',
+        'io_read_times': 'io_read_ops_per_sec',  # 400 error in testing
+        'io_write_times': 'io_write_ops_per_sec',  # 400 error in testing
+        'io_util': 'io_util_percent',  # 400 error in testing
+
+        # SQL metrics - available at tenant level
+        'sql_count': 'sql_count_per_sec',  # 400 error in testing
+        'sql_rt': 'sql_rt_ms',  # 400 error in testing
+        'sql_select': 'sql_select_per_sec',  # 400 error in testing
+        'sql_insert': 'sql_insert_per_sec',  # 400 error in testing
+        'sql_update': 'sql_update_per_sec',  # 400 error in testing
+        'sql_delete': 'sql_delete_per_sec',  # 400 error in testing
+    }
+
+    # Metrics that returned a 400 error or no data in testing. Without a metric availability
+    # registry they are not queried at all; with one they are seeded as unavailable the first
+    # time an instance type is seen. Once the seed expires, one query per instance type probes
+    # them again (see MetricAvailabilityRegistry.should_query()) instead of one per instance and
+    # tenant; --probe-metrics queries them all
+    UNVERIFIED_TENANT_METRICS = frozenset({
+        'cpu_usage_avg_cores_tenant', 'memstore_percent_tenant', 'memstore_used_tenant', 'memstore_total_tenant',
+        'io_count', 'io_rt', 'io_size', 'io_read_size', 'io_write_size', 'cache_hit', 'cache_size',
+        'ob_waiteven_count', 'ob_sql_event', 'ob_tenant_server_required_size', 'ob_tenant_server_data_size',
+        'ob_tenant_binlog_disk_used', 'uptime',
+    })
+    UNVERIFIED_INSTANCE_METRICS = frozenset({
+        'data_size', 'disk_usage', 'disk_used', 'disk_total', 'network_in', 'network_out',
+        'connection_count', 'max_connections', 'cache_hit_rate', 'io_read_times', 'io_write_times', 'io_util',
+        'sql_count', 'sql_rt', 'sql_select', 'sql_insert', 'sql_update', 'sql_delete',
+    })
+
+    # DescribeMetricList page size (API maximum is 1440)
+    METRIC_PAGE_LENGTH = 1440
+
+    # DescribeMetricList aggregation period in seconds (1 hour for faster response)
+    METRIC_PERIOD = 3600
+
+    # Metrics of one instance or tenant fetched concurrently
+    DEFAULT_METRIC_WORKERS = 8
+
+    # DescribeInstances/DescribeTenants page size (API maximum)
+    DESCRIBE_PAGE_SIZE = 100
+
+    def __init__(
+        self,
+        access_key_id: str,
+        access_key_secret: str,
+        region: str,
+        stats_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        scheduler: Optional[RequestScheduler] = None,
+        oceanbase_endpoint: Optional[str] = None,
+        cms_endpoint: Optional[str] = None,
+        protocol: Optional[str] = None,
+        metric_registry: Optional[MetricAvailabilityRegistry] = None,
+        datapoint_store: Optional[DatapointStore] = None,
+        request_memo: Optional[RequestMemo] = None,
+        metric_workers: Optional[int] = None,
+        topology_cache: Optional[TopologyCache] = None
+    ):
         """
         Initialize OceanBase Reporter
 
@@ -22,38 +215,176 @@ class OceanBaseReporter:
             access_key_id: Alibaba Cloud access key ID
             access_key_secret: Alibaba Cloud access key secret
             region: Alibaba Cloud region (e.g., 'cn-hangzhou')
+            stats_accuracy: Relative error bound for sketched percentiles on long series (default: 0.01)
+            scheduler: Shared request scheduler for all API calls (default: a private one)
+            oceanbase_endpoint: OceanBase API endpoint override, 'host[:port]' (default: regional endpoint)
+            cms_endpoint: CloudMonitor API endpoint override, 'host[:port]' (default: regional endpoint)
+            protocol: 'http' or 'https' for both endpoints (default: SDK default)
+            metric_registry: Skip metrics known to return no data and record query outcomes (default: query all)
+            datapoint_store: Local datapoint cache; only uncached time ranges are fetched (default: no cache)
+            request_memo: Shares identical API requests within the run (default: a private one)
+            metric_workers: Metrics of one instance or tenant fetched concurrently (default: 8)
+            topology_cache: Instance and tenant details of earlier runs, used while unchanged (default: no cache)
         """
         self.region = region
+        self.stats_accuracy = stats_accuracy
         self.oceanbase_client = self._create_oceanbase_client(
-            access_key_id, access_key_secret, region
-        )
-        self.cms_client = self._create_cms_client(
-            access_key_id, access_key_secret, region
+            access_key_id, access_key_secret, region, oceanbase_endpoint, protocol
         )
-
-    def _create_oceanbase_client(
-        self, access_key_id: str, access_key_secret: str, region: str
-    ) -> OceanBaseClient:
-        """Create OceanBase SDK client"""
+        self._cms_client_args = (access_key_id, access_key_secret, region, cms_endpoint, protocol)
+        self._cms_client: Optional['CmsClient'] = None
+        self._cms_client_lock = threading.Lock()
+        self.scheduler = scheduler or RequestScheduler()
+        self.metric_registry = metric_registry
+        self.datapoint_store = datapoint_store
+        self.request_memo = request_memo or RequestMemo()
+        self.metric_workers = metric_workers or self.DEFAULT_METRIC_WORKERS
+        self.topology_cache = topology_cache
+        # {instance_id: (series, version)}, the instance type part of metric registry keys
+        self._instance_profiles: Dict[str, Tuple[str, str]] = {}
+
+    @staticmethod
+    def _client_config(
+        access_key_id: str,
+        access_key_secret: str,
+        region: str,
+        endpoint: str,
+        protocol: Optional[str] = None
+    ) -> api_models.Config:
+        """Build an SDK client config for an endpoint"""
         config = api_models.Config(
             access_key_id=access_key_id,
             access_key_secret=access_key_secret,
             region_id=region
         )
-        config.endpoint = f'oceanbasepro.{region}.aliyuncs.com'
-        return OceanBaseClient(config)
+        config.endpoint = endpoint
+        if protocol:
+            config.protocol = protocol
+        return config
+
+    def _create_oceanbase_client(
+        self,
+        access_key_id: str,
+        access_key_secret: str,
+        region: str,
+        endpoint: Optional[str] = None,
+        protocol: Optional[str] = None
+    ) -> OceanBaseClient:
+        """Create OceanBase SDK client"""
+        return OceanBaseClient(self._client_config(
+            access_key_id, access_key_secret, region,
+            endpoint or f'oceanbasepro.{region}.aliyuncs.com', protocol
+        ))
 
     def _create_cms_client(
-        self, access_key_id: str, access_key_secret: str, region: str
-    ) -> CmsClient:
+        self,
+        access_key_id: str,
+        access_key_secret: str,
+        region: str,
+        endpoint: Optional[str] = None,
+        protocol: Optional[str] = None
+    ) -> 'CmsClient':
         """Create Cloud Monitor Service (CMS) client for metrics"""
-        config = api_models.Config(
-            access_key_id=access_key_id,
-            access_key_secret=access_key_secret,
-            region_id=region
+        from alibabacloud_cms20190101.client import Client as CmsClient
+        return CmsClient(self._client_config(
+            access_key_id, access_key_secret, region,
+            endpoint or f'metrics.{region}.aliyuncs.com', protocol
+        ))
+
+    @property
+    def cms_client(self) -> 'CmsClient':
+        """CloudMonitor client, created on the first metric request"""
+        if self._cms_client is None:
+            with self._cms_client_lock:
+                if self._cms_client is None:
+                    self._cms_client = self._create_cms_client(*self._cms_client_args)
+        return self._cms_client
+
+    def _call_api(self, api: str, fn: Callable, request, priority: int = PRIORITY_TENANT):
+        """
+        Send one API request through the request memo and the request scheduler
+
+        Args:
+            api: API name used for rate limiting and memo keys (e.g. 'describe_metric_list')
+            fn: SDK method (or wrapper) taking the request
+            request: SDK request model
+            priority: Scheduler priority (PRIORITY_INSTANCE or PRIORITY_TENANT)
+
+        Returns:
+            SDK response (shared with identical requests of this run)
+        """
+        return self.request_memo.call(
+            RequestMemo.key(api, request), self.scheduler.call, api, fn, request, priority=priority
         )
-        config.endpoint = f'metrics.{region}.aliyuncs.com'
-        return CmsClient(config)
+
+    def _iter_describe_pages(
+        self,
+        api: str,
+        fn: Callable,
+        make_request: Callable[[int], object],
+        label: str,
+        stage: Optional[str] = None
+    ) -> Iterator[object]:
+        """
+        Walk every page of a paginated Describe* API
+
+        The first page reveals total_count; the remaining pages are requested
+        concurrently and yielded in page order as each one arrives. A page that
+        fails is reported and skipped.
+
+        Args:
+            api: API name (e.g. 'describe_instances')
+            fn: SDK method taking the request
+            make_request: Builds the request for a page number (1-based)
+            label: What is listed, for error messages (e.g. 'instances')
+            stage: Profiler stage the page requests are timed as (e.g. 'discovery')
+
+        Yields:
+            Response bodies, one per page
+        """
+        def fetch_page(page_number: int):
+            with self.scheduler.profiler.stage(stage) if stage else NO_STAGE:
+                return self._call_api(api, fn, make_request(page_number), priority=PRIORITY_INSTANCE).body
+
+        try:
+            first_page = fetch_page(1)
+        except Exception as e:
+            print(f"Error listing {label}: {str(e)}")
+            return
+        yield first_page
+
+        page_count = -(-(first_page.total_count or 0) // self.DESCRIBE_PAGE_SIZE)
+        pages = [(page_number, self.scheduler.submit(fetch_page, page_number))
+                 for page_number in range(2, page_count + 1)]
+        try:
+            for page_number, future in pages:
+                try:
+                    # Fetch inline if no pool thread has picked the page up yet
+                    yield fetch_page(page_number) if future.cancel() else future.result()
+                except Exception as e:
+                    print(f"⚠ Error listing {label} (page {page_number}/{page_count}): {str(e)}")
+        finally:
+            for _, future in pages:
+                future.cancel()
+
+    def iter_instances(self) -> Iterator[Dict]:
+        """
+        Stream all OceanBase instances in the region, page by page
+
+        Yields:
+            Instance information dictionaries as their page arrives
+        """
+        for body in self._iter_describe_pages(
+            'describe_instances',
+            self.oceanbase_client.describe_instances,
+            lambda page_number: oceanbase_models.DescribeInstancesRequest(
+                page_number=page_number, page_size=self.DESCRIBE_PAGE_SIZE
+            ),
+            'instances',
+            stage='discovery'
+        ):
+            self._observe_instances(body)
+            yield from self._parse_instances(body)
 
     def list_all_instances(self) -> List[Dict]:
         """
@@ -62,33 +393,31 @@ class OceanBaseReporter:
         Returns:
             List of instance information dictionaries
         """
-        try:
-            # Get all instances with explicit page_size
-            request = oceanbase_models.DescribeInstancesRequest(page_size=100)
-            response = self.oceanbase_client.describe_instances(request)
-
-            instances = []
-            if response.body.instances:
-                for instance in response.body.instances:
-                    instances.append({
-                        'instance_id': instance.instance_id,
-                        'instance_name': instance.instance_name,
-                        'status': instance.state,
-                        'series': instance.series,
-                        'cpu': instance.cpu,
-                        'memory': instance.mem,
-                        'disk_size': instance.disk_size,
-                        'used_disk_size': instance.used_disk_size if instance.used_disk_size else 0,
-                        'disk_type': instance.disk_type,
-                        'create_time': instance.create_time,
-                        'available_zones': instance.available_zones,
-                        'vpc_id': instance.vpc_id
-                    })
-            return instances
-        except Exception as e:
-            print(f"Error listing instances: {str(e)}")
-            return []
-
+        return list(self.iter_instances())
+
+    @staticmethod
+    def _parse_instances(body) -> List[Dict]:
+        """Convert a DescribeInstances response body to instance dictionaries"""
+        instances = []
+        if body.instances:
+            for instance in body.instances:
+                instances.append({
+                    'instance_id': instance.instance_id,
+                    'instance_name': instance.instance_name,
+                    'status': instance.state,
+                    'series': instance.series,
+                    'cpu': instance.cpu,
+                    'memory': instance.mem,
+                    'disk_size': instance.disk_size,
+                    'used_disk_size': instance.used_disk_size if instance.used_disk_size else 0,
+                    'disk_type': instance.disk_type,
+                    'create_time': instance.create_time,
+                    'available_zones': instance.available_zones,
+                    'vpc_id': instance.vpc_id
+                })
+        return instances
+
+    @profiled('instance_details')
     def get_instance_details(self, instance_id: str) -> Optional[Dict]:
         """
         Get detailed information about a specific OceanBase instance
@@ -100,117 +429,148 @@ class OceanBaseReporter:
         Returns:
             Dictionary with instance details including capacity allocation
         """
+        cached = self._cached_topology(instance_id)
+        if cached is not None:
+            return cached
         try:
             request = oceanbase_models.DescribeInstanceRequest(
                 instance_id=instance_id
             )
-            response = self.oceanbase_client.describe_instance(request)
-            instance = response.body.instance
-
-            # Extract CPU resource allocation
-            total_cpu = 0
-            used_cpu = 0  # This is ALLOCATED CPU to tenants
-            unit_cpu = 0
-            original_total_cpu = 0
-            if instance.resource and instance.resource.cpu:
-                cpu_obj = instance.resource.cpu
-                total_cpu = getattr(cpu_obj, 'total_cpu', 0)
-                used_cpu = getattr(cpu_obj, 'used_cpu', 0)
-                unit_cpu = getattr(cpu_obj, 'unit_cpu', 0)
-                original_total_cpu = getattr(cpu_obj, 'original_total_cpu', total_cpu)
-
-            # Extract Memory resource allocation
-            total_memory = 0
-            used_memory = 0  # This is ALLOCATED MEMORY to tenants
-            unit_memory = 0
-            original_total_memory = 0
-            if instance.resource and instance.resource.memory:
-                memory_obj = instance.resource.memory
-                total_memory = getattr(memory_obj, 'total_memory', 0)
-                used_memory = getattr(memory_obj, 'used_memory', 0)
-                unit_memory = getattr(memory_obj, 'unit_memory', 0)
-                original_total_memory = getattr(memory_obj, 'original_total_memory', total_memory)
-
-            # Extract Data Disk resource allocation
-            total_disk = 0
-            used_disk = 0  # This is ALLOCATED disk space
-            data_used_size = 0  # This is ACTUAL data usage
-            max_disk_used_pct = 0
-            unit_disk_size = 0
-            original_total_disk = 0
-            if instance.resource and instance.resource.disk_size:
-                disk_obj = instance.resource.disk_size
-                total_disk = getattr(disk_obj, 'total_disk_size', 0)
-                used_disk = getattr(disk_obj, 'used_disk_size', 0)
-                data_used_size = getattr(disk_obj, 'data_used_size', 0)
-                max_disk_used_pct = getattr(disk_obj, 'max_disk_used_percent', 0)
-                unit_disk_size = getattr(disk_obj, 'unit_disk_size', 0)
-                original_total_disk = getattr(disk_obj, 'original_total_disk_size', total_disk)
-
-            # Extract Log Disk resource allocation
-            total_log_disk = 0
-            log_assigned = 0  # This is ALLOCATED log disk
-            max_log_assigned_pct = 0
-            unit_log_disk = 0
-            original_total_log_disk = 0
-            if instance.resource and hasattr(instance.resource, 'log_disk_size') and instance.resource.log_disk_size:
-                log_disk_obj = instance.resource.log_disk_size
-                total_log_disk = getattr(log_disk_obj, 'total_disk_size',
-                                        getattr(log_disk_obj, 'total_log_disk', 0))
-                log_assigned = getattr(log_disk_obj, 'log_assigned_size',
-                                      getattr(log_disk_obj, 'used_log_disk_size', 0))
-                max_log_assigned_pct = getattr(log_disk_obj, 'max_log_assigned_percent', 0)
-                unit_log_disk = getattr(log_disk_obj, 'unit_disk_size',
-                                       getattr(log_disk_obj, 'unit_log_disk', 0))
-                original_total_log_disk = getattr(log_disk_obj, 'original_total_disk_size', total_log_disk)
-
-            # Calculate capacity allocation percentages (handle None values)
-            cpu_allocation_pct = (used_cpu / total_cpu * 100) if (total_cpu and total_cpu > 0) else 0
-            memory_allocation_pct = (used_memory / total_memory * 100) if (total_memory and total_memory > 0) else 0
-            storage_allocation_pct = (used_disk / total_disk * 100) if (total_disk and total_disk > 0) else 0
-            log_disk_allocation_pct = (log_assigned / total_log_disk * 100) if (total_log_disk and total_log_disk > 0) else 0
-
-            # Calculate available resources (handle None values)
-            available_cpu = (total_cpu - used_cpu) if (total_cpu and used_cpu) else 0
-            available_memory = (total_memory - used_memory) if (total_memory and used_memory) else 0
-            available_storage = (total_disk - used_disk) if (total_disk and used_disk) else 0
-            available_log_disk = (total_log_disk - log_assigned) if (total_log_disk and log_assigned) else 0
-
-            return {
-                'instance_id': instance.instance_id,
-                'instance_name': instance.instance_name,
-                'status': instance.status,
-                'series': instance.series,
-
-                # CPU Capacity Allocation
-                'total_cpu': total_cpu if total_cpu is not None else 0,
-                'allocated_cpu': used_cpu if used_cpu is not None else 0,  # NEW: CPU allocated to tenants
-                'available_cpu': available_cpu if available_cpu is not None else 0,  # NEW: CPU still available
-
-                # Memory Capacity Allocation
-                'total_memory': total_memory if total_memory is not None else 0,
-                'allocated_memory': used_memory if used_memory is not None else 0,  # NEW: Memory allocated to tenants
-                'available_memory': available_memory if available_memory is not None else 0,  # NEW: Memory still available
-
-                # Storage (Data Disk) Capacity Allocation
-                'total_storage': total_disk if total_disk is not None else 0,
-                'allocated_storage': used_disk if used_disk is not None else 0,  # NEW: Storage allocated
-                'actual_data_usage': data_used_size if data_used_size is not None else 0,  # NEW: Actual data usage
-                'available_storage': available_storage if available_storage is not None else 0,  # NEW: Storage still available
-
-                # Log Disk Capacity Allocation
-                'total_log_disk': total_log_disk if total_log_disk is not None else 0,
-                'allocated_log_disk': log_assigned if log_assigned is not None else 0,  # NEW: Log disk allocated
-                'available_log_disk': available_log_disk if available_log_disk is not None else 0,  # NEW: Log disk still available
-
-                # Instance metadata
-                'disk_type': instance.disk_type,
-                'create_time': instance.create_time
-            }
+            response = self._call_api(
+                'describe_instance', self.oceanbase_client.describe_instance, request,
+                priority=PRIORITY_INSTANCE
+            )
+            self._remember_instance_profile(response.body.instance)
+            return self._cache_topology(self._parse_instance_details(response.body.instance), instance_id)
         except Exception as e:
             print(f"Error getting instance details for {instance_id}: {str(e)}")
             return None
 
+    @staticmethod
+    def _parse_instance_details(instance) -> Dict:
+        """Convert a DescribeInstance instance model to the capacity allocation dictionary"""
+        # Extract CPU resource allocation
+        total_cpu = 0
+        used_cpu = 0  # This is ALLOCATED CPU to tenants
+        unit_cpu = 0
+        original_total_cpu = 0
+        if instance.resource and instance.resource.cpu:
+            cpu_obj = instance.resource.cpu
+            total_cpu = getattr(cpu_obj, 'total_cpu', 0)
+            used_cpu = getattr(cpu_obj, 'used_cpu', 0)
+            unit_cpu = getattr(cpu_obj, 'unit_cpu', 0)
+            original_total_cpu = getattr(cpu_obj, 'original_total_cpu', total_cpu)
+
+        # Extract Memory resource allocation
+        total_memory = 0
+        used_memory = 0  # This is ALLOCATED MEMORY to tenants
+        unit_memory = 0
+        original_total_memory = 0
+        if instance.resource and instance.resource.memory:
+            memory_obj = instance.resource.memory
+            total_memory = getattr(memory_obj, 'total_memory', 0)
+            used_memory = getattr(memory_obj, 'used_memory', 0)
+            unit_memory = getattr(memory_obj, 'unit_memory', 0)
+            original_total_memory = getattr(memory_obj, 'original_total_memory', total_memory)
+
+        # Extract Data Disk resource allocation
+        total_disk = 0
+        used_disk = 0  # This is ALLOCATED disk space
+        data_used_size = 0  # This is ACTUAL data usage
+        max_disk_used_pct = 0
+        unit_disk_size = 0
+        original_total_disk = 0
+        if instance.resource and instance.resource.disk_size:
+            disk_obj = instance.resource.disk_size
+            total_disk = getattr(disk_obj, 'total_disk_size', 0)
+            used_disk = getattr(disk_obj, 'used_disk_size', 0)
+            data_used_size = getattr(disk_obj, 'data_used_size', 0)
+            max_disk_used_pct = getattr(disk_obj, 'max_disk_used_percent', 0)
+            unit_disk_size = getattr(disk_obj, 'unit_disk_size', 0)
+            original_total_disk = getattr(disk_obj, 'original_total_disk_size', total_disk)
+
+        # Extract Log Disk resource allocation
+        total_log_disk = 0
+        log_assigned = 0  # This is ALLOCATED log disk
+        max_log_assigned_pct = 0
+        unit_log_disk = 0
+        original_total_log_disk = 0
+        if instance.resource and hasattr(instance.resource, 'log_disk_size') and instance.resource.log_disk_size:
+            log_disk_obj = instance.resource.log_disk_size
+            total_log_disk = getattr(log_disk_obj, 'total_disk_size',
+                                    getattr(log_disk_obj, 'total_log_disk', 0))
+            log_assigned = getattr(log_disk_obj, 'log_assigned_size',
+                                  getattr(log_disk_obj, 'used_log_disk_size', 0))
+            max_log_assigned_pct = getattr(log_disk_obj, 'max_log_assigned_percent', 0)
+            unit_log_disk = getattr(log_disk_obj, 'unit_disk_size',
+                                   getattr(log_disk_obj, 'unit_log_disk', 0))
+            original_total_log_disk = getattr(log_disk_obj, 'original_total_disk_size', total_log_disk)
+
+        # Calculate capacity allocation percentages (handle None values)
+        cpu_allocation_pct = (used_cpu / total_cpu * 100) if (total_cpu and total_cpu > 0) else 0
+        memory_allocation_pct = (used_memory / total_memory * 100) if (total_memory and total_memory > 0) else 0
+        storage_allocation_pct = (used_disk / total_disk * 100) if (total_disk and total_disk > 0) else 0
+        log_disk_allocation_pct = (log_assigned / total_log_disk * 100) if (total_log_disk and total_log_disk > 0) else 0
+
+        # Calculate available resources (handle None values)
+        available_cpu = (total_cpu - used_cpu) if (total_cpu and used_cpu) else 0
+        available_memory = (total_memory - used_memory) if (total_memory and used_memory) else 0
+        available_storage = (total_disk - used_disk) if (total_disk and used_disk) else 0
+        available_log_disk = (total_log_disk - log_assigned) if (total_log_disk and log_assigned) else 0
+
+        return {
+            'instance_id': instance.instance_id,
+            'instance_name': instance.instance_name,
+            'status': instance.status,
+            'series': instance.series,
+
+            # CPU Capacity Allocation
+            'total_cpu': total_cpu if total_cpu is not None else 0,
+            'allocated_cpu': used_cpu if used_cpu is not None else 0,  # NEW: CPU allocated to tenants
+            'available_cpu': available_cpu if available_cpu is not None else 0,  # NEW: CPU still available
+
+            # Memory Capacity Allocation
+            'total_memory': total_memory if total_memory is not None else 0,
+            'allocated_memory': used_memory if used_memory is not None else 0,  # NEW: Memory allocated to tenants
+            'available_memory': available_memory if available_memory is not None else 0,  # NEW: Memory still available
+
+            # Storage (Data Disk) Capacity Allocation
+            'total_storage': total_disk if total_disk is not None else 0,
+            'allocated_storage': used_disk if used_disk is not None else 0,  # NEW: Storage allocated
+            'actual_data_usage': data_used_size if data_used_size is not None else 0,  # NEW: Actual data usage
+            'available_storage': available_storage if available_storage is not None else 0,  # NEW: Storage still available
+
+            # Log Disk Capacity Allocation
+            'total_log_disk': total_log_disk if total_log_disk is not None else 0,
+            'allocated_log_disk': log_assigned if log_assigned is not None else 0,  # NEW: Log disk allocated
+            'available_log_disk': available_log_disk if available_log_disk is not None else 0,  # NEW: Log disk still available
+
+            # Instance metadata
+            'disk_type': instance.disk_type,
+            'create_time': instance.create_time
+        }
+    def iter_tenants(self, instance_id: str) -> Iterator[Dict]:
+        """
+        Stream all tenants of an OceanBase instance, page by page
+
+        Args:
+            instance_id: OceanBase instance ID
+
+        Yields:
+            Tenant information dictionaries as their page arrives
+        """
+        for body in self._iter_describe_pages(
+            'describe_tenants',
+            self.oceanbase_client.describe_tenants,
+            lambda page_number: oceanbase_models.DescribeTenantsRequest(
+                instance_id=instance_id, page_number=page_number, page_size=self.DESCRIBE_PAGE_SIZE
+            ),
+            f'tenants for instance {instance_id}'
+        ):
+            self._observe_tenants(instance_id, body)
+            yield from self._parse_tenants(body)
+
+    @profiled('tenant_fetch')
     def list_tenants(self, instance_id: str) -> List[Dict]:
         """
         List all tenants in an OceanBase instance with pagination
@@ -221,30 +581,25 @@ class OceanBaseReporter:
         Returns:
             List of tenant information dictionaries
         """
-        try:
-            # Get all tenants with explicit page_size
-            request = oceanbase_models.DescribeTenantsRequest(
-                instance_id=instance_id,
-                page_size=100
-            )
-            response = self.oceanbase_client.describe_tenants(request)
-
-            tenants = []
-            if response.body.tenants:
-                for tenant in response.body.tenants:
-                    tenants.append({
-                        'tenant_id': tenant.tenant_id,
-                        'tenant_name': tenant.tenant_name,
-                        # Note: cpu, memory, unit_num removed - now fetched via get_tenant_details()
-                        # which provides better-named fields: tenant_allocated_cpu, tenant_allocated_memory, tenant_unit_num
-                        'create_time': tenant.create_time,
-                        'tenant_mode': tenant.tenant_mode if tenant.tenant_mode else 'N/A'
-                    })
-            return tenants
-        except Exception as e:
-            print(f"Error listing tenants for instance {instance_id}: {str(e)}")
-            return []
+        return self._observe_tenant_set(instance_id, list(self.iter_tenants(instance_id)))
+
+    @staticmethod
+    def _parse_tenants(body) -> List[Dict]:
+        """Convert a DescribeTenants response body to tenant dictionaries"""
+        tenants = []
+        if body.tenants:
+            for tenant in body.tenants:
+                tenants.append({
+                    'tenant_id': tenant.tenant_id,
+                    'tenant_name': tenant.tenant_name,
+                    # Note: cpu, memory, unit_num removed - now fetched via get_tenant_details()
+                    # which provides better-named fields: tenant_allocated_cpu, tenant_allocated_memory, tenant_unit_num
+                    'create_time': tenant.create_time,
+                    'tenant_mode': tenant.tenant_mode if tenant.tenant_mode else 'N/A'
+                })
+        return tenants
 
+    @profiled('tenant_fetch', per_tenant=True)
     def get_tenant_details(self, instance_id: str, tenant_id: str) -> Optional[Dict]:
         """
         Get detailed tenant information including resource allocation
@@ -256,84 +611,383 @@ class OceanBaseReporter:
         Returns:
             Dictionary with detailed tenant information including allocated resources
         """
+        cached = self._cached_topology(instance_id, tenant_id)
+        if cached is not None:
+            return cached
         try:
             request = oceanbase_models.DescribeTenantRequest(
                 instance_id=instance_id,
                 tenant_id=tenant_id
             )
-            response = self.oceanbase_client.describe_tenant(request)
+            response = self._call_api(
+                'describe_tenant', self.oceanbase_client.describe_tenant, request,
+                priority=PRIORITY_TENANT
+            )
 
-            if response.body and response.body.tenant:
-                tenant = response.body.tenant
+            return self._cache_topology(self._parse_tenant_details(response.body), instance_id, tenant_id)
+        except Exception as e:
+            print(f"Error getting tenant details for {tenant_id}: {str(e)}")
+            return None
 
-                # Extract basic tenant info
-                tenant_info = {
-                    'tenant_id': tenant.tenant_id,
-                    'tenant_name': tenant.tenant_name,
-                    'tenant_mode': tenant.tenant_mode if tenant.tenant_mode else 'N/A',
-                    'create_time': tenant.create_time,
-                }
-
-                # Extract max_connections only (no other connection details)
-                if hasattr(tenant, 'tenant_connections') and tenant.tenant_connections:
-                    connections = tenant.tenant_connections
-                    if connections and len(connections) > 0:
-                        primary_conn = connections[0]
-                        tenant_info['max_connections'] = getattr(primary_conn, 'max_connection_num', 0)
-                else:
-                    tenant_info['max_connections'] = 0
-
-                # Extract resource allocation from TenantResource
-                if hasattr(tenant, 'tenant_resource') and tenant.tenant_resource:
-                    resource = tenant.tenant_resource
-
-                    # CPU allocation (total only, no per-unit)
-                    if hasattr(resource, 'cpu') and resource.cpu:
-                        cpu_obj = resource.cpu
-                        tenant_info['tenant_allocated_cpu'] = getattr(cpu_obj, 'total_cpu', 0)
-
-                    # Memory allocation (total only, no per-unit)
-                    if hasattr(resource, 'memory') and resource.memory:
-                        memory_obj = resource.memory
-                        tenant_info['tenant_allocated_memory'] = getattr(memory_obj, 'total_memory', 0)
-
-                    # Get unit_num for calculations
-                    unit_num = getattr(resource, 'unit_num', 0)
-
-                    # Disk allocation and usage
-                    # NOTE: SDK only provides 'used_disk_size' in disk_size object
-                    # Total allocated disk must be calculated from unit_num (not available in API)
-                    if hasattr(resource, 'disk_size') and resource.disk_size:
-                        disk_obj = resource.disk_size
-                        # The SDK doesn't provide total_disk_size, only used_disk_size
-                        # We'll use used_disk_size for both fields since total isn't available
-                        tenant_info['tenant_allocated_disk'] = 0  # Not available in API
-                        tenant_info['tenant_actual_disk_usage'] = getattr(disk_obj, 'used_disk_size', 0)
-
-                    # Log disk allocation and usage
-                    # NOTE: SDK only provides 'total_log_disk' and 'unit_log_disk'
-                    # Used log disk size is not available in the DescribeTenant API
-                    if hasattr(resource, 'log_disk_size') and resource.log_disk_size:
-                        log_disk_obj = resource.log_disk_size
-                        tenant_info['tenant_allocated_log_disk'] = getattr(log_disk_obj, 'total_log_disk', 0)
-                        tenant_info['tenant_log_disk_usage'] = 0  # Not available in API - would need CloudMonitor metrics
+    @staticmethod
+    def _parse_tenant_details(body) -> Optional[Dict]:
+        """Convert a DescribeTenant response body to the tenant resource allocation dictionary"""
+        if body and body.tenant:
+            tenant = body.tenant
+
+            # Extract basic tenant info
+            tenant_info = {
+                'tenant_id': tenant.tenant_id,
+                'tenant_name': tenant.tenant_name,
+                'tenant_mode': tenant.tenant_mode if tenant.tenant_mode else 'N/A',
+                'create_time': tenant.create_time,
+            }
 
-                else:
-                    # Fallback to basic tenant info if TenantResource not available
-                    tenant_info['tenant_allocated_cpu'] = tenant.cpu if hasattr(tenant, 'cpu') else 0
-                    tenant_info['tenant_allocated_memory'] = tenant.mem if hasattr(tenant, 'mem') else 0
-                    tenant_info['tenant_allocated_disk'] = 0
-                    tenant_info['tenant_actual_disk_usage'] = 0
-                    tenant_info['tenant_allocated_log_disk'] = 0
-                    tenant_info['tenant_log_disk_usage'] = 0
+            # Extract max_connections only (no other connection details)
+            if hasattr(tenant, 'tenant_connections') and tenant.tenant_connections:
+                connections = tenant.tenant_connections
+                if connections and len(connections) > 0:
+                    primary_conn = connections[0]
+                    tenant_info['max_connections'] = getattr(primary_conn, 'max_connection_num', 0)
+            else:
+                tenant_info['max_connections'] = 0
+
+            # Extract resource allocation from TenantResource
+            if hasattr(tenant, 'tenant_resource') and tenant.tenant_resource:
+                resource = tenant.tenant_resource
+
+                # CPU allocation (total only, no per-unit)
+                if hasattr(resource, 'cpu') and resource.cpu:
+                    cpu_obj = resource.cpu
+                    tenant_info['tenant_allocated_cpu'] = getattr(cpu_obj, 'total_cpu', 0)
+
+                # Memory allocation (total only, no per-unit)
+                if hasattr(resource, 'memory') and resource.memory:
+                    memory_obj = resource.memory
+                    tenant_info['tenant_allocated_memory'] = getattr(memory_obj, 'total_memory', 0)
+
+                # Get unit_num for calculations
+                unit_num = getattr(resource, 'unit_num', 0)
+
+                # Disk allocation and usage
+                # NOTE: SDK only provides 'used_disk_size' in disk_size object
+                # Total allocated disk must be calculated from unit_num (not available in API)
+                if hasattr(resource, 'disk_size') and resource.disk_size:
+                    disk_obj = resource.disk_size
+                    # The SDK doesn't provide total_disk_size, only used_disk_size
+                    # We'll use used_disk_size for both fields since total isn't available
+                    tenant_info['tenant_allocated_disk'] = 0  # Not available in API
+                    tenant_info['tenant_actual_disk_usage'] = getattr(disk_obj, 'used_disk_size', 0)
+
+                # Log disk allocation and usage
+                # NOTE: SDK only provides 'total_log_disk' and 'unit_log_disk'
+                # Used log disk size is not available in the DescribeTenant API
+                if hasattr(resource, 'log_disk_size') and resource.log_disk_size:
+                    log_disk_obj = resource.log_disk_size
+                    tenant_info['tenant_allocated_log_disk'] = getattr(log_disk_obj, 'total_log_disk', 0)
+                    tenant_info['tenant_log_disk_usage'] = 0  # Not available in API - would need CloudMonitor metrics
 
-                return tenant_info
+            else:
+                # Fallback to basic tenant info if TenantResource not available
+                tenant_info['tenant_allocated_cpu'] = tenant.cpu if hasattr(tenant, 'cpu') else 0
+                tenant_info['tenant_allocated_memory'] = tenant.mem if hasattr(tenant, 'mem') else 0
+                tenant_info['tenant_allocated_disk'] = 0
+                tenant_info['tenant_actual_disk_usage'] = 0
+                tenant_info['tenant_allocated_log_disk'] = 0
+                tenant_info['tenant_log_disk_usage'] = 0
+
+            return tenant_info
+
+        return None
+
+    def _observe_instances(self, body) -> None:
+        """Record instance types and topology fingerprints of a DescribeInstances page"""
+        for instance in body.instances or []:
+            self._remember_instance_profile(instance)
+            if self.topology_cache is not None:
+                self.topology_cache.observe(
+                    TopologyCache.key(self.region, instance.instance_id), instance_fingerprint(instance)
+                )
 
-            return None
+    def _observe_tenants(self, instance_id: str, body) -> None:
+        """Record topology fingerprints of a DescribeTenants page"""
+        if self.topology_cache is not None:
+            for tenant in body.tenants or []:
+                self.topology_cache.observe(
+                    TopologyCache.key(self.region, instance_id, tenant.tenant_id), tenant_fingerprint(tenant)
+                )
 
-        except Exception as e:
-            print(f"Error getting tenant details for {tenant_id}: {str(e)}")
+    def _observe_tenant_set(self, instance_id: str, tenants: List[Dict]) -> List[Dict]:
+        """Compare the listed tenants of an instance with the previous run's (an empty listing may be an API error)"""
+        if self.topology_cache is not None and tenants:
+            if self.topology_cache.observe_tenant_set(self.region, instance_id, [t['tenant_id'] for t in tenants]):
+                print(f"  Tenants of {instance_id} changed since the last run: refreshing its cached topology")
+        return tenants
+
+    def _cached_topology(self, instance_id: str, tenant_id: Optional[str] = None) -> Optional[Dict]:
+        """Instance (or tenant) details from the topology cache, if still valid"""
+        if self.topology_cache is None:
+            return None
+        entry = self.topology_cache.get(TopologyCache.key(self.region, instance_id, tenant_id))
+        if entry is None:
             return None
+        if entry.get('profile'):
+            self._instance_profiles[instance_id] = tuple(entry['profile'])
+        # Callers add fields to the details: keep the cached entry untouched
+        return dict(entry['data'])
+
+    def _cache_topology(
+        self,
+        details: Optional[Dict],
+        instance_id: str,
+        tenant_id: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Store freshly fetched instance (or tenant) details in the topology cache; returns them"""
+        if self.topology_cache is not None and details is not None:
+            profile = None if tenant_id else self._instance_profiles.get(instance_id)
+            self.topology_cache.put(
+                TopologyCache.key(self.region, instance_id, tenant_id), dict(details),
+                profile=list(profile) if profile else None
+            )
+        return details
+
+    def _remember_instance_profile(self, instance) -> None:
+        """Record series/version of an instance model (the instance type of its metric registry keys)"""
+        if instance is not None and instance.instance_id:
+            self._instance_profiles[instance.instance_id] = (
+                instance.series or 'unknown', instance.version or 'unknown'
+            )
+
+    def _metric_enabled(self, instance_id: str, metric_name: str, scope: str) -> bool:
+        """
+        Check the metric availability registry before querying a metric
+
+        Args:
+            instance_id: OceanBase instance ID
+            metric_name: CloudMonitor metric name
+            scope: SCOPE_INSTANCE or SCOPE_TENANT
+
+        Returns:
+            False if the metric is known to return no data for this instance type, or is
+            unverified and the registry has no record of it
+        """
+        unverified = metric_name in (
+            self.UNVERIFIED_TENANT_METRICS if scope == SCOPE_TENANT else self.UNVERIFIED_INSTANCE_METRICS
+        )
+        profile = self._instance_profiles.get(instance_id)
+        if self.metric_registry is None or profile is None:
+            return not unverified
+        if unverified and self.metric_registry.seed_unavailable(
+            self.region, *profile, metric_name, scope, 'unavailable in testing'
+        ):
+            return False
+        return self.metric_registry.should_query(self.region, *profile, metric_name, scope)
+
+    def _observe_metric(
+        self,
+        instance_id: str,
+        metric_name: str,
+        scope: str,
+        has_data: bool,
+        error: Optional[Exception] = None
+    ) -> None:
+        """
+        Record the outcome of a metric query in the availability registry
+        Throttled and transient failures say nothing about availability and are not recorded
+
+        Args:
+            instance_id: OceanBase instance ID
+            metric_name: CloudMonitor metric name
+            scope: SCOPE_INSTANCE or SCOPE_TENANT
+            has_data: True if the query returned at least one datapoint
+            error: Exception raised by the query, if any
+        """
+        profile = self._instance_profiles.get(instance_id)
+        if self.metric_registry is None or profile is None:
+            return
+        reason = None
+        if error is not None:
+            if not is_permanent_error(error):
+                return
+            reason = str(getattr(error, 'code', None) or error)[:80]
+        self.metric_registry.record(self.region, *profile, metric_name, scope, has_data, reason)
+
+    def _new_stats(self) -> MetricStats:
+        """Create an empty metric accumulator with the configured error bound"""
+        return MetricStats(relative_accuracy=self.stats_accuracy)
+
+    def _describe_metric_page(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str,
+        next_token: Optional[str] = None,
+        priority: int = PRIORITY_TENANT
+    ):
+        """Fetch one DescribeMetricList page through the request scheduler"""
+        request = self._metric_list_request(metric_name, dimensions, start_ms, end_ms, next_token)
+        return self._call_api(
+            'describe_metric_list', self._describe_metric_list_checked, request,
+            priority=priority
+        )
+
+    def _describe_metric_list_checked(self, request: 'cms_models.DescribeMetricListRequest'):
+        """Send DescribeMetricList and raise errors reported in the response body (retried like HTTP errors)"""
+        response = self.cms_client.describe_metric_list(request)
+        self._check_metric_response(response)
+        return response
+
+    @staticmethod
+    def _check_metric_response(response) -> None:
+        """
+        Raise ApiResponseError if CloudMonitor reported a failure with HTTP 200
+
+        Args:
+            response: DescribeMetricList response
+        """
+        body = response.body
+        if body is not None and body.success is False:
+            code = str(body.code or '')
+            raise ApiResponseError(code, body.message or '', int(code) if code.isdigit() else None)
+
+    def _metric_list_request(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str,
+        next_token: Optional[str] = None
+    ) -> 'cms_models.DescribeMetricListRequest':
+        """Build a DescribeMetricList request for one page"""
+        from alibabacloud_cms20190101 import models as cms_models
+        return cms_models.DescribeMetricListRequest(
+            namespace='acs_oceanbase',
+            metric_name=metric_name,
+            dimensions=dimensions,
+            start_time=start_ms,
+            end_time=end_ms,
+            period=str(self.METRIC_PERIOD),
+            length=str(self.METRIC_PAGE_LENGTH),
+            next_token=next_token
+        )
+
+    def iter_metric_datapoints(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str,
+        priority: int = PRIORITY_TENANT
+    ) -> Iterator[List[Dict]]:
+        """
+        Iterate over ALL datapoints of a metric query page by page
+        With a datapoint store, only the time ranges missing from the store are requested
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string
+            start_ms: Start time (milliseconds since epoch)
+            end_ms: End time (milliseconds since epoch)
+            priority: Scheduler priority (PRIORITY_INSTANCE or PRIORITY_TENANT)
+
+        Yields:
+            List of datapoint dictionaries for each non-empty page
+        """
+        store = self.datapoint_store
+        if store is None:
+            yield from self._iter_api_datapoints(metric_name, dimensions, start_ms, end_ms, priority)
+            return
+
+        fetched = self._fill_datapoints(metric_name, dimensions, start_ms, end_ms, priority)
+        yield from store.read(
+            metric_name, dimensions, self.METRIC_PERIOD, int(start_ms), int(end_ms),
+            page_size=self.METRIC_PAGE_LENGTH, fetched=fetched
+        )
+
+    def _fill_datapoints(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str,
+        priority: int = PRIORITY_TENANT
+    ) -> int:
+        """
+        Fetch the time ranges of a metric query that are missing from the datapoint store
+
+        Returns:
+            Number of datapoints fetched
+        """
+        store = self.datapoint_store
+        fetched = 0
+        for range_start, range_end in store.missing_ranges(
+            metric_name, dimensions, self.METRIC_PERIOD, int(start_ms), int(end_ms)
+        ):
+            datapoints = []
+            for page in self._iter_api_datapoints(
+                metric_name, dimensions, str(range_start), str(range_end), priority
+            ):
+                datapoints.extend(page)
+            store.add(metric_name, dimensions, self.METRIC_PERIOD, range_start, range_end, datapoints)
+            fetched += len(datapoints)
+        return fetched
+
+    def _iter_api_datapoints(
+        self,
+        metric_name: str,
+        dimensions: str,
+        start_ms: str,
+        end_ms: str,
+        priority: int = PRIORITY_TENANT
+    ) -> Iterator[List[Dict]]:
+        """
+        Iterate over ALL DescribeMetricList datapoints page by page, following NextToken
+        The next page is requested in the background while the caller processes the current one
+
+        Args:
+            metric_name: CloudMonitor metric name
+            dimensions: Dimensions JSON string
+            start_ms: Start time (milliseconds since epoch)
+            end_ms: End time (milliseconds since epoch)
+            priority: Scheduler priority (PRIORITY_INSTANCE or PRIORITY_TENANT)
+
+        Yields:
+            List of datapoint dictionaries for each non-empty page
+        """
+        response = self._describe_metric_page(
+            metric_name, dimensions, start_ms, end_ms, priority=priority
+        )
+        next_page = None
+        try:
+            while True:
+                next_token = response.body.next_token
+                next_page = None
+                if next_token:
+                    next_page = self.scheduler.submit(
+                        self._describe_metric_page, metric_name, dimensions, start_ms, end_ms,
+                        next_token, priority
+                    )
+
+                if response.body.datapoints:
+                    datapoints = json.loads(response.body.datapoints)
+                    self.scheduler.profiler.record_datapoints(len(datapoints))
+                    if datapoints:
+                        yield datapoints
+
+                if next_page is None:
+                    break
+                if next_page.cancel():
+                    # Prefetch still queued behind busy pool threads: fetch the page here
+                    response = self._describe_metric_page(
+                        metric_name, dimensions, start_ms, end_ms, next_token, priority
+                    )
+                else:
+                    response = next_page.result()
+        finally:
+            # Consumer stopped early or a page failed: don't leave a queued prefetch behind
+            if next_page is not None:
+                next_page.cancel()
 
     def get_metrics(
         self,
@@ -355,280 +1009,344 @@ class OceanBaseReporter:
 
         Returns:
             Dictionary with metric data including avg, min, max, P95
+            (None if the metric is unavailable or known to be unavailable)
         """
+        if not self._metric_enabled(instance_id, metric_name, SCOPE_INSTANCE):
+            return None
         try:
-            if not end_time:
-                end_time = datetime.now()
+            start_ms, end_ms = self._metric_time_window(start_time, end_time)
+            stats = self._new_stats()
+            datapoint_count = 0
+            for page in self.iter_metric_datapoints(
+                metric_name,
+                self._instance_dimensions(instance_id),
+                start_ms,
+                end_ms,
+                priority=PRIORITY_INSTANCE
+            ):
+                datapoint_count += self._add_instance_datapoints(instance_id, page, stats)
+
+            self._observe_metric(instance_id, metric_name, SCOPE_INSTANCE, datapoint_count > 0)
+            return self._summarize_instance_stats(metric_name, stats, datapoint_count)
+        except Exception as e:
+            self._observe_metric(instance_id, metric_name, SCOPE_INSTANCE, False, e)
+            if is_permanent_error(e):
+                print(f"  Warning: Metrics unavailable for {metric_name}: {str(e)[:80]}")
             else:
-                end_time = datetime.fromisoformat(end_time)
+                print(f"  ⚠ Warning: {metric_name} failed after retries: {str(e)[:80]}")
+            return None
 
-            if not start_time:
-                start_time = end_time - timedelta(days=1)  # Last 24 hours for faster retrieval
-            else:
-                start_time = datetime.fromisoformat(start_time)
-
-            request = cms_models.DescribeMetricListRequest(
-                namespace='acs_oceanbase',
-                metric_name=metric_name,
-                dimensions=f'[{{"instanceId":"{instance_id}"}}]',
-                start_time=str(int(start_time.timestamp() * 1000)),
-                end_time=str(int(end_time.timestamp() * 1000)),
-                period=str(3600)  # 1 hour aggregation for faster response
-            )
+    @staticmethod
+    def _instance_dimensions(instance_id: str) -> str:
+        """CloudMonitor dimensions JSON for an instance-level metric query"""
+        return f'[{{"instanceId":"{instance_id}"}}]'
 
-            response = self.cms_client.describe_metric_list(request)
-
-            if response.body.datapoints:
-                import json
-                datapoints = json.loads(response.body.datapoints)
-
-                # Filter datapoints for this specific instance
-                # CloudMonitor returns data for all instances, need to filter by obClusterId
-                if datapoints:
-                    instance_datapoints = [
-                        dp for dp in datapoints
-                        if dp.get('obClusterId') == instance_id or dp.get('instanceId') == instance_id
-                    ]
-
-                    if instance_datapoints:
-                        # CloudMonitor uses 'Average' for some metrics and 'Value' for others
-                        values = []
-                        for dp in instance_datapoints:
-                            if dp.get('Average') is not None:
-                                values.append(dp.get('Average'))
-                            elif dp.get('Value') is not None:
-                                values.append(dp.get('Value'))
-
-                        if values:
-                            # Calculate P95
-                            sorted_values = sorted(values)
-                            p95_index = int(len(sorted_values) * 0.95)
-                            p95_value = sorted_values[p95_index] if p95_index < len(sorted_values) else sorted_values[-1]
-
-                            # Calculate raw values first
-                            raw_avg = sum(values) / len(values)
-                            raw_min = min(values)
-                            raw_max = max(values)
-                            raw_p95 = p95_value
-
-                            # Debug: Log if any values exceed 100%
-                            if raw_max > 100.0 or raw_avg > 100.0 or raw_p95 > 100.0:
-                                print(f"    ⚠ WARNING: {metric_name} exceeded 100% - Raw values: avg={raw_avg:.2f}, min={raw_min:.2f}, max={raw_max:.2f}, p95={raw_p95:.2f}")
-                                print(f"      Sample values from API: {values[:5]}")
-
-                            # Cap all values at 100% for utilization metrics (percentages should not exceed 100%)
-                            avg_value = min(raw_avg, 100.0)
-                            min_value = min(raw_min, 100.0)
-                            max_value = min(raw_max, 100.0)
-                            p95_value = min(raw_p95, 100.0)
-
-                            return {
-                                'metric_name': metric_name,
-                                'avg': round(avg_value, 2),
-                                'min': round(min_value, 2),
-                                'max': round(max_value, 2),
-                                'p95': round(p95_value, 2),
-                                'datapoint_count': len(instance_datapoints),
-                                # Include raw values for debugging
-                                'raw_avg': round(raw_avg, 2),
-                                'raw_max': round(raw_max, 2)
-                            }
+    @staticmethod
+    def _add_instance_datapoints(instance_id: str, page: List[Dict], stats: MetricStats) -> int:
+        """
+        Add one page of instance datapoints to an accumulator
+
+        Returns:
+            Number of datapoints belonging to the instance
+        """
+        datapoint_count = 0
+        # Filter datapoints for this specific instance
+        # CloudMonitor returns data for all instances, need to filter by obClusterId
+        for dp in page:
+            if dp.get('obClusterId') != instance_id and dp.get('instanceId') != instance_id:
+                continue
+            datapoint_count += 1
+            # CloudMonitor uses 'Average' for some metrics and 'Value' for others
+            if dp.get('Average') is not None:
+                stats.add(dp.get('Average'))
+            elif dp.get('Value') is not None:
+                stats.add(dp.get('Value'))
+        return datapoint_count
+
+    @staticmethod
+    def _summarize_instance_stats(metric_name: str, stats: MetricStats, datapoint_count: int) -> Dict:
+        """
+        Calculate avg/min/max/P95 for one instance metric (capped at 100%)
+
+        Args:
+            metric_name: CloudMonitor metric name
+            stats: Accumulated metric values
+            datapoint_count: Number of datapoints returned for the instance
+
+        Returns:
+            Dictionary with metric data including avg, min, max, P95
+        """
+        if stats:
+            # Calculate raw values first
+            raw_avg = stats.mean
+            raw_min = stats.min
+            raw_max = stats.max
+            raw_p95 = stats.p95()
+
+            # Debug: Log if any values exceed 100%
+            if raw_max > 100.0 or raw_avg > 100.0 or raw_p95 > 100.0:
+                print(f"    ⚠ WARNING: {metric_name} exceeded 100% - Raw values: avg={raw_avg:.2f}, min={raw_min:.2f}, max={raw_max:.2f}, p95={raw_p95:.2f}")
+                print(f"      Sample values from API: {stats.sample}")
+
+            # Cap all values at 100% for utilization metrics (percentages should not exceed 100%)
+            avg_value = min(raw_avg, 100.0)
+            min_value = min(raw_min, 100.0)
+            max_value = min(raw_max, 100.0)
+            p95_value = min(raw_p95, 100.0)
 
             return {
                 'metric_name': metric_name,
-                'avg': 0,
-                'min': 0,
-                'max': 0,
-                'p95': 0,
-                'datapoint_count': 0
+                'avg': round(avg_value, 2),
+                'min': round(min_value, 2),
+                'max': round(max_value, 2),
+                'p95': round(p95_value, 2),
+                'datapoint_count': datapoint_count,
+                # Include raw values for debugging
+                'raw_avg': round(raw_avg, 2),
+                'raw_max': round(raw_max, 2)
             }
 
-        except Exception as e:
-            print(f"  Warning: Metrics unavailable for {metric_name}: {str(e)[:80]}")
-            return None
+        return {
+            'metric_name': metric_name,
+            'avg': 0,
+            'min': 0,
+            'max': 0,
+            'p95': 0,
+            'datapoint_count': 0
+        }
+
+    def _metric_time_window(
+        self,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Convert an ISO time window to CloudMonitor millisecond timestamps (default: last 24 hours)"""
+        if not end_time:
+            end_dt = datetime.now()
+        else:
+            end_dt = datetime.fromisoformat(end_time)
+
+        if not start_time:
+            start_dt = end_dt - timedelta(hours=24)
+        else:
+            start_dt = datetime.fromisoformat(start_time)
+
+        return str(int(start_dt.timestamp() * 1000)), str(int(end_dt.timestamp() * 1000))
+
+    @staticmethod
+    def _tenant_dimensions(instance_id: str, tenant_id: Optional[str] = None) -> str:
+        """CloudMonitor dimensions JSON for one tenant, or for all tenants of an instance"""
+        if tenant_id is None:
+            return f'[{{"obClusterId":"{instance_id}"}}]'
+        return f'[{{"obClusterId":"{instance_id}","obTenantId":"{tenant_id}"}}]'
+
+    @staticmethod
+    def _tenant_value(dp: Dict) -> Optional[float]:
+        """Extract the value of a tenant datapoint (CloudMonitor uses different statistic keys per metric)"""
+        for key in ('Average', 'Value', 'Maximum', 'Max'):
+            if dp.get(key) is not None:
+                return dp.get(key)
+        return None
+
+    @staticmethod
+    def _report_tenant_metric_error(metric_name: str, tenant_id: str, error: Exception) -> None:
+        """Skip metrics that are not available; warn about metrics lost to throttling or server errors"""
+        if not is_permanent_error(error):
+            print(f"      ⚠ Tenant metric {metric_name} for {tenant_id} failed after retries: {str(error)[:80]}")
+
+    @classmethod
+    def _split_tenant_datapoints(cls, page: List[Dict], stats_by_tenant: Dict[str, MetricStats]) -> None:
+        """Add one page of a cluster-wide tenant query to the accumulator of each tenant"""
+        for dp in page:
+            stats = stats_by_tenant.get(str(dp.get('obTenantId')))
+            value = cls._tenant_value(dp)
+            if stats is not None and value is not None:
+                stats.add(value)
+
+    @staticmethod
+    def _summarize_tenant_stats(metric_name: str, output_field: str, stats: MetricStats) -> Dict:
+        """
+        Calculate avg/max/min/P95 for one tenant metric
+
+        Args:
+            metric_name: CloudMonitor metric name
+            output_field: Output column prefix
+            stats: Accumulated metric values
+
+        Returns:
+            Dictionary with {output_field}_avg/_max/_min/_p95 keys (empty if no values)
+        """
+        if not stats:
+            return {}
+
+        # Determine metric type for proper capping
+        # Only cap percentage metrics at 100%
+        # Absolute metrics (GB, MB, bytes, counts, RT, QPS, TPS) should NOT be capped
+        is_percentage_metric = ('percent' in output_field or
+                               ('usage' in metric_name and 'percent' in metric_name))
+
+        # Calculate raw values including P95
+        raw_avg = stats.mean
+        raw_max = stats.max
+        raw_min = stats.min
+        raw_p95 = stats.p95()
+
+        if is_percentage_metric:
+            # Debug: Log if percentage metrics exceed 100%
+            if raw_max > 100.0 or raw_avg > 100.0 or raw_p95 > 100.0:
+                print(f"    ⚠ WARNING: Tenant metric {metric_name} ({output_field}) exceeded 100% - Raw: avg={raw_avg:.2f}, max={raw_max:.2f}, p95={raw_p95:.2f}")
+                print(f"      Sample values from API: {stats.sample[:3]}")
+
+            avg_val = min(raw_avg, 100.0)
+            max_val = min(raw_max, 100.0)
+            min_val = min(raw_min, 100.0)
+            p95_val = min(raw_p95, 100.0)
+        else:
+            avg_val = raw_avg
+            max_val = raw_max
+            min_val = raw_min
+            p95_val = raw_p95
+
+        return {
+            f'{output_field}_avg': round(avg_val, 2),
+            f'{output_field}_max': round(max_val, 2),
+            f'{output_field}_min': round(min_val, 2),
+            f'{output_field}_p95': round(p95_val, 2),
+        }
 
+    @profiled('tenant_fetch', per_tenant=True)
     def get_tenant_metrics(
         self,
         instance_id: str,
         tenant_id: str,
         start_time: Optional[str] = None,
-        end_time: Optional[str] = None
+        end_time: Optional[str] = None,
+        metric_names: Optional[List[str]] = None
     ) -> Dict:
         """
         Get comprehensive OceanBase tenant metrics including CPU, memory, sessions, and I/O
-        Uses CloudMonitor API for metrics collection
+        Uses CloudMonitor API for metrics collection (one query per metric for this tenant,
+        up to metric_workers metrics in flight)
 
         Args:
             instance_id: OceanBase instance ID
             tenant_id: Tenant ID
             start_time: Start time in ISO format (optional)
             end_time: End time in ISO format (optional)
+            metric_names: Subset of TENANT_METRIC_MAP keys to fetch (default: all)
 
         Returns:
             Dictionary with comprehensive tenant metrics (for weekly/monthly: HIGHEST values)
         """
+        start_ms, end_ms = self._metric_time_window(start_time, end_time)
+        dimensions = self._tenant_dimensions(instance_id, tenant_id)
+
+        def fetch_metric(item: Tuple[str, str]) -> Dict:
+            """Fetch and summarize one metric of the tenant"""
+            metric_name, output_field = item
+            try:
+                stats = self._new_stats()
+                for page in self.iter_metric_datapoints(metric_name, dimensions, start_ms, end_ms):
+                    for dp in page:
+                        value = self._tenant_value(dp)
+                        if value is not None:
+                            stats.add(value)
+
+                self._observe_metric(instance_id, metric_name, SCOPE_TENANT, bool(stats))
+                return self._summarize_tenant_stats(metric_name, output_field, stats)
+            except Exception as e:
+                self._observe_metric(instance_id, metric_name, SCOPE_TENANT, False, e)
+                self._report_tenant_metric_error(metric_name, tenant_id, e)
+                return {}
+
+        metric_items = [
+            (metric_name, output_field) for metric_name, output_field in self.TENANT_METRIC_MAP.items()
+            if (metric_names is None or metric_name in metric_names)
+            and self._metric_enabled(instance_id, metric_name, SCOPE_TENANT)
+        ]
+
+        # Metrics are fetched concurrently; results are merged in map order
         metrics = {}
+        for result in self.scheduler.map(fetch_metric, metric_items, self.metric_workers):
+            metrics.update(result)
+        return metrics
 
-        # OPTIMIZED: Only fetch metrics that are commonly available
-        # Tested and verified to return data for most tenants
-        # UPDATED: Renamed metrics to follow consistent pattern (qps_*, tps_*, sessions_*, connection_*)
-        tenant_metric_map = {
-            # CPU metrics - AVAILABLE
-            'cpu_usage_percent_tenant': 'cpu_usage_percent',
-            # 'cpu_usage_avg_cores_tenant': 'cpu_usage_avg_cores',  # May not be available for all tenants
-
-            # Memory metrics - AVAILABLE
-            'memory_usage_tenant': 'memory_usage_percent',
-            # MemStore metrics - TEST IF AVAILABLE
-            # 'memstore_percent_tenant': 'memstore_percent',
-            # 'memstore_used_tenant': 'memstore_used_mb',
-            # 'memstore_total_tenant': 'memstore_total_mb',
-
-            # Session/Connection metrics - AVAILABLE (renamed to sessions_* pattern)
-            'active_sessions_tenant': 'sessions',
-            'all_session': 'connection',
-
-            # SQL Performance metrics - AVAILABLE (renamed to qps_* pattern)
-            'sql_all_count': 'qps',
-            'sql_all_rt': 'sql_avg_rt_ms',
-            # SQL breakdown by type - AVAILABLE (verified via testing)
-            'sql_select_count': 'sql_select_qps',
-            'sql_insert_count': 'sql_insert_qps',
-            'sql_update_count': 'sql_update_qps',
-            'sql_delete_count': 'sql_delete_qps',
-            'sql_replace_count': 'sql_replace_qps',
-
-            # Transaction metrics - AVAILABLE (renamed to tps_* pattern)
-            'transaction_count': 'tps',
-            # 'transaction_rt': 'transaction_avg_rt_us',  # Often returns NaN
-            'transaction_partition_count': 'transaction_partition_tps',
-            'trans_commit_log_count': 'trans_commit_log_count',
-            'trans_commit_log_sync_rt': 'trans_commit_log_sync_rt_ms',
-
-            # Transaction log size - AVAILABLE
-            'clog_trans_log_total_size': 'clog_trans_log_size_mb',
-
-            # I/O metrics - PARTIALLY AVAILABLE
-            # 'io_count': 'io_ops_per_sec',  # NOT AVAILABLE (400 error)
-            # 'io_rt': 'io_avg_rt_us',  # NOT AVAILABLE (400 error)
-            # 'io_size': 'io_throughput_bytes',  # NOT AVAILABLE (400 error)
-            'io_read_count': 'io_read_ops_per_sec',  # AVAILABLE
-            'io_write_count': 'io_write_ops_per_sec',  # AVAILABLE
-            'io_read_rt': 'io_read_rt_us',  # AVAILABLE
-            'io_write_rt': 'io_write_rt_us',  # AVAILABLE
-            # 'io_read_size': 'io_read_bytes_per_sec',  # NOT AVAILABLE (400 error)
-            # 'io_write_size': 'io_write_bytes_per_sec',  # NOT AVAILABLE (400 error)
-
-            # Cache metrics - TEST IF AVAILABLE
-            # 'cache_hit': 'cache_hit_rate_percent',
-            # 'cache_size': 'cache_size_mb',
-
-            # Queue metrics - AVAILABLE
-            'request_queue_time': 'request_queue_time_us',
-
-            # Database wait events - TEST IF AVAILABLE
-            # 'ob_waiteven_count': 'wait_event_count',
-            # 'ob_sql_event': 'sql_event_count',
-
-            # Storage metrics - TESTING
-            # Note: These metrics will be fetched and merged into tenant data
-            'ob_tenant_log_disk_total_bytes': 'log_disk_total_bytes',
-            'ob_tenant_log_disk_used_bytes': 'log_disk_used_bytes',
-            'ob_tenant_data_disk_total_bytes': 'data_disk_total_bytes',  # TESTING - for Allocated_Disk
-            # 'ob_tenant_server_required_size': 'server_required_size_gb',
-            # 'ob_tenant_server_data_size': 'data_size_gb',
-            # 'ob_tenant_binlog_disk_used': 'binlog_disk_used_gb',
-
-            # Network metrics - AVAILABLE (verified via testing)
-            'net_recv': 'network_recv_bytes_per_sec',
-            'net_send': 'network_sent_bytes_per_sec',
-
-            # Uptime - TEST IF AVAILABLE
-            # 'uptime': 'uptime_seconds',
-        }
+    @profiled('tenant_fetch')
+    def get_tenant_metrics_batch(
+        self,
+        instance_id: str,
+        tenant_ids: List[str],
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Get tenant metrics for ALL tenants of an instance with one CloudMonitor query per metric
+        Queries with only the obClusterId dimension and splits datapoints by obTenantId client-side,
+        so the call count is O(metrics) per instance instead of O(tenants x metrics)
 
-        for metric_name, output_field in tenant_metric_map.items():
-            try:
-                if not end_time:
-                    end_dt = datetime.now()
-                else:
-                    end_dt = datetime.fromisoformat(end_time)
+        Args:
+            instance_id: OceanBase instance ID
+            tenant_ids: Tenant IDs to collect metrics for
+            start_time: Start time in ISO format (optional)
+            end_time: End time in ISO format (optional)
 
-                if not start_time:
-                    start_dt = end_dt - timedelta(hours=24)
-                else:
-                    start_dt = datetime.fromisoformat(start_time)
-
-                request = cms_models.DescribeMetricListRequest(
-                    namespace='acs_oceanbase',
-                    metric_name=metric_name,
-                    dimensions=f'[{{"obClusterId":"{instance_id}","obTenantId":"{tenant_id}"}}]',
-                    start_time=str(int(start_dt.timestamp() * 1000)),
-                    end_time=str(int(end_dt.timestamp() * 1000)),
-                    period=str(3600)
+        Returns:
+            Tuple of ({tenant_id: metrics_dict}, failed_metric_names)
+            Metrics whose batch query failed after retries (throttling, server errors) are
+            returned in failed_metric_names so callers can fall back to per-tenant fetching
+            for them; metrics the API rejects (e.g. HTTP 400) are dropped, since per-tenant
+            queries would be rejected as well
+        """
+        start_ms, end_ms = self._metric_time_window(start_time, end_time)
+        dimensions = self._tenant_dimensions(instance_id)
+
+        def fetch_metric(metric_name: str) -> Dict[str, MetricStats]:
+            """Fetch one metric for all tenants and split it by tenant"""
+            stats_by_tenant = {tenant_id: self._new_stats() for tenant_id in tenant_ids}
+
+            # A cluster-wide query returns every tenant's series across several pages
+            for page in self.iter_metric_datapoints(metric_name, dimensions, start_ms, end_ms):
+                self._split_tenant_datapoints(page, stats_by_tenant)
+
+            self._observe_metric(instance_id, metric_name, SCOPE_TENANT, any(stats_by_tenant.values()))
+            return stats_by_tenant
+
+        metric_names = [
+            metric_name for metric_name in self.TENANT_METRIC_MAP
+            if self._metric_enabled(instance_id, metric_name, SCOPE_TENANT)
+        ]
+        # Metrics are fetched concurrently; results are assembled in map order
+        futures = dict(self.scheduler.imap_unordered(fetch_metric, metric_names, self.metric_workers))
+
+        metrics_by_tenant = {tenant_id: {} for tenant_id in tenant_ids}
+        failed_metrics = []
+        for metric_name in metric_names:
+            future = futures[metric_name]
+            if future.exception() is not None:
+                if self._batch_metric_failed(instance_id, metric_name, future.exception()):
+                    failed_metrics.append(metric_name)
+                continue
+            output_field = self.TENANT_METRIC_MAP[metric_name]
+            for tenant_id, stats in future.result().items():
+                metrics_by_tenant[tenant_id].update(
+                    self._summarize_tenant_stats(metric_name, output_field, stats)
                 )
 
-                response = self.cms_client.describe_metric_list(request)
+        return metrics_by_tenant, failed_metrics
 
-                if response.body.datapoints:
-                    import json
-                    datapoints = json.loads(response.body.datapoints)
-
-                    if datapoints:
-                        # Extract values from datapoints
-                        values = []
-                        for dp in datapoints:
-                            if dp.get('Average') is not None:
-                                values.append(dp.get('Average'))
-                            elif dp.get('Value') is not None:
-                                values.append(dp.get('Value'))
-                            elif dp.get('Maximum') is not None:
-                                values.append(dp.get('Maximum'))
-                            elif dp.get('Max') is not None:
-                                values.append(dp.get('Max'))
-
-                        if values:
-                            # Determine metric type for proper capping
-                            # Only cap percentage metrics at 100%
-                            # Absolute metrics (GB, MB, bytes, counts, RT, QPS, TPS) should NOT be capped
-                            is_percentage_metric = ('percent' in output_field or
-                                                   ('usage' in metric_name and 'percent' in metric_name))
-
-                            # Calculate raw values including P95
-                            raw_avg = sum(values) / len(values)
-                            raw_max = max(values)
-                            raw_min = min(values)
-
-                            # Calculate P95
-                            sorted_values = sorted(values)
-                            p95_index = int(len(sorted_values) * 0.95)
-                            raw_p95 = sorted_values[p95_index] if p95_index < len(sorted_values) else sorted_values[-1]
-
-                            if is_percentage_metric:
-                                # Debug: Log if percentage metrics exceed 100%
-                                if raw_max > 100.0 or raw_avg > 100.0 or raw_p95 > 100.0:
-                                    print(f"    ⚠ WARNING: Tenant metric {metric_name} ({output_field}) exceeded 100% - Raw: avg={raw_avg:.2f}, max={raw_max:.2f}, p95={raw_p95:.2f}")
-                                    print(f"      Sample values from API: {values[:3]}")
-
-                                avg_val = min(raw_avg, 100.0)
-                                max_val = min(raw_max, 100.0)
-                                min_val = min(raw_min, 100.0)
-                                p95_val = min(raw_p95, 100.0)
-                            else:
-                                avg_val = raw_avg
-                                max_val = raw_max
-                                min_val = raw_min
-                                p95_val = raw_p95
-
-                            metrics[f'{output_field}_avg'] = round(avg_val, 2)
-                            metrics[f'{output_field}_max'] = round(max_val, 2)
-                            metrics[f'{output_field}_min'] = round(min_val, 2)
-                            metrics[f'{output_field}_p95'] = round(p95_val, 2)
-            except Exception as e:
-                # Skip metrics that are not available
-                pass
+    def _batch_metric_failed(self, instance_id: str, metric_name: str, error: Exception) -> bool:
+        """
+        Handle an error of a batched tenant metric query
 
-        return metrics
+        Returns:
+            True if the metric should be fetched per tenant (transient failure), False if the
+            API rejected it: it is recorded as unavailable and dropped
+        """
+        if not is_permanent_error(error):
+            return True
+        self._observe_metric(instance_id, metric_name, SCOPE_TENANT, False, error)
+        print(f"    Warning: Tenant metric {metric_name} unavailable for {instance_id}: {str(error)[:80]}")
+        return False
 
     def fetch_tenants_parallel(
         self,
@@ -637,10 +1355,11 @@ class OceanBaseReporter:
         tenants: List[Dict],
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
-        max_workers: int = 5
+        max_workers: int = 5,
+        batch_metrics: bool = True
     ) -> List[Dict]:
         """
-        Fetch tenant metrics in parallel using threading
+        Fetch tenant metrics in parallel on the shared request scheduler
 
         Args:
             instance_id: OceanBase instance ID
@@ -648,11 +1367,29 @@ class OceanBaseReporter:
             tenants: List of tenant dictionaries
             start_time: Start time in ISO format
             end_time: End time in ISO format
-            max_workers: Maximum number of concurrent threads (default: 5)
+            max_workers: Maximum number of tenants processed concurrently (default: 5)
+            batch_metrics: Fetch CloudMonitor metrics for all tenants with one query per metric
+                           (default: True). Falls back to per-tenant queries when disabled,
+                           for metrics whose batch query failed after retries, or when the batch
+                           returns no data
 
         Returns:
             List of tenant dictionaries with metrics
         """
+        batch_results = None
+        failed_metrics = []
+        if batch_metrics and tenants:
+            batch_results, failed_metrics = self.get_tenant_metrics_batch(
+                instance_id,
+                [tenant['tenant_id'] for tenant in tenants],
+                start_time=start_time,
+                end_time=end_time
+            )
+            # No data for any tenant (e.g. cluster-wide dimension not supported): use per-tenant path
+            if not any(batch_results.values()):
+                print(f"    ⚠ Batch metric query returned no data for {instance_id}, falling back to per-tenant queries")
+                batch_results = None
+
         def fetch_single_tenant(tenant: Dict) -> Dict:
             """Fetch metrics for a single tenant"""
             try:
@@ -669,27 +1406,27 @@ class OceanBaseReporter:
                     tenant.update(tenant_details)
 
                 # Get comprehensive tenant metrics (from CloudMonitor API)
-                tenant_metrics = self.get_tenant_metrics(
-                    instance_id,
-                    tenant['tenant_id'],
-                    start_time=start_time,
-                    end_time=end_time
-                )
+                if batch_results is not None:
+                    tenant_metrics = dict(batch_results.get(tenant['tenant_id'], {}))
+                    if failed_metrics:
+                        tenant_metrics.update(self.get_tenant_metrics(
+                            instance_id,
+                            tenant['tenant_id'],
+                            start_time=start_time,
+                            end_time=end_time,
+                            metric_names=failed_metrics
+                        ))
+                else:
+                    tenant_metrics = self.get_tenant_metrics(
+                        instance_id,
+                        tenant['tenant_id'],
+                        start_time=start_time,
+                        end_time=end_time
+                    )
                 if tenant_metrics:
                     tenant.update(tenant_metrics)
 
-                # Post-process: Convert disk metrics from bytes to GB
-                # CloudMonitor returns bytes, we need to populate GB fields
-
-                # Convert log disk used bytes to GB and populate log_disk_usage
-                if 'log_disk_used_bytes_avg' in tenant:
-                    tenant['tenant_log_disk_usage'] = round(tenant['log_disk_used_bytes_avg'] / (1024**3), 2)
-
-                # Convert data disk total bytes to GB and populate Allocated_Disk
-                if 'data_disk_total_bytes_avg' in tenant:
-                    tenant['tenant_allocated_disk'] = round(tenant['data_disk_total_bytes_avg'] / (1024**3), 2)
-
-                return tenant
+                return self.convert_tenant_disk_metrics(tenant)
             except Exception as e:
                 print(f"      ⚠ Error fetching metrics for tenant {tenant.get('tenant_id', 'unknown')}: {str(e)}")
                 return tenant
@@ -697,38 +1434,48 @@ class OceanBaseReporter:
         if not tenants:
             return []
 
-        print(f"    Fetching metrics for {len(tenants)} tenants (parallel mode, {max_workers} workers)...")
+        mode_desc = "batched metrics" if batch_results is not None else "per-tenant metrics"
+        print(f"    Fetching metrics for {len(tenants)} tenants (parallel mode, {max_workers} workers, {mode_desc})...")
 
         tenants_with_metrics = []
         completed_count = 0
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_tenant = {
-                executor.submit(fetch_single_tenant, tenant): tenant
-                for tenant in tenants
-            }
-
-            # Process as they complete
-            for future in as_completed(future_to_tenant):
-                tenant = future_to_tenant[future]
-                try:
-                    result = future.result()
-                    tenants_with_metrics.append(result)
-                    completed_count += 1
+        # Tenants share the run-wide scheduler pool; max_workers caps this instance's fan-out
+        for tenant, future in self.scheduler.imap_unordered(fetch_single_tenant, tenants, max_workers):
+            try:
+                result = future.result()
+                tenants_with_metrics.append(result)
+                completed_count += 1
 
-                    # Progress update every 10 tenants
-                    if completed_count % 10 == 0:
-                        print(f"      Progress: {completed_count}/{len(tenants)} tenants processed...")
-                except Exception as e:
-                    print(f"      ⚠ Failed to process tenant {tenant.get('tenant_id', 'unknown')}: {str(e)}")
-                    # Still add the tenant even if metrics failed
-                    tenants_with_metrics.append(tenant)
-                    completed_count += 1
+                # Progress update every 10 tenants
+                if completed_count % 10 == 0:
+                    print(f"      Progress: {completed_count}/{len(tenants)} tenants processed...")
+            except Exception as e:
+                print(f"      ⚠ Failed to process tenant {tenant.get('tenant_id', 'unknown')}: {str(e)}")
+                # Still add the tenant even if metrics failed
+                tenants_with_metrics.append(tenant)
+                completed_count += 1
 
         print(f"    ✓ Completed fetching metrics for {len(tenants_with_metrics)} tenant(s)")
         return tenants_with_metrics
 
+    @staticmethod
+    def convert_tenant_disk_metrics(tenant: Dict) -> Dict:
+        """
+        Post-process: Convert disk metrics from bytes to GB
+        CloudMonitor returns bytes, we need to populate GB fields
+        """
+        # Convert log disk used bytes to GB and populate log_disk_usage
+        if 'log_disk_used_bytes_avg' in tenant:
+            tenant['tenant_log_disk_usage'] = round(tenant['log_disk_used_bytes_avg'] / (1024**3), 2)
+
+        # Convert data disk total bytes to GB and populate Allocated_Disk
+        if 'data_disk_total_bytes_avg' in tenant:
+            tenant['tenant_allocated_disk'] = round(tenant['data_disk_total_bytes_avg'] / (1024**3), 2)
+
+        return tenant
+
+    @profiled('utilization')
     def get_utilization_metrics(
         self,
         instance_id: str,
@@ -752,74 +1499,44 @@ class OceanBaseReporter:
 
         metrics = {}
 
-        # OPTIMIZED: Only fetch metrics that are commonly available for OceanBase
-        # Metrics that returned errors in testing are commented out to speed up extraction
-        instance_metric_map = {
-            # CPU metrics - AVAILABLE
-            'cpu_usage': 'cpu',
-            'cpu_percent': 'cpu_percent',  # AVAILABLE (verified via testing)
-
-            # Memory metrics - AVAILABLE
-            'memory_percent': 'memory',
-            'memstore_percent': 'memstore_percent',
-
-            # QPS/TPS metrics - AVAILABLE
-            'qps': 'qps',
-            'tps': 'tps',
-            'qps_rt': 'qps_rt_ms',
-            'tps_rt': 'tps_rt_ms',
-
-            # Active sessions - AVAILABLE (verified via testing)
-            'active_session': 'active_sessions',
-
-            # Data size - NOT AVAILABLE
-            # 'data_size': 'data_size_gb',  # Returns 400 error
-
-            # Disk metrics - NOT AVAILABLE via CloudMonitor
-            # Use DescribeInstance API instead (already fetched)
-            # 'disk_usage': 'disk_usage_percent',  # Returns 400 error
-            # 'disk_used': 'disk_used_gb',  # Returns 400 error
-            # 'disk_total': 'disk_total_gb',  # Returns 400 error
-
-            # Network metrics - NOT AVAILABLE
-            # 'network_in': 'network_in_bytes_per_sec',  # Returns 400 error
-            # 'network_out': 'network_out_bytes_per_sec',  # Returns 400 error
-
-            # Connection metrics - NOT AVAILABLE
-            # 'connection_count': 'connection_count',  # Returns 400 error
-            # 'max_connections': 'max_connections_limit',  # Returns 400 error
-
-            # Cache metrics - NOT AVAILABLE
-            # 'cache_hit_rate': 'cache_hit_rate_percent',  # Returns 400 error
-
-            # I/O metrics - PARTIALLY AVAILABLE
-            'io_read_bytes': 'io_read_bytes_per_sec',
-            'io_write_bytes': 'io_write_bytes_per_sec',
-            # 'io_read_times': 'io_read_ops_per_sec',  # Returns 400 error
-            # 'io_write_times': 'io_write_ops_per_sec',  # Returns 400 error
-            # 'io_util': 'io_util_percent',  # Returns 400 error
-
-            # SQL metrics - NOT AVAILABLE at instance level
-            # Available at tenant level only
-            # 'sql_count': 'sql_count_per_sec',  # Returns 400 error
-            # 'sql_rt': 'sql_rt_ms',  # Returns 400 error
-            # 'sql_select': 'sql_select_per_sec',  # Returns 400 error
-            # 'sql_insert': 'sql_insert_per_sec',  # Returns 400 error
-            # 'sql_update': 'sql_update_per_sec',  # Returns 400 error
-            # 'sql_delete': 'sql_delete_per_sec',  # Returns 400 error
-        }
+        # Instance metrics followed by the legacy CPU/memory summary queries, fetched concurrently;
+        # the summary queries repeat two instance metrics and are shared by the request memo
+        metric_names = list(self.INSTANCE_METRIC_MAP) + ['cpu_usage', 'memory_percent']
+        results = self.scheduler.map(
+            lambda metric_name: self.get_metrics(
+                instance_id, metric_name, start_time=start_time, end_time=end_time
+            ),
+            metric_names,
+            self.metric_workers
+        )
 
-        # Fetch only available metrics (much faster!)
-        for metric_name, output_prefix in instance_metric_map.items():
-            metric_data = self.get_metrics(instance_id, metric_name, start_time=start_time, end_time=end_time)
-            if metric_data:
-                metrics[f'{output_prefix}_avg'] = metric_data.get('avg', 0)
-                metrics[f'{output_prefix}_min'] = metric_data.get('min', 0)
-                metrics[f'{output_prefix}_max'] = metric_data.get('max', 0)
-                metrics[f'{output_prefix}_p95'] = metric_data.get('p95', 0)
-
-        # CPU metrics (legacy format for backward compatibility)
-        cpu_metrics = self.get_metrics(instance_id, 'cpu_usage', start_time=start_time, end_time=end_time)
+        # Assemble in map order so output columns don't depend on completion order
+        for output_prefix, metric_data in zip(self.INSTANCE_METRIC_MAP.values(), results):
+            self._add_utilization_fields(metrics, output_prefix, metric_data)
+
+        # CPU and memory metrics (legacy format for backward compatibility)
+        cpu_metrics, mem_metrics = results[-2:]
+        self._add_legacy_utilization(metrics, cpu_metrics, mem_metrics)
+
+        # Disk metrics - NOT AVAILABLE in CloudMonitor API for OceanBase
+        # Disk utilization is calculated from instance details instead (used_storage / total_storage)
+        # CloudMonitor does not provide disk usage metrics for OceanBase instances
+        # Verified 2025-12-30: disk_usage, disk_percent, disk_usage_percent all return 400 errors
+
+        return metrics
+
+    @staticmethod
+    def _add_utilization_fields(metrics: Dict, output_prefix: str, metric_data: Optional[Dict]) -> None:
+        """Store avg/min/max/P95 of one instance metric under {output_prefix}_* keys"""
+        if metric_data:
+            metrics[f'{output_prefix}_avg'] = metric_data.get('avg', 0)
+            metrics[f'{output_prefix}_min'] = metric_data.get('min', 0)
+            metrics[f'{output_prefix}_max'] = metric_data.get('max', 0)
+            metrics[f'{output_prefix}_p95'] = metric_data.get('p95', 0)
+
+    @staticmethod
+    def _add_legacy_utilization(metrics: Dict, cpu_metrics: Optional[Dict], mem_metrics: Optional[Dict]) -> None:
+        """Print the CPU/memory summary lines and store the legacy memory_* keys"""
         if cpu_metrics:
             # Show if values were capped
             capped_indicator = ""
@@ -828,7 +1545,6 @@ class OceanBaseReporter:
             print(f"    CPU: avg={cpu_metrics.get('avg', 0)}%, min={cpu_metrics.get('min', 0)}%, max={cpu_metrics.get('max', 0)}%, P95={cpu_metrics.get('p95', 0)}%{capped_indicator}")
 
         # Memory metrics
-        mem_metrics = self.get_metrics(instance_id, 'memory_percent', start_time=start_time, end_time=end_time)
         if mem_metrics:
             # Store actual avg/min/max/p95 values (already capped at 100%)
             metrics['memory_avg'] = mem_metrics.get('avg', 0)
@@ -842,12 +1558,139 @@ class OceanBaseReporter:
                 capped_indicator = f" (capped from {mem_metrics.get('raw_max', 0)}%)"
             print(f"    Memory: avg={mem_metrics.get('avg', 0)}%, min={mem_metrics.get('min', 0)}%, max={mem_metrics.get('max', 0)}%, P95={mem_metrics.get('p95', 0)}%{capped_indicator}")
 
-        # Disk metrics - NOT AVAILABLE in CloudMonitor API for OceanBase
-        # Disk utilization is calculated from instance details instead (used_storage / total_storage)
-        # CloudMonitor does not provide disk usage metrics for OceanBase instances
-        # Verified 2025-12-30: disk_usage, disk_percent, disk_usage_percent all return 400 errors
+    def _collection_queries(
+        self,
+        instance_id: str,
+        tenant_ids: List[str],
+        batch_metrics: bool = True
+    ) -> List[Tuple[str, str, str, int]]:
+        """(metric_name, scope, dimensions, priority) of every query a report of the instance sends"""
+        queries = [
+            (metric_name, SCOPE_INSTANCE, self._instance_dimensions(instance_id), PRIORITY_INSTANCE)
+            for metric_name in self.INSTANCE_METRIC_MAP
+            if self._metric_enabled(instance_id, metric_name, SCOPE_INSTANCE)
+        ]
+        if tenant_ids:
+            tenant_dimensions = (
+                [self._tenant_dimensions(instance_id)] if batch_metrics
+                else [self._tenant_dimensions(instance_id, tenant_id) for tenant_id in tenant_ids]
+            )
+            queries.extend(
+                (metric_name, SCOPE_TENANT, dimensions, PRIORITY_TENANT)
+                for metric_name in self.TENANT_METRIC_MAP
+                if self._metric_enabled(instance_id, metric_name, SCOPE_TENANT)
+                for dimensions in tenant_dimensions
+            )
+        return queries
 
-        return metrics
+    def _collection_failed(self, instance_id: str, metric_name: str, scope: str, error: Exception) -> None:
+        """Record a rejected metric so later polls skip it; warn about metrics lost to retries"""
+        self._observe_metric(instance_id, metric_name, scope, False, error)
+        if not is_permanent_error(error):
+            print(f"  ⚠ Warning: {metric_name} of {instance_id} failed after retries: {str(error)[:80]}")
+
+    def collect_datapoints(
+        self,
+        instance_id: str,
+        tenant_ids: List[str],
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        batch_metrics: bool = True
+    ) -> int:
+        """
+        Fetch the datapoints of an instance and its tenants that are missing from the datapoint store
+        The datapoints are not read back or aggregated (--daemon polls; requires a datapoint store)
+
+        Args:
+            instance_id: OceanBase instance ID
+            tenant_ids: Tenant IDs of the instance
+            start_time: Start time in ISO format (optional)
+            end_time: End time in ISO format (optional)
+            batch_metrics: Fill the cluster-wide tenant queries (default) instead of the per-tenant ones
+
+        Returns:
+            Number of datapoints fetched
+        """
+        start_ms, end_ms = self._metric_time_window(start_time, end_time)
+
+        def fill(query: Tuple[str, str, str, int]) -> int:
+            metric_name, scope, dimensions, priority = query
+            try:
+                return self._fill_datapoints(metric_name, dimensions, start_ms, end_ms, priority)
+            except Exception as e:
+                self._collection_failed(instance_id, metric_name, scope, e)
+                return 0
+
+        return sum(self.scheduler.map(
+            fill, self._collection_queries(instance_id, tenant_ids, batch_metrics), self.metric_workers
+        ))
+
+    def probe_metric_availability(
+        self,
+        instance_ids: List[str],
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Query every instance and tenant metric once per instance type (series/version)
+        and record the outcomes in the metric availability registry
+
+        Args:
+            instance_ids: OceanBase instance IDs; the first instance of each type with tenants is probed
+            start_time: Start time in ISO format (optional)
+            end_time: End time in ISO format (optional)
+
+        Returns:
+            Registry summary: {'available': n, 'unavailable': n, 'skipped': n}
+        """
+        instances_by_profile: Dict[Tuple[str, str], List[str]] = {}
+        for instance_id in instance_ids:
+            if instance_id not in self._instance_profiles:
+                self.get_instance_details(instance_id)
+            profile = self._instance_profiles.get(instance_id)
+            if profile is not None:
+                instances_by_profile.setdefault(profile, []).append(instance_id)
+
+        def probe_profile(profile_instances: List[str]) -> None:
+            """Probe all metrics on representative instances of one instance type"""
+            self.scheduler.map(
+                lambda metric_name: self.get_metrics(
+                    profile_instances[0], metric_name, start_time=start_time, end_time=end_time
+                ),
+                list(self.INSTANCE_METRIC_MAP),
+                self.metric_workers
+            )
+
+            for instance_id in profile_instances:
+                tenant_ids = [tenant['tenant_id'] for tenant in self.list_tenants(instance_id)]
+                if not tenant_ids:
+                    continue
+                batch_results, failed_metrics = self.get_tenant_metrics_batch(
+                    instance_id, tenant_ids, start_time=start_time, end_time=end_time
+                )
+                # Cluster-wide query not supported: probe the metrics on a single tenant instead
+                if not any(batch_results.values()):
+                    failed_metrics = None
+                if failed_metrics is None or failed_metrics:
+                    self.get_tenant_metrics(
+                        instance_id, tenant_ids[0], start_time=start_time, end_time=end_time,
+                        metric_names=failed_metrics
+                    )
+                break
+
+        profiles = list(instances_by_profile.items())
+        print(f"Probing {len(self.INSTANCE_METRIC_MAP)} instance and {len(self.TENANT_METRIC_MAP)} tenant metrics "
+              f"on {len(profiles)} instance type(s)...")
+        for (profile, _), future in self.scheduler.imap_unordered(
+            lambda item: probe_profile(item[1]), profiles, max(len(profiles), 1)
+        ):
+            try:
+                future.result()
+                print(f"  ✓ Probed {profile[0]} {profile[1]}")
+            except Exception as e:
+                print(f"  ⚠ Failed to probe {profile[0]} {profile[1]}: {str(e)}")
+
+        return self.metric_registry.summary() if self.metric_registry else {}
 
     def get_all_metrics(self, instance_id: str) -> Dict:
         """
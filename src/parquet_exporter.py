@@ -0,0 +1,138 @@
+"""
+Parquet Exporter for OceanBase capacity assessment reports
+Appends the capacity and tenant tables of every run to a date-partitioned
+columnar history that HistoricalAggregator reads back by column and partition
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+HISTORY_DIR = 'history'
+
+# History tables: capacity (one row per instance) and tenants (one row per tenant)
+TABLES = ('capacity', 'tenants')
+
+# Identity and descriptive columns, stored as dictionary-encoded strings; metric
+# columns are stored as float64 so that every day of a table has the same schema
+STRING_COLUMNS = (
+    'region', 'instance_id', 'instance_name', 'status', 'series', 'zones', 'version',
+    'disk_type', 'create_time', 'expire_time', 'tenant_id', 'tenant_name', 'tenant_mode', 'charset',
+)
+
+DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+
+COMPRESSION = 'zstd'
+
+
+def table_schema(df: pd.DataFrame) -> pa.Schema:
+    """
+    Explicit Arrow schema of a report table
+
+    Args:
+        df: Capacity or tenants table
+
+    Returns:
+        Schema with dictionary-encoded strings for STRING_COLUMNS and other text
+        columns, bool for flags and float64 for every metric
+    """
+    fields = []
+    for column, dtype in df.dtypes.items():
+        if column in STRING_COLUMNS:
+            field_type = DICTIONARY_STRING
+        elif pd.api.types.is_bool_dtype(dtype):
+            field_type = pa.bool_()
+        elif pd.api.types.is_numeric_dtype(dtype):
+            field_type = pa.float64()
+        else:
+            field_type = DICTIONARY_STRING
+        fields.append(pa.field(str(column), field_type))
+    return pa.schema(fields)
+
+
+def partition_path(output_dir: str, table: str, frequency: str, date_str: str) -> Path:
+    """Directory of one day of a history table: history/<table>/frequency=<f>/date=<YYYYMMDD>"""
+    return Path(output_dir) / HISTORY_DIR / table / f'frequency={frequency}' / f'date={date_str}'
+
+
+class ParquetExporter:
+    """Export OceanBase data to a date-partitioned Parquet history"""
+
+    def __init__(self, output_dir: str = 'output'):
+        """
+        Initialize Parquet Exporter
+
+        Args:
+            output_dir: Base directory for output files (the history goes to output_dir/history)
+        """
+        self.output_dir = Path(output_dir)
+
+    def export_table(
+        self,
+        table: str,
+        data: Union[pd.DataFrame, List[Dict]],
+        report_frequency: str = 'daily',
+        report_time: Optional[datetime] = None
+    ) -> Optional[str]:
+        """
+        Write one run's rows of a history table as a Parquet file of the day's partition
+
+        Args:
+            table: 'capacity' or 'tenants'
+            data: Rows of the table (DataFrame or list of dictionaries)
+            report_frequency: Frequency of the run ('daily', 'weekly' or 'monthly')
+            report_time: Time of the run (default: now); its date is the partition
+
+        Returns:
+            Path to the created Parquet file, or None if there are no rows
+        """
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        if df.empty:
+            return None
+
+        report_time = report_time or datetime.now()
+        directory = partition_path(self.output_dir, table, report_frequency.lower(), report_time.strftime('%Y%m%d'))
+        directory.mkdir(parents=True, exist_ok=True)
+        filepath = directory / f"part-{report_time.strftime('%H%M%S')}.parquet"
+
+        schema = table_schema(df)
+        # Text columns may hold numbers or NaN for rows without a value
+        df = df.assign(**{
+            field.name: df[field.name].map(lambda value: None if pd.isna(value) else str(value))
+            for field in schema if field.type == DICTIONARY_STRING
+        })
+        arrow_table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+        pq.write_table(arrow_table, filepath, compression=COMPRESSION)
+        return str(filepath)
+
+    def export_report(
+        self,
+        capacity_data: Union[pd.DataFrame, List[Dict]],
+        tenants_data: Union[pd.DataFrame, List[Dict]],
+        report_frequency: str = 'daily'
+    ) -> Dict[str, str]:
+        """
+        Append the capacity and tenant tables of a run to the history
+
+        Args:
+            capacity_data: Instance rows (DataFrame or list of dictionaries)
+            tenants_data: Tenant rows (DataFrame or list of dictionaries)
+            report_frequency: Frequency of the run ('daily', 'weekly' or 'monthly')
+
+        Returns:
+            Dictionary of table name to created Parquet file
+        """
+        report_time = datetime.now()
+        paths = {}
+        for table, data in zip(TABLES, (capacity_data, tenants_data)):
+            filepath = self.export_table(table, data, report_frequency, report_time)
+            if filepath:
+                paths[table] = filepath
+
+        if paths:
+            print(f"✓ History saved to: {self.output_dir / HISTORY_DIR}/")
+            for table, filepath in paths.items():
+                print(f"  - {table}: {filepath}")
+        return paths
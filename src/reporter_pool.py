@@ -0,0 +1,125 @@
+"""
+Per-region reporters for multi-region extraction
+One OceanBase/CloudMonitor client pair per region; all reporters share the run's
+request scheduler (one global concurrency budget), metric registry and datapoint store
+"""
+import asyncio
+import queue
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+from request_memo import RequestMemo
+
+# Regions offering ApsaraDB for OceanBase, used by --regions all when the config has no "regions" list
+OCEANBASE_REGIONS = [
+    'cn-hangzhou', 'cn-shanghai', 'cn-beijing', 'cn-zhangjiakou', 'cn-shenzhen', 'cn-chengdu',
+    'cn-hongkong', 'ap-southeast-1', 'ap-southeast-3', 'ap-southeast-5', 'ap-northeast-1',
+    'eu-central-1', 'us-west-1',
+]
+
+_DONE = object()
+
+
+class ReporterPool:
+    """
+    One reporter per region, sharing the scheduler and caches passed as reporter arguments
+
+    Request memos stay per region: identical requests to different regions are
+    different requests.
+    """
+
+    def __init__(self, reporter_class, regions: List[str], **reporter_kwargs):
+        """
+        Initialize pool
+
+        Args:
+            reporter_class: OceanBaseReporter or AsyncOceanBaseReporter
+            regions: Alibaba Cloud regions (duplicates are ignored)
+            **reporter_kwargs: Arguments of reporter_class except region and request_memo
+                               (scheduler, metric_registry, datapoint_store, ...)
+        """
+        self.reporters = {
+            region: reporter_class(region=region, request_memo=RequestMemo(), **reporter_kwargs)
+            for region in dict.fromkeys(regions)
+        }
+
+    @property
+    def regions(self) -> List[str]:
+        """Regions of the pool, in the order given"""
+        return list(self.reporters)
+
+    def __getitem__(self, region: str):
+        return self.reporters[region]
+
+    def __len__(self) -> int:
+        return len(self.reporters)
+
+    def iter_instances(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream the instances of every region, discovering all regions concurrently
+
+        Yields:
+            (region, instance dictionary) as each region's pages arrive
+        """
+        if len(self.reporters) == 1:
+            region, reporter = next(iter(self.reporters.items()))
+            for instance in reporter.iter_instances():
+                yield region, instance
+            return
+
+        found: 'queue.Queue' = queue.Queue()
+
+        def discover(region: str) -> None:
+            try:
+                for instance in self.reporters[region].iter_instances():
+                    found.put((region, instance))
+            finally:
+                found.put(_DONE)
+
+        scheduler = next(iter(self.reporters.values())).scheduler
+        for region in self.reporters:
+            scheduler.submit(discover, region)
+
+        remaining = len(self.reporters)
+        while remaining:
+            item = found.get()
+            if item is _DONE:
+                remaining -= 1
+            else:
+                yield item
+
+    async def iter_instances_async(self) -> AsyncIterator[Tuple[str, Dict]]:
+        """Async counterpart of iter_instances() for a pool of AsyncOceanBaseReporter"""
+        found: 'asyncio.Queue' = asyncio.Queue()
+
+        async def discover(region: str) -> None:
+            try:
+                async for instance in self.reporters[region].iter_instances():
+                    await found.put((region, instance))
+            finally:
+                await found.put(_DONE)
+
+        tasks = [asyncio.ensure_future(discover(region)) for region in self.reporters]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await found.get()
+                if item is _DONE:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def new_run(self) -> None:
+        """Give every reporter an empty request memo: responses of the previous run are outdated"""
+        for reporter in self.reporters.values():
+            reporter.request_memo = RequestMemo()
+
+    def memo_stats(self) -> Dict[str, int]:
+        """Request memo statistics summed over all regions"""
+        totals = {'hits': 0, 'misses': 0, 'entries': 0}
+        for reporter in self.reporters.values():
+            for key, value in reporter.request_memo.stats().items():
+                totals[key] += value
+        return totals
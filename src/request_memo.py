@@ -0,0 +1,141 @@
+"""
+Per-run memoization of Alibaba Cloud API requests
+Identical requests (same API and parameters, including the time window) issued
+during one run share a single call: concurrent callers wait for the request in
+flight and later callers get the stored response
+"""
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+from retry import is_permanent_error
+
+# Completed responses kept for reuse; DescribeMetricList pages can be large,
+# and duplicate requests are issued close together
+DEFAULT_MAX_ENTRIES = 128
+
+
+class RequestMemo:
+    """
+    Deduplicate identical in-flight and completed API requests
+
+    Failures are shared with the callers already waiting; permanent errors
+    (e.g. metric not available) are remembered, while throttled or transient
+    failures are forgotten so a later identical request is sent again.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize memo
+
+        Args:
+            max_entries: Completed requests kept for reuse, least recently used evicted first (default: 128)
+        """
+        self.max_entries = max_entries
+        self._futures: 'OrderedDict[Hashable, object]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(api: str, request) -> Tuple[str, str]:
+        """
+        Memo key of an SDK request
+
+        Args:
+            api: API name (e.g. 'describe_metric_list')
+            request: SDK request model
+
+        Returns:
+            (api, normalized request parameters)
+        """
+        return api, json.dumps(request.to_map(), sort_keys=True, default=str)
+
+    def _lookup(self, key: Hashable, new_future: Callable[[], object]) -> Tuple[object, bool]:
+        """Return (future, is_owner); the owner must send the request and complete the future"""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.hits += 1
+                self._futures.move_to_end(key)
+                return future, False
+            self.misses += 1
+            future = new_future()
+            self._futures[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable, error: BaseException = None) -> None:
+        with self._lock:
+            if error is not None and not (isinstance(error, Exception) and is_permanent_error(error)):
+                self._futures.pop(key, None)
+            # Evict the oldest completed entries; requests in flight always stay
+            excess = len(self._futures) - self.max_entries
+            for old_key in list(self._futures):
+                if excess <= 0:
+                    break
+                if self._futures[old_key].done():
+                    del self._futures[old_key]
+                    excess -= 1
+
+    def call(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) unless an identical request is in flight or completed
+
+        Args:
+            key: Memo key (see key())
+            fn: Blocking callable sending the request
+
+        Returns:
+            The (shared) response
+        """
+        future, owner = self._lookup(key, Future)
+        if not owner:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            self._finish(key, e)
+            raise
+        future.set_result(result)
+        self._finish(key)
+        return result
+
+    async def acall(self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs):
+        """
+        Await fn(*args, **kwargs) unless an identical request is in flight or completed
+
+        Args:
+            key: Memo key (see key())
+            fn: Coroutine function sending the request
+
+        Returns:
+            The (shared) response
+        """
+        future, owner = self._lookup(key, asyncio.get_running_loop().create_future)
+        if not owner:
+            # shield(): a cancelled waiter must not cancel the shared request
+            return await asyncio.shield(future)
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError as e:
+            future.cancel()
+            self._finish(key, e)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn if nobody is waiting
+            future.exception()
+            self._finish(key, e)
+            raise
+        future.set_result(result)
+        self._finish(key)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of requests served by the memo (hits) and sent (misses)"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._futures)}
@@ -0,0 +1,404 @@
+"""
+Shared request scheduler for Alibaba Cloud API calls
+Applies one global concurrency cap, per-API token-bucket rate limits,
+priority ordering and retries to every OceanBase and CloudMonitor request of a run
+"""
+import heapq
+import itertools
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from retry import AIMDController, RetryPolicy, classify_error, THROTTLED, PERMANENT
+from run_profiler import RunProfiler
+
+# Lower value = served first when waiting for a concurrency slot
+PRIORITY_INSTANCE = 0  # Discovery and instance-level calls
+PRIORITY_TENANT = 1  # Tenant details and tenant metric floods
+
+# Default request budgets (requests per second) per API
+DEFAULT_RATE_LIMITS = {
+    'describe_instances': 5,
+    'describe_instance': 10,
+    'describe_tenants': 10,
+    'describe_tenant': 20,
+    'describe_metric_list': 50,
+}
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (default: one second worth of tokens)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token, borrowing against the future if the bucket is empty
+
+        Returns:
+            Seconds the caller must wait before using the token
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RequestScheduler:
+    """
+    Coordinates all API calls of a run
+
+    - call(): runs one API request under the global concurrency cap (waiters are
+      served by priority, then FIFO) after taking a token from the API's bucket.
+      Throttled and transient failures are retried with jittered exponential
+      backoff, and throttling shrinks the concurrency cap (AIMD) until calls
+      succeed again
+    - submit()/imap_unordered()/map(): run work on one shared worker pool instead
+      of per-instance/per-tenant ThreadPoolExecutors. The calling thread also
+      processes items, so nested fan-outs cannot deadlock on a saturated pool
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limits: Optional[Dict[str, float]] = None,
+        max_workers: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        adaptive_concurrency: bool = True,
+        min_concurrency: int = 1,
+        profiler: Optional[RunProfiler] = None
+    ):
+        """
+        Initialize request scheduler
+
+        Args:
+            max_concurrency: Maximum number of API requests in flight across the whole run
+            rate_limits: Requests per second per API name (merged over DEFAULT_RATE_LIMITS;
+                         a value of 0 or None disables the limit for that API)
+            max_workers: Size of the shared worker pool (default: max_concurrency)
+            retry_policy: Backoff and attempt limits for failed calls (default: RetryPolicy())
+            adaptive_concurrency: Shrink the concurrency cap on throttling and grow it back
+                                  towards max_concurrency on success (default: True)
+            min_concurrency: Lowest cap the adaptive controller may reach (default: 1)
+            profiler: Records latency, size and retries of every request (default: disabled)
+        """
+        self.max_concurrency = max_concurrency
+        limits = dict(DEFAULT_RATE_LIMITS)
+        limits.update(rate_limits or {})
+        self._buckets = {api: TokenBucket(rate) for api, rate in limits.items() if rate}
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or max_concurrency, thread_name_prefix='scheduler'
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.concurrency = AIMDController(
+            max_concurrency, minimum=min_concurrency
+        ) if adaptive_concurrency else None
+
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+
+        self._stats_lock = threading.Lock()
+        self._stats = Counter()
+        self.profiler = profiler or RunProfiler(enabled=False)
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict,
+        max_concurrency: Optional[int] = None,
+        rate_limit_scale: float = 1.0,
+        profiler: Optional[RunProfiler] = None
+    ) -> 'RequestScheduler':
+        """
+        Build a scheduler from the 'scheduler' section of config.json
+
+        Args:
+            config: Full configuration dictionary
+            max_concurrency: Command-line override for the global concurrency cap
+            rate_limit_scale: Share of the per-API rate limits this process may use
+                              (e.g. 1/N for one of N shards running at the same time)
+            profiler: Run profiler for --profile (default: disabled)
+
+        Returns:
+            RequestScheduler instance
+        """
+        section = config.get('scheduler', {})
+        rate_limits = dict(DEFAULT_RATE_LIMITS)
+        rate_limits.update(section.get('rate_limits') or {})
+        return cls(
+            max_concurrency=max_concurrency or section.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+            rate_limits={api: rate * rate_limit_scale if rate else rate for api, rate in rate_limits.items()},
+            retry_policy=RetryPolicy.from_config(section.get('retry', {})),
+            adaptive_concurrency=section.get('adaptive_concurrency', True),
+            min_concurrency=section.get('min_concurrency', 1),
+            profiler=profiler
+        )
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current cap on requests in flight (below max_concurrency while throttled)"""
+        return self.concurrency.limit if self.concurrency else self.max_concurrency
+
+    def _acquire_slot(self, priority: int) -> None:
+        with self._cond:
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            while self._in_flight >= self.concurrency_limit or self._waiters[0] != entry:
+                self._cond.wait()
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            # The next waiter in line may be able to proceed as well
+            self._cond.notify_all()
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def reserve(self, api: str) -> float:
+        """
+        Take a token from the API's bucket without blocking
+        Lets callers that cannot block a thread (e.g. an asyncio event loop) share the same budget
+
+        Args:
+            api: API name used for rate limiting (e.g. 'describe_metric_list')
+
+        Returns:
+            Seconds the caller must wait before sending the request (0 if the API is not rate limited)
+        """
+        bucket = self._buckets.get(api)
+        return bucket.reserve() if bucket else 0.0
+
+    def call(self, api: str, fn: Callable, *args, priority: int = PRIORITY_TENANT, **kwargs):
+        """
+        Execute one API request in the calling thread under the global limits
+        Retryable failures are retried; the slot is released while backing off
+
+        Args:
+            api: API name used for rate limiting (e.g. 'describe_metric_list')
+            fn: Callable performing the request
+            priority: PRIORITY_INSTANCE or PRIORITY_TENANT
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            Result of fn
+
+        Raises:
+            The last exception of fn if it is permanent or the attempts are exhausted
+        """
+        attempt = 0
+        while True:
+            delay = self.reserve(api)
+            if delay > 0:
+                time.sleep(delay)
+            self._acquire_slot(priority)
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                self.profiler.record_call(api, time.monotonic() - started, error=True)
+            else:
+                self.profiler.record_call(api, time.monotonic() - started, result)
+                self.record_success()
+                return result
+            finally:
+                self._release_slot()
+
+            attempt += 1
+            backoff = self.retry_delay(api, error, attempt)
+            if backoff is None:
+                raise error
+            time.sleep(backoff)
+
+    def record_success(self) -> None:
+        """Count a successful call and let the concurrency cap grow"""
+        with self._stats_lock:
+            self._stats['calls'] += 1
+        if self.concurrency:
+            self.concurrency.on_success()
+
+    def retry_delay(self, api: str, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Classify a failed call and decide whether to retry it
+
+        Args:
+            api: API name of the call
+            error: Exception raised by the call
+            attempt: Number of failed attempts of this call so far
+
+        Returns:
+            Seconds to back off before the next attempt, or None to give up
+        """
+        kind = classify_error(error)
+        if kind == THROTTLED and self.concurrency:
+            self.concurrency.on_throttle()
+
+        with self._stats_lock:
+            self._stats['calls'] += 1
+            self._stats[f'{kind}_errors'] += 1
+            self._stats[f'{api}.{kind}_errors'] += 1
+            if kind == PERMANENT:
+                return None
+            if attempt >= self.retry_policy.max_attempts:
+                self._stats['exhausted_retries'] += 1
+                return None
+            self._stats['retries'] += 1
+        self.profiler.record_retry(api)
+        return self.retry_policy.backoff(attempt, error)
+
+    def stats(self) -> Dict:
+        """
+        Call statistics of the run
+
+        Returns:
+            Dictionary with call/error/retry counters and the current concurrency limit
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['concurrency_limit'] = self.concurrency_limit
+        return stats
+
+    def reset_stats(self) -> None:
+        """Start counting calls from zero (the next run of a --daemon process)"""
+        with self._stats_lock:
+            self._stats = Counter()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn on the shared worker pool"""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def imap_unordered(
+        self,
+        fn: Callable,
+        items: Iterable,
+        max_workers: int = 1
+    ) -> Iterator[Tuple[object, Future]]:
+        """
+        Apply fn to every item with up to max_workers items in progress, yielding as they complete
+
+        Items are pulled lazily, so a generator can keep producing them while earlier
+        items are processed. The calling thread works on items too, so progress never
+        depends on a free pool thread.
+
+        Args:
+            fn: Callable taking one item
+            items: Iterable of items
+            max_workers: Maximum number of items processed concurrently
+
+        Yields:
+            Tuples of (item, completed Future holding fn's result or exception)
+        """
+        iterator = iter(items)
+        lock = threading.Lock()
+        done: 'queue.Queue[Tuple[object, Future]]' = queue.Queue()
+        state = {'started': 0, 'exhausted': False, 'error': None}
+
+        def next_item():
+            with lock:
+                if state['exhausted']:
+                    return False, None
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    state['exhausted'] = True
+                    return False, None
+                except Exception as e:
+                    state['exhausted'] = True
+                    state['error'] = e
+                    return False, None
+                state['started'] += 1
+                return True, item
+
+        def run(item) -> Future:
+            future = Future()
+            try:
+                future.set_result(fn(item))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        def helper():
+            while True:
+                has_item, item = next_item()
+                if not has_item:
+                    return
+                done.put((item, run(item)))
+
+        for _ in range(max(max_workers, 1) - 1):
+            self._pool.submit(helper)
+
+        yielded = 0
+        try:
+            while True:
+                while True:
+                    try:
+                        result = done.get_nowait()
+                    except queue.Empty:
+                        break
+                    yielded += 1
+                    yield result
+
+                has_item, item = next_item()
+                if not has_item:
+                    break
+                future = run(item)
+                yielded += 1
+                yield item, future
+
+            while yielded < state['started']:
+                yielded += 1
+                yield done.get()
+        finally:
+            # Consumer stopped early: stop helpers from pulling further items
+            with lock:
+                state['exhausted'] = True
+
+        if state['error'] is not None:
+            raise state['error']
+
+    def map(self, fn: Callable, items: Iterable, max_workers: int = 1) -> List:
+        """
+        Apply fn to every item concurrently and return results in input order
+
+        Raises the first exception raised by fn, after all items finished
+        """
+        pairs = list(enumerate(items))
+        results: List[Optional[Future]] = [None] * len(pairs)
+        # Work on (index, item) pairs so results land in input order
+        for (i, _), future in self.imap_unordered(lambda pair: fn(pair[1]), pairs, max_workers):
+            results[i] = future
+        return [future.result() for future in results]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the shared worker pool"""
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,203 @@
+"""
+Retry and adaptive concurrency for Alibaba Cloud API calls
+Classifies SDK errors, computes jittered exponential backoff and adjusts the
+number of requests in flight with an AIMD controller driven by throttling
+"""
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from Tea.exceptions import RetryError
+
+# Error classes returned by classify_error()
+THROTTLED = 'throttled'  # Over quota: retry after backoff and reduce concurrency
+RETRYABLE = 'retryable'  # Transient server or network failure: retry after backoff
+PERMANENT = 'permanent'  # e.g. 400 metric not available, bad parameters: do not retry
+
+# Error codes that mean "too many requests" even without HTTP 429
+THROTTLING_CODES = {'Throttling', 'ServiceUnavailable.Throttling', 'QpsLimitExceeded', 'TooManyRequests'}
+
+# Error codes of transient server-side failures returned with 4xx status
+RETRYABLE_CODES = {'ServiceUnavailable', 'InternalError', 'ServiceTimeout', 'RequestTimeout'}
+
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 5.0
+
+
+class ApiResponseError(Exception):
+    """Error reported in the body of an HTTP 200 response (Success=false)"""
+
+    def __init__(self, code: str, message: str = '', status_code: Optional[int] = None):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+
+
+def _unwrap(error: Exception) -> Exception:
+    # The SDK wraps network errors in UnretryableException(inner_exception=...)
+    inner = getattr(error, 'inner_exception', None)
+    return inner if isinstance(inner, Exception) else error
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Classify an exception raised by an SDK call
+
+    Args:
+        error: Exception raised by the SDK (ClientException, ServerException,
+               ThrottlingException, network errors, ApiResponseError)
+
+    Returns:
+        THROTTLED, RETRYABLE or PERMANENT
+    """
+    error = _unwrap(error)
+    code = str(getattr(error, 'code', '') or '')
+    status = (getattr(error, 'status_code', None) or getattr(error, 'statusCode', None)
+              or getattr(error, 'status', None))
+    try:
+        status = int(status) if status is not None else None
+    except (TypeError, ValueError):
+        status = None
+
+    if (getattr(error, 'retry_after', None) is not None or status == 429
+            or code.startswith('Throttling') or code in THROTTLING_CODES):
+        return THROTTLED
+    if (status is not None and status >= 500) or code in RETRYABLE_CODES:
+        return RETRYABLE
+    # Connection resets, timeouts and DNS failures carry no status code
+    if status is None and not code and (
+            isinstance(error, (RetryError, OSError)) or _is_aiohttp_error(error)):
+        return RETRYABLE
+    return PERMANENT
+
+
+def _is_aiohttp_error(error: Exception) -> bool:
+    # Network errors of the SDK async calls (e.g. ServerDisconnectedError) are not OSErrors;
+    # aiohttp is imported here since it is loaded with the SDK client anyway
+    from aiohttp import ClientError
+    return isinstance(error, ClientError)
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """True if retrying the call cannot succeed (e.g. metric not available)"""
+    return classify_error(error) == PERMANENT
+
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter")"""
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY
+    ):
+        """
+        Initialize retry policy
+
+        Args:
+            max_attempts: Total attempts per call including the first one (default: 8)
+            base_delay: Backoff cap of the first retry in seconds (default: 0.5)
+            max_delay: Upper bound for any backoff in seconds (default: 5)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_config(cls, section: Dict) -> 'RetryPolicy':
+        """Build a policy from the 'scheduler.retry' config section"""
+        return cls(
+            max_attempts=section.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+            base_delay=section.get('base_delay', DEFAULT_BASE_DELAY),
+            max_delay=section.get('max_delay', DEFAULT_MAX_DELAY)
+        )
+
+    def backoff(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Seconds to wait before retry number attempt + 1
+
+        Args:
+            attempt: Number of failed attempts so far (1 for the first retry)
+            error: The failure; a server-provided retry-after (ms) is used as the minimum wait
+
+        Returns:
+            Backoff in seconds
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, cap)
+        retry_after = getattr(_unwrap(error), 'retry_after', None) if error is not None else None
+        if retry_after:
+            delay = max(delay, min(self.max_delay, retry_after / 1000.0))
+        return delay
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit
+
+    While calls succeed the limit grows by `increase` once per `interval`; a
+    throttled call multiplies it by `decrease`, at most once per `cooldown` so one
+    burst of rejections counts as a single signal. API quotas are enforced per
+    second, so the limit settles just below the concurrency the quota allows
+    instead of growing every round trip and overshooting it.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        interval: float = 0.5,
+        cooldown: float = 0.1
+    ):
+        """
+        Initialize controller
+
+        Args:
+            initial: Starting concurrency limit
+            minimum: Lowest limit (default: 1)
+            maximum: Highest limit (default: initial)
+            increase: Additive step per interval without throttling (default: 1)
+            decrease: Multiplier applied on throttling (default: 0.5)
+            interval: Seconds between two increases (default: 0.5)
+            cooldown: Seconds between two decreases (default: 0.1)
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.increase = increase
+        self.decrease = decrease
+        self.interval = interval
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._last_increase = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    def on_success(self) -> None:
+        """Record a successful call"""
+        with self._lock:
+            now = time.monotonic()
+            # No growth right after throttling either
+            if (self._limit < self.maximum and now - self._last_increase >= self.interval
+                    and now - self._last_decrease >= self.interval):
+                self._limit = min(self.maximum, self._limit + self.increase)
+                self._last_increase = now
+
+    def on_throttle(self) -> None:
+        """Record a throttled call"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._limit = max(self.minimum, self._limit * self.decrease)
+                self._last_decrease = now
@@ -0,0 +1,157 @@
+"""
+Checkpoints of extraction runs
+Every completed instance is journaled with its tenants to an append-only file,
+so that an interrupted run can be resumed without fetching that work again
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+CHECKPOINT_DIR = 'checkpoints'
+
+
+def new_run_id(frequency: str) -> str:
+    """Run ID of a new run, e.g. weekly-20240501-063000"""
+    return f"{frequency}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+
+def checkpoint_path(output_dir: str, run_id: str) -> Path:
+    """Checkpoint file of a run"""
+    return Path(output_dir) / CHECKPOINT_DIR / f'{run_id}.jsonl'
+
+
+class RunCheckpoint:
+    """
+    Append-only journal of one extraction run
+
+    The first line holds the run ID and time window; every further line holds
+    one completed instance and its tenants. Lines are flushed to disk as they
+    are written, and a line cut short by a crash is ignored on resume (the
+    instance is fetched again).
+    """
+
+    def __init__(self, path: Path, header: Dict, writable: bool = True):
+        """
+        Open the journal for appending
+
+        Args:
+            path: Checkpoint file (see checkpoint_path())
+            header: Run ID and time window of the run
+            writable: False to only read the results (e.g. shard processes of a --shards run)
+        """
+        self.path = Path(path)
+        self.run_id = header['run_id']
+        self.frequency = header['frequency']
+        self.start_time = datetime.fromisoformat(header['start_time'])
+        self.end_time = datetime.fromisoformat(header['end_time'])
+        self.period_desc = header['period_desc']
+        self.results: List[Tuple[Dict, List[Dict]]] = []
+        self.completed: Set[Tuple[str, str]] = set()
+        self._file = open(self.path, 'a') if writable else None
+
+    @classmethod
+    def create(
+        cls,
+        output_dir: str,
+        run_id: str,
+        frequency: str,
+        start_time: datetime,
+        end_time: datetime,
+        period_desc: str
+    ) -> 'RunCheckpoint':
+        """
+        Start the checkpoint of a new run
+
+        Args:
+            output_dir: Output directory of the run
+            run_id: Run ID (see new_run_id())
+            frequency: Report frequency
+            start_time: Start of the time window
+            end_time: End of the time window
+            period_desc: Description of the time window
+
+        Returns:
+            Writable RunCheckpoint
+        """
+        header = {
+            'run_id': run_id,
+            'frequency': frequency,
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'period_desc': period_desc,
+        }
+        path = checkpoint_path(output_dir, run_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(json.dumps(header) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(path, header)
+
+    @classmethod
+    def load(cls, output_dir: str, run_id: str, writable: bool = True) -> 'RunCheckpoint':
+        """
+        Open the checkpoint of an earlier run with the instances it completed
+
+        Args:
+            output_dir: Output directory of the run
+            run_id: Run ID printed by the run
+            writable: False to only read the results
+
+        Returns:
+            RunCheckpoint with results and completed filled in
+
+        Raises:
+            FileNotFoundError: If the run has no checkpoint
+        """
+        path = checkpoint_path(output_dir, run_id)
+        with open(path, 'r') as f:
+            lines = f.read().split('\n')
+
+        header = json.loads(lines[0])
+        records = []
+        valid_size = len(lines[0]) + 1
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Incomplete last line of an interrupted run
+                break
+            records.append(record)
+            valid_size += len(line) + 1
+
+        if writable:
+            # Drop the incomplete line so that new lines start on a line of their own
+            with open(path, 'r+') as f:
+                f.truncate(valid_size)
+        checkpoint = cls(path, header, writable=writable)
+        for record in records:
+            checkpoint._add(record['instance'], record['tenants'])
+        return checkpoint
+
+    def _add(self, instance_data: Dict, tenants: List[Dict]) -> None:
+        self.results.append((instance_data, tenants))
+        self.completed.add((instance_data.get('region'), instance_data.get('instance_id')))
+
+    def record(self, instance_data: Dict, tenants: List[Dict]) -> None:
+        """Journal a completed instance and its tenants"""
+        self._add(instance_data, tenants)
+        if self._file is None:
+            return
+        self._file.write(json.dumps({'instance': instance_data, 'tenants': tenants}, default=str) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Close the journal"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """Close and delete the checkpoint once the run's output is written"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
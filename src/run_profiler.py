@@ -0,0 +1,337 @@
+"""
+Run profiler for extraction runs (--profile)
+Records per-API latency histograms, errors, retries, bytes received and datapoints
+parsed, plus time per extraction stage and per instance/tenant, and exports them
+as a JSON run summary or in the Prometheus text format
+"""
+import asyncio
+import contextlib
+import functools
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROFILE_DIR = 'profile'
+
+# Upper bounds (seconds) of the latency histogram buckets, as Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Extraction stages in report order
+STAGES = ('discovery', 'instance_details', 'utilization', 'tenant_fetch', 'export')
+
+METRIC_PREFIX = 'oceanbase_report'
+
+# Shared no-op context of disabled profilers and untimed work
+NO_STAGE = contextlib.nullcontext()
+
+
+def response_bytes(response) -> int:
+    """Size of an SDK response body from its Content-Length header (0 if unknown)"""
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return int(headers.get('content-length') or headers.get('Content-Length') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with LATENCY_BUCKETS"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q quantile (the maximum for the last bucket)"""
+        target = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if count and cumulative >= target:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+        return 0.0
+
+
+class RunProfiler:
+    """
+    Timing and volume statistics of one run
+
+    API calls are recorded by the request scheduler (every attempt, so retries
+    show up as separate calls), stages by the reporters (see profiled()) and by
+    main.py. A disabled profiler records nothing and costs one attribute check
+    per call.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize profiler
+
+        Args:
+            enabled: False for a profiler that ignores everything (the default of RequestScheduler)
+        """
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._api: Dict[str, Dict[str, int]] = {}
+        self._datapoints = 0
+        # stage -> [calls, busy seconds, first start, last end]
+        self._stages: Dict[str, List[float]] = {}
+        self._instances: Dict[str, float] = {}
+        self._tenants: Dict[Tuple[str, str], float] = {}
+
+    def _api_counters(self, api: str) -> Dict[str, int]:
+        counters = self._api.get(api)
+        if counters is None:
+            counters = self._api[api] = {'errors': 0, 'retries': 0, 'bytes': 0}
+            self._latency[api] = LatencyHistogram()
+        return counters
+
+    def record_call(self, api: str, seconds: float, response=None, error: bool = False) -> None:
+        """
+        Record one API request attempt
+
+        Args:
+            api: API name (e.g. 'describe_metric_list')
+            seconds: Latency of the attempt
+            response: SDK response of a successful attempt (for its size)
+            error: True if the attempt failed
+        """
+        if not self.enabled:
+            return
+        size = response_bytes(response) if response is not None else 0
+        with self._lock:
+            counters = self._api_counters(api)
+            self._latency[api].observe(seconds)
+            counters['bytes'] += size
+            if error:
+                counters['errors'] += 1
+
+    def record_retry(self, api: str) -> None:
+        """Record that a failed call of an API is retried"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._api_counters(api)['retries'] += 1
+
+    def record_datapoints(self, count: int) -> None:
+        """Record datapoints parsed from DescribeMetricList responses"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._datapoints += count
+
+    def stage(self, name: str, instance_id: Optional[str] = None, tenant_id: Optional[str] = None):
+        """
+        Context manager timing a piece of work of a stage
+
+        Args:
+            name: Stage name (see STAGES)
+            instance_id: Instance the work belongs to (counted towards its total)
+            tenant_id: Tenant the work belongs to (counted towards its total)
+        """
+        if not self.enabled:
+            return NO_STAGE
+        return self._stage(name, instance_id, tenant_id)
+
+    @contextlib.contextmanager
+    def _stage(self, name: str, instance_id: Optional[str], tenant_id: Optional[str]):
+        started = time.time()
+        try:
+            yield
+        finally:
+            finished = time.time()
+            seconds = finished - started
+            with self._lock:
+                stage = self._stages.setdefault(name, [0, 0.0, started, finished])
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = min(stage[2], started)
+                stage[3] = max(stage[3], finished)
+                if instance_id is not None:
+                    self._instances[instance_id] = self._instances.get(instance_id, 0.0) + seconds
+                    if tenant_id is not None:
+                        key = (instance_id, tenant_id)
+                        self._tenants[key] = self._tenants.get(key, 0.0) + seconds
+
+    def summary(self, top: int = 10) -> Dict:
+        """
+        JSON-serializable run summary
+
+        Args:
+            top: Number of slowest instances and tenants to include
+
+        Returns:
+            Dictionary with run_seconds, apis, datapoints_parsed, stages,
+            slowest_instances and slowest_tenants
+        """
+        with self._lock:
+            apis = {}
+            for api in sorted(self._api):
+                histogram = self._latency[api]
+                apis[api] = dict(
+                    self._api[api],
+                    calls=histogram.count,
+                    seconds=round(histogram.total, 3),
+                    mean=round(histogram.total / histogram.count, 4) if histogram.count else 0.0,
+                    p50=histogram.quantile(0.5),
+                    p95=histogram.quantile(0.95),
+                    p99=histogram.quantile(0.99),
+                    max=round(histogram.max, 4),
+                    buckets=dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], histogram.buckets)),
+                )
+            stages = {
+                name: {'calls': int(calls), 'busy_seconds': round(busy, 3), 'wall_seconds': round(end - start, 3)}
+                for name, (calls, busy, start, end) in sorted(
+                    self._stages.items(), key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES)
+                )
+            }
+            instances = sorted(self._instances.items(), key=lambda item: -item[1])[:top]
+            tenants = sorted(self._tenants.items(), key=lambda item: -item[1])[:top]
+            datapoints = self._datapoints
+
+        return {
+            'run_seconds': round(time.time() - self.started, 3),
+            'apis': apis,
+            'datapoints_parsed': datapoints,
+            'stages': stages,
+            'slowest_instances': [
+                {'instance_id': instance_id, 'seconds': round(seconds, 3)} for instance_id, seconds in instances
+            ],
+            'slowest_tenants': [
+                {'instance_id': instance_id, 'tenant_id': tenant_id, 'seconds': round(seconds, 3)}
+                for (instance_id, tenant_id), seconds in tenants
+            ],
+        }
+
+    def prometheus(self) -> str:
+        """Run statistics in the Prometheus text exposition format (e.g. for a node_exporter textfile)"""
+        summary = self.summary(top=0)
+        lines = [
+            f'# HELP {METRIC_PREFIX}_api_request_duration_seconds Latency of API request attempts',
+            f'# TYPE {METRIC_PREFIX}_api_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            histograms = [(api, self._latency[api]) for api in sorted(self._latency)]
+            for api, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], histogram.buckets):
+                    cumulative += count
+                    lines.append(f'{METRIC_PREFIX}_api_request_duration_seconds_bucket{{api="{api}",le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_PREFIX}_api_request_duration_seconds_sum{{api="{api}"}} {histogram.total:.6f}')
+                lines.append(f'{METRIC_PREFIX}_api_request_duration_seconds_count{{api="{api}"}} {histogram.count}')
+
+        for name, field, help_text in (
+            ('api_errors_total', 'errors', 'Failed API request attempts'),
+            ('api_retries_total', 'retries', 'Retried API calls'),
+            ('api_response_bytes_total', 'bytes', 'Bytes of API responses received'),
+        ):
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} counter')
+            lines.extend(f'{METRIC_PREFIX}_{name}{{api="{api}"}} {stats[field]}' for api, stats in summary['apis'].items())
+
+        lines.append(f'# HELP {METRIC_PREFIX}_datapoints_parsed_total CloudMonitor datapoints parsed')
+        lines.append(f'# TYPE {METRIC_PREFIX}_datapoints_parsed_total counter')
+        lines.append(f"{METRIC_PREFIX}_datapoints_parsed_total {summary['datapoints_parsed']}")
+        lines.append(f'# HELP {METRIC_PREFIX}_stage_busy_seconds_total Time spent in a stage, summed over concurrent work')
+        lines.append(f'# TYPE {METRIC_PREFIX}_stage_busy_seconds_total counter')
+        lines.extend(f'{METRIC_PREFIX}_stage_busy_seconds_total{{stage="{name}"}} {stage["busy_seconds"]}'
+                     for name, stage in summary['stages'].items())
+        lines.append(f'# HELP {METRIC_PREFIX}_stage_wall_seconds Time from the first start to the last end of a stage')
+        lines.append(f'# TYPE {METRIC_PREFIX}_stage_wall_seconds gauge')
+        lines.extend(f'{METRIC_PREFIX}_stage_wall_seconds{{stage="{name}"}} {stage["wall_seconds"]}'
+                     for name, stage in summary['stages'].items())
+        lines.append(f'# HELP {METRIC_PREFIX}_run_duration_seconds Duration of the run so far')
+        lines.append(f'# TYPE {METRIC_PREFIX}_run_duration_seconds gauge')
+        lines.append(f"{METRIC_PREFIX}_run_duration_seconds {summary['run_seconds']}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, output_dir: str, name: str, top: int = 10) -> Tuple[Path, Path]:
+        """
+        Write the JSON summary and the Prometheus text file
+
+        Args:
+            output_dir: Output directory of the run (files go to output_dir/profile/)
+            name: File name without extension (e.g. the run ID)
+            top: Number of slowest instances and tenants in the JSON summary
+
+        Returns:
+            (JSON path, Prometheus path)
+        """
+        directory = Path(output_dir) / PROFILE_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        json_path = directory / f'{name}.json'
+        prom_path = directory / f'{name}.prom'
+        with open(json_path, 'w') as f:
+            json.dump(self.summary(top), f, indent=2)
+        with open(prom_path, 'w') as f:
+            f.write(self.prometheus())
+        return json_path, prom_path
+
+    def print_report(self, top: int = 10) -> None:
+        """Print API latencies, stage times and the slowest instances and tenants"""
+        summary = self.summary(top)
+        print(f"Profile ({summary['run_seconds']:.1f}s run, {summary['datapoints_parsed']} datapoints parsed):")
+        print(f"  {'API':<22} {'Calls':>7} {'Errors':>7} {'Retries':>8} {'Mean':>8} {'p50<=':>7} "
+              f"{'p95<=':>7} {'p99<=':>7} {'Max':>7} {'MB':>8}")
+        for api, stats in summary['apis'].items():
+            print(f"  {api:<22} {stats['calls']:>7} {stats['errors']:>7} {stats['retries']:>8} "
+                  f"{stats['mean']:>8.3f} {stats['p50']:>7} {stats['p95']:>7} {stats['p99']:>7} "
+                  f"{stats['max']:>7.2f} {stats['bytes'] / 2 ** 20:>8.2f}")
+        print(f"  {'Stage':<22} {'Calls':>7} {'Busy s':>9} {'Wall s':>9}")
+        for name, stage in summary['stages'].items():
+            print(f"  {name:<22} {stage['calls']:>7} {stage['busy_seconds']:>9.2f} {stage['wall_seconds']:>9.2f}")
+        if summary['slowest_instances']:
+            print("  Slowest instances (seconds in API calls and processing):")
+            for entry in summary['slowest_instances']:
+                print(f"    {entry['instance_id']:<30} {entry['seconds']:>8.2f}")
+        if summary['slowest_tenants']:
+            print("  Slowest tenants:")
+            for entry in summary['slowest_tenants']:
+                print(f"    {entry['instance_id']}/{entry['tenant_id']:<20} {entry['seconds']:>8.2f}")
+
+
+def profiled(stage: str, per_tenant: bool = False) -> Callable:
+    """
+    Time a reporter method (sync or async) as a stage of its instance
+
+    The method's first argument must be the instance ID; with per_tenant the
+    second one (or tenant_id=) is the tenant ID. The reporter's scheduler
+    profiler records the time.
+
+    Args:
+        stage: Stage name (see STAGES)
+        per_tenant: Also count the time towards the tenant
+    """
+    def decorate(fn: Callable) -> Callable:
+        def item(args: tuple, kwargs: dict) -> Optional[str]:
+            if not per_tenant:
+                return None
+            return args[0] if args else kwargs.get('tenant_id')
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, instance_id, *args, **kwargs):
+                with self.scheduler.profiler.stage(stage, instance_id, item(args, kwargs)):
+                    return await fn(self, instance_id, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, instance_id, *args, **kwargs):
+            with self.scheduler.profiler.stage(stage, instance_id, item(args, kwargs)):
+                return fn(self, instance_id, *args, **kwargs)
+        return wrapper
+    return decorate
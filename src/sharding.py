@@ -0,0 +1,109 @@
+"""
+Sharded extraction across processes or hosts
+Instances are assigned to shards by consistent hashing of their ID; each shard
+writes its per-instance results to a JSON lines file that the merge step reads
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+SHARD_DIR = 'shards'
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach): growing from N to N+1 buckets moves only 1/(N+1) of the keys
+
+    Args:
+        key: 64-bit integer key
+        buckets: Number of buckets
+
+    Returns:
+        Bucket in [0, buckets)
+    """
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_of(instance_id: str, shard_count: int) -> int:
+    """Shard (0-based) an instance belongs to; stable across processes, hosts and Python versions"""
+    key = int.from_bytes(hashlib.md5(instance_id.encode('utf-8')).digest()[:8], 'big')
+    return jump_hash(key, shard_count)
+
+
+def parse_shard_index(value: str) -> Tuple[int, int]:
+    """
+    argparse type for --shard-index: 'i/N' with 0 <= i < N
+
+    Returns:
+        (shard_index, shard_count)
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 0 and {count - 1}, got '{value}'")
+    return index, count
+
+
+def shard_results_path(output_dir: str, frequency: str, shard_index: int, shard_count: int) -> Path:
+    """JSON lines file holding the results of one shard"""
+    return Path(output_dir) / SHARD_DIR / frequency / f'shard-{shard_index}-of-{shard_count}.jsonl'
+
+
+class ShardResultWriter:
+    """
+    Write the per-instance results of one shard, one JSON line per instance
+
+    Lines go to a temporary file that replaces the shard file on close(), so
+    a failed or restarted shard never leaves a partial file behind.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open the temporary results file
+
+        Args:
+            path: Shard results file (see shard_results_path())
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        self._file = open(self._tmp_path, 'w')
+        self.count = 0
+
+    def write(self, instance_data: Dict, tenants: List[Dict]) -> None:
+        """Append the result of one instance"""
+        self._file.write(json.dumps({'instance': instance_data, 'tenants': tenants}, default=str) + '\n')
+        self.count += 1
+
+    def close(self) -> None:
+        """Publish the shard file"""
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def read_shard_results(paths: List[Path]) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    Read the results written by ShardResultWriter
+
+    Args:
+        paths: Shard results files
+
+    Yields:
+        (instance_data, tenants) per instance
+    """
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    result = json.loads(line)
+                    yield result['instance'], result['tenants']
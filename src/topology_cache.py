@@ -0,0 +1,208 @@
+"""
+On-disk cache of instance and tenant topology
+Keeps parsed DescribeInstance and DescribeTenant results (resource allocation,
+unit counts, max_connections, tenant mode) across runs, so runs within the TTL
+spend their API budget on CloudMonitor metrics
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_TTL_HOURS = 24
+DEFAULT_TOPOLOGY_FILE = 'topology.json'
+
+
+def instance_fingerprint(instance) -> List:
+    """
+    Fields of a DescribeInstances instance model that change with its topology
+
+    State, version, specification and the CPU/memory allocated to tenants;
+    disk usage is left out since it changes all the time.
+    """
+    resource = instance.resource
+    cpu = resource.cpu if resource else None
+    memory = resource.memory if resource else None
+    return [
+        instance.state, instance.create_time, instance.version, instance.cpu, instance.mem, instance.disk_size,
+        resource.unit_count if resource else None,
+        cpu.used_cpu if cpu else None, memory.used_memory if memory else None,
+    ]
+
+
+def tenant_fingerprint(tenant) -> List:
+    """Fields of a DescribeTenants tenant model that change with its topology"""
+    return [tenant.create_time, tenant.status, tenant.tenant_mode, tenant.cpu, tenant.mem, tenant.unit_num]
+
+
+class TopologyCache:
+    """
+    Parsed describe results per instance and tenant, persisted as JSON
+
+    An entry is used while it is younger than the TTL and the listing of this
+    run (DescribeInstances for instances, DescribeTenants for tenants) shows
+    the same fingerprint it was fetched with. A listing with a different set
+    of tenants than the previous run also drops the instance's entry, since
+    its allocation depends on the tenants. Entries are merged into the file
+    on save, so shard processes can share it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        refresh: bool = False
+    ):
+        """
+        Initialize cache and load the existing file
+
+        Args:
+            path: JSON file holding the cache
+            ttl_hours: Hours before an entry is fetched again (default: 24)
+            refresh: Fetch everything and rewrite the entries (--refresh-topology)
+        """
+        self.path = Path(path)
+        self.ttl = timedelta(hours=ttl_hours)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._entries, self._tenant_sets = self._load()
+        # Fingerprints seen in this run's listings, entries fetched and keys dropped
+        self._observed: Dict[str, List] = {}
+        self._updates: Dict[str, Dict] = {}
+        self._tenant_set_updates: Dict[str, List[str]] = {}
+        self._dropped = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def key(region: str, instance_id: str, tenant_id: Optional[str] = None) -> str:
+        """Cache key of an instance, or of a tenant of the instance"""
+        return f"{region}|{instance_id}" + (f"|{tenant_id}" if tenant_id else '')
+
+    def _load(self) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            return data.get('entries', {}), data.get('tenant_sets', {})
+        except FileNotFoundError:
+            return {}, {}
+        except (ValueError, OSError) as e:
+            print(f"⚠ Ignoring unreadable topology cache {self.path}: {str(e)}")
+            return {}, {}
+
+    def observe(self, key: str, fingerprint: List) -> None:
+        """Record the fingerprint of an instance or tenant from this run's listing"""
+        with self._lock:
+            self._observed[key] = fingerprint
+
+    def observe_tenant_set(self, region: str, instance_id: str, tenant_ids: List[str]) -> bool:
+        """
+        Compare the tenants listed for an instance with the previous listing
+
+        Args:
+            region: Region of the instance
+            instance_id: OceanBase instance ID
+            tenant_ids: Tenant IDs listed in this run
+
+        Returns:
+            True if tenants were added or removed (the instance's entry is dropped)
+        """
+        key = self.key(region, instance_id)
+        tenant_ids = sorted(tenant_ids)
+        with self._lock:
+            previous = self._tenant_sets.get(key)
+            self._tenant_set_updates[key] = tenant_ids
+            if previous is None or previous == tenant_ids:
+                return False
+            self._dropped.add(key)
+            self._dropped.update(self.key(region, instance_id, tenant_id)
+                                 for tenant_id in set(previous) - set(tenant_ids))
+            return True
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Cached entry of an instance or tenant
+
+        Returns:
+            Entry with 'data' (parsed describe result) and 'profile', or None if
+            missing, expired, changed according to this run's listing, or refreshing
+        """
+        with self._lock:
+            entry = None if self.refresh else self._entries.get(key)
+            if entry is not None:
+                observed = self._observed.get(key)
+                if key in self._dropped or (observed is not None and observed != entry.get('fingerprint')):
+                    self.invalidated += 1
+                    entry = None
+                elif datetime.now() - datetime.fromisoformat(entry['fetched_at']) >= self.ttl:
+                    entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key: str, data: Dict, profile: Optional[List[str]] = None) -> None:
+        """
+        Store a freshly fetched describe result
+
+        Args:
+            key: Cache key (see key())
+            data: Parsed describe result
+            profile: Instance series and version (instances only)
+        """
+        with self._lock:
+            self._updates[key] = {
+                'fetched_at': datetime.now().isoformat(timespec='seconds'),
+                'fingerprint': self._observed.get(key),
+                'profile': profile,
+                'data': data,
+            }
+            self._dropped.discard(key)
+
+    def new_run(self) -> None:
+        """Start another run after save() (--daemon): listings are observed again"""
+        with self._lock:
+            self._observed = {}
+            self._updates = {}
+            self._tenant_set_updates = {}
+            self._dropped = set()
+            self.hits = self.misses = self.invalidated = 0
+
+    def summary(self) -> Dict[str, int]:
+        """Entries used from the cache, fetched, and fetched because the listing changed in this run"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'invalidated': self.invalidated}
+
+    def save(self) -> None:
+        """Merge this run's entries into the cache file, leaving out expired ones (atomic replace)"""
+        # Re-read the file: other processes (e.g. shards) may have saved since it was loaded
+        entries, tenant_sets = self._load()
+        cutoff = datetime.now() - self.ttl
+        with self._lock:
+            for key in self._dropped:
+                entries.pop(key, None)
+            entries.update(self._updates)
+            entries = {
+                key: entry for key, entry in entries.items()
+                if datetime.fromisoformat(entry['fetched_at']) > cutoff
+            }
+            tenant_sets.update(self._tenant_set_updates)
+            # Instances without entries left (e.g. deleted ones) need no tenant set either
+            cached_instances = {'|'.join(key.split('|')[:2]) for key in entries}
+            tenant_sets = {key: ids for key, ids in tenant_sets.items() if key in cached_instances}
+            self._entries, self._tenant_sets = entries, tenant_sets
+            data = {
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+                'entries': entries,
+                'tenant_sets': tenant_sets,
+            }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f'{self.path.suffix}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
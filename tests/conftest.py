@@ -0,0 +1,7 @@
+"""
+Shared pytest setup: the modules under src/ are imported by name, as main.py does
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
@@ -0,0 +1,90 @@
+"""
+Tests for the report schedule and report requests of --daemon
+"""
+from datetime import datetime, time
+
+import pytest
+
+from collector import REQUEST_SUFFIX, ReportSchedule, parse_report_time
+
+REPORT_TIME = time(0, 15)
+# Monday the 1st: daily, weekly and monthly reports are all scheduled
+MONDAY_FIRST = datetime(2024, 7, 1)
+
+
+def schedule_at(tmp_path, frequencies, now):
+    return ReportSchedule(frequencies, REPORT_TIME, tmp_path / 'daemon', now=now)
+
+
+def request(schedule, name):
+    (schedule.request_dir / f'{name}{REQUEST_SUFFIX}').touch()
+
+
+def test_parse_report_time():
+    assert parse_report_time('06:30') == time(6, 30)
+    with pytest.raises(ValueError):
+        parse_report_time('25:00')
+
+
+def test_due_once_per_slot(tmp_path):
+    schedule = schedule_at(tmp_path, ['daily'], MONDAY_FIRST.replace(hour=0, minute=5))
+
+    assert schedule.due(MONDAY_FIRST.replace(hour=0, minute=10)) == []
+    assert schedule.due(MONDAY_FIRST.replace(hour=0, minute=15)) == ['daily']
+    assert schedule.due(MONDAY_FIRST.replace(hour=9)) == []
+    assert schedule.due(datetime(2024, 7, 2, 0, 14)) == []
+    assert schedule.due(datetime(2024, 7, 2, 3, 0)) == ['daily']
+
+
+def test_started_after_report_time_waits_for_next_slot(tmp_path):
+    schedule = schedule_at(tmp_path, ['daily'], MONDAY_FIRST.replace(hour=8))
+
+    assert schedule.due(MONDAY_FIRST.replace(hour=9)) == []
+    assert schedule.next_report(MONDAY_FIRST.replace(hour=9)) == datetime(2024, 7, 2, 0, 15)
+
+
+def test_weekly_on_mondays_and_monthly_on_the_first(tmp_path):
+    schedule = schedule_at(tmp_path, ['monthly', 'weekly', 'daily'], datetime(2024, 6, 30, 12))
+
+    assert schedule.due(MONDAY_FIRST.replace(hour=1)) == ['daily', 'weekly', 'monthly']
+    assert schedule.due(datetime(2024, 7, 2, 1)) == ['daily']
+    assert schedule.due(datetime(2024, 7, 8, 1)) == ['daily', 'weekly']
+    assert schedule.due(datetime(2024, 8, 1, 1)) == ['daily', 'monthly']
+
+
+def test_next_report(tmp_path):
+    weekly = schedule_at(tmp_path, ['weekly'], datetime(2024, 7, 2, 12))
+    assert weekly.next_report(datetime(2024, 7, 2, 12)) == datetime(2024, 7, 8, 0, 15)
+
+    monthly = schedule_at(tmp_path, ['monthly'], datetime(2024, 7, 1, 0, 0))
+    assert monthly.next_report(datetime(2024, 7, 1, 0, 0)) == datetime(2024, 7, 1, 0, 15)
+    monthly.due(datetime(2024, 7, 1, 0, 20))
+    assert monthly.next_report(datetime(2024, 7, 1, 0, 20)) == datetime(2024, 8, 1, 0, 15)
+
+    assert schedule_at(tmp_path, [], MONDAY_FIRST).next_report(MONDAY_FIRST) is None
+
+
+def test_requested_reports_picked_up_once(tmp_path):
+    schedule = schedule_at(tmp_path, [], MONDAY_FIRST.replace(hour=12))
+    request(schedule, 'weekly')
+    request(schedule, 'daily')
+
+    assert schedule.due(MONDAY_FIRST.replace(hour=12)) == ['daily', 'weekly']
+    assert list(schedule.request_dir.iterdir()) == []
+    assert schedule.due(MONDAY_FIRST.replace(hour=12)) == []
+
+
+def test_request_and_schedule_not_duplicated(tmp_path):
+    schedule = schedule_at(tmp_path, ['daily'], MONDAY_FIRST)
+    request(schedule, 'daily')
+
+    assert schedule.due(MONDAY_FIRST.replace(hour=1)) == ['daily']
+
+
+def test_unknown_request_ignored(tmp_path, capsys):
+    schedule = schedule_at(tmp_path, [], MONDAY_FIRST)
+    request(schedule, 'hourly')
+
+    assert schedule.due(MONDAY_FIRST) == []
+    assert not (schedule.request_dir / f'hourly{REQUEST_SUFFIX}').exists()
+    assert 'Ignoring report request hourly.request' in capsys.readouterr().out
@@ -0,0 +1,137 @@
+"""
+Tests for the SQLite datapoint store: missing-range computation, settling and reads
+"""
+import time
+
+import pytest
+
+from datapoint_store import DatapointStore
+
+PERIOD = 60
+PERIOD_MS = PERIOD * 1000
+HOUR_MS = 3600 * 1000
+METRIC = 'cpu_percent'
+DIMS = '[{"instanceId":"ob1"}]'
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DatapointStore(str(tmp_path / 'datapoints.sqlite'), settle_seconds=3600)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def base_ms():
+    """Hour-aligned start of a window two days ago (settled, within retention)"""
+    return (int(time.time() * 1000) - 2 * 86400 * 1000) // HOUR_MS * HOUR_MS
+
+
+def datapoints(start_ms, end_ms, **labels):
+    return [dict(timestamp=ts, Average=1.0, **labels) for ts in range(start_ms, end_ms, PERIOD_MS)]
+
+
+def fill(store, start_ms, end_ms, dims=DIMS):
+    store.add(METRIC, dims, PERIOD, start_ms, end_ms, datapoints(start_ms, end_ms))
+
+
+def test_empty_store_misses_whole_window(store, base_ms):
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, base_ms, base_ms + HOUR_MS) == [(base_ms, base_ms + HOUR_MS)]
+
+
+def test_window_start_aligned_to_bucket(store, base_ms):
+    # The bucket containing the start overlaps the window, so it is fetched from its start
+    missing = store.missing_ranges(METRIC, DIMS, PERIOD, base_ms + 1500, base_ms + HOUR_MS)
+    assert missing == [(base_ms, base_ms + HOUR_MS)]
+
+
+def test_cached_window_has_no_missing_ranges(store, base_ms):
+    fill(store, base_ms, base_ms + HOUR_MS)
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, base_ms, base_ms + HOUR_MS) == []
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, base_ms + 600000, base_ms + 1200000) == []
+
+
+def test_gaps_around_and_between_cached_ranges(store, base_ms):
+    fill(store, base_ms + HOUR_MS, base_ms + 2 * HOUR_MS)
+    fill(store, base_ms + 3 * HOUR_MS, base_ms + 4 * HOUR_MS)
+
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, base_ms, base_ms + 5 * HOUR_MS) == [
+        (base_ms, base_ms + HOUR_MS),
+        (base_ms + 2 * HOUR_MS, base_ms + 3 * HOUR_MS),
+        (base_ms + 4 * HOUR_MS, base_ms + 5 * HOUR_MS),
+    ]
+
+
+def test_adjacent_and_overlapping_ranges_merge(store, base_ms):
+    fill(store, base_ms, base_ms + HOUR_MS)
+    fill(store, base_ms + HOUR_MS, base_ms + 2 * HOUR_MS)
+    fill(store, base_ms + 1800000, base_ms + 3 * HOUR_MS)
+
+    assert store._coverage(METRIC, DIMS, PERIOD) == [(base_ms, base_ms + 3 * HOUR_MS)]
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, base_ms, base_ms + 4 * HOUR_MS) == [
+        (base_ms + 3 * HOUR_MS, base_ms + 4 * HOUR_MS)
+    ]
+
+
+def test_queries_are_cached_separately(store, base_ms):
+    fill(store, base_ms, base_ms + HOUR_MS)
+    other = '[{"instanceId":"ob2"}]'
+
+    assert store.missing_ranges(METRIC, other, PERIOD, base_ms, base_ms + HOUR_MS) == [(base_ms, base_ms + HOUR_MS)]
+    assert store.missing_ranges('memory_percent', DIMS, PERIOD, base_ms, base_ms + HOUR_MS) != []
+    assert store.missing_ranges(METRIC, DIMS, 300, base_ms, base_ms + HOUR_MS) != []
+
+
+def test_coverage_persists_across_opens(tmp_path, base_ms):
+    path = str(tmp_path / 'datapoints.sqlite')
+    first = DatapointStore(path)
+    fill(first, base_ms, base_ms + HOUR_MS)
+    first.close()
+
+    second = DatapointStore(path)
+    try:
+        assert second.missing_ranges(METRIC, DIMS, PERIOD, base_ms, base_ms + HOUR_MS) == []
+    finally:
+        second.close()
+
+
+def test_unsettled_buckets_refetched_next_run(store):
+    now_ms = int(time.time() * 1000)
+    start_ms = (now_ms - 3 * HOUR_MS) // HOUR_MS * HOUR_MS
+    fill(store, start_ms, now_ms)
+
+    # Reused for the rest of the run
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, start_ms, now_ms) == []
+
+    # The next run fetches again from the first bucket that closed after the settle cutoff
+    store.new_run()
+    settled_ms = (now_ms - store.settle_seconds * 1000) // PERIOD_MS * PERIOD_MS
+    missing = store.missing_ranges(METRIC, DIMS, PERIOD, start_ms, now_ms)
+    assert len(missing) == 1
+    assert missing[0][1] == now_ms
+    assert abs(missing[0][0] - settled_ms) <= PERIOD_MS
+
+
+def test_read_returns_window_pages_and_stats(store, base_ms):
+    store.add(METRIC, DIMS, PERIOD, base_ms, base_ms + HOUR_MS,
+              datapoints(base_ms, base_ms + HOUR_MS, obTenantId='t1') + datapoints(base_ms, base_ms + HOUR_MS, obTenantId='t2'))
+
+    pages = list(store.read(METRIC, DIMS, PERIOD, base_ms + 30000, base_ms + 600000, page_size=7))
+    points = [dp for page in pages for dp in page]
+
+    # Buckets overlapping the window: 10 per tenant, the first one starting before the window start
+    assert len(points) == 20
+    assert {dp['obTenantId'] for dp in points} == {'t1', 't2'}
+    assert [dp['timestamp'] for dp in points] == sorted(dp['timestamp'] for dp in points)
+    assert [len(page) for page in pages] == [7, 7, 6]
+    assert store.stats() == {'ranges_fetched': 1, 'points_fetched': 120, 'points_cached': 20}
+
+
+def test_prune_drops_old_datapoints_and_coverage(store, base_ms):
+    fill(store, base_ms, base_ms + 2 * HOUR_MS)
+    store.prune(base_ms + HOUR_MS)
+    store.new_run()
+
+    assert store.missing_ranges(METRIC, DIMS, PERIOD, base_ms, base_ms + 2 * HOUR_MS) == [(base_ms, base_ms + HOUR_MS)]
+    points = [dp for page in store.read(METRIC, DIMS, PERIOD, base_ms, base_ms + 2 * HOUR_MS) for dp in page]
+    assert min(dp['timestamp'] for dp in points) == base_ms + HOUR_MS
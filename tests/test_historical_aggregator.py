@@ -0,0 +1,88 @@
+"""
+Tests for the quantile sketches of the historical rollups
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from historical_aggregator import SKETCH_ACCURACY, Rollup, sketch_counts
+from metric_stats import QuantileSketch
+
+
+def nearest_rank(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def tenant_day(day, tenants=20, seed=0):
+    """One daily tenants report: a few runs per tenant, with signed, zero and large metrics"""
+    rng = np.random.default_rng(seed + day)
+    rows = tenants * 3
+    return pd.DataFrame({
+        'instance_id': [f'obi-{index % 4}' for index in range(rows)],
+        'tenant_id': [f't{index % tenants}' for index in range(rows)],
+        'tenant_name': [f'tenant-{index % tenants}' for index in range(rows)],
+        'qps': rng.lognormal(6, 1.5, rows),
+        'active_sessions': rng.integers(0, 3, rows).astype(float),
+        'data_size_delta_gb': rng.normal(0, 50, rows),
+    })
+
+
+def rollup_of(days, sketches=True):
+    rollup = Rollup('tenants', sketches=sketches)
+    for day in days:
+        rollup.add(tenant_day(day), [f'oceanbase_tenants_202601{day + 1:02d}_020000.csv'])
+    return rollup
+
+
+def test_bucket_counts_match_quantile_sketch():
+    values = [-250.0, -3.5, 0.0, 1e-12, 0.75, 1.0, 42.0, 42.1, 9.9e6]
+    counts = sketch_counts(
+        pd.DataFrame({'tenant_id': 't1', 'metric': 'qps', 'value': values}), ['tenant_id']
+    )
+    sketch = QuantileSketch(SKETCH_ACCURACY)
+    for value in values:
+        sketch.add(value)
+    expected = sketch.to_dict()
+
+    for name, sign in (('positive', 1), ('negative', -1)):
+        part = counts[counts['sign'] == sign]
+        assert {str(bucket): count for bucket, count in zip(part['bucket'], part['count'])} == expected[name]
+    assert counts.loc[counts['sign'] == 0, 'count'].sum() == expected['zero_count']
+
+
+@pytest.mark.parametrize('column', ['qps', 'active_sessions', 'data_size_delta_gb'])
+def test_daily_p95_within_relative_accuracy(column):
+    days = range(7)
+    result = rollup_of(days).result().set_index('tenant_id')
+    frames = pd.concat([tenant_day(day) for day in days])
+
+    for tenant_id, values in frames.groupby('tenant_id')[column]:
+        exact = nearest_rank(values.tolist(), 0.95)
+        assert result.loc[tenant_id, f'{column}_daily_p95'] == pytest.approx(exact, rel=SKETCH_ACCURACY, abs=1e-9)
+
+
+def test_merged_days_match_single_rollup():
+    single = rollup_of(range(5)).result()
+    merged = rollup_of([0])
+    merged.merge([rollup_of([day]) for day in range(1, 5)])
+
+    pd.testing.assert_frame_equal(merged.result(), single)
+
+
+def test_sketches_survive_save_and_load(tmp_path):
+    days = [rollup_of([day]) for day in range(3)]
+    path = tmp_path / 'date=20260101.parquet'
+    days[0].save(path)
+    loaded = Rollup.load(path)
+
+    expected = rollup_of(range(3)).result()
+    loaded.merge(days[1:])
+    pd.testing.assert_frame_equal(loaded.result(), expected, check_dtype=False)
+
+
+def test_rollup_without_sketches_has_no_quantiles():
+    result = rollup_of(range(2), sketches=False).result()
+
+    assert not [column for column in result.columns if column.endswith('_daily_p95')]
+    assert 'qps_mean' in result.columns
@@ -0,0 +1,94 @@
+"""
+Tests for the metric availability registry
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from metric_availability import SCOPE_TENANT, MetricAvailabilityRegistry
+
+TYPE = ('cn-hangzhou', 'normal', '4.2.1')
+METRIC = 'io_rt'
+
+
+def write_registry(path, available, age_days):
+    checked_at = (datetime.now() - timedelta(days=age_days)).isoformat(timespec='seconds')
+    key = MetricAvailabilityRegistry.key(*TYPE, METRIC, SCOPE_TENANT)
+    path.write_text(json.dumps({'metrics': {key: {'available': available, 'checked_at': checked_at, 'reason': None}}}))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / 'metric_availability.json'
+
+
+def should_query(registry):
+    return registry.should_query(*TYPE, METRIC, SCOPE_TENANT)
+
+
+def test_unknown_metric_queried(path):
+    assert should_query(MetricAvailabilityRegistry(str(path)))
+
+
+def test_unavailable_within_ttl_skipped(path):
+    write_registry(path, available=False, age_days=1)
+    registry = MetricAvailabilityRegistry(str(path), ttl_days=7)
+
+    assert not should_query(registry)
+    assert registry.summary()['skipped'] == 1
+    assert should_query(MetricAvailabilityRegistry(str(path), ttl_days=7, refresh=True))
+
+
+def test_decisions_use_state_loaded_at_startup(path):
+    write_registry(path, available=True, age_days=1)
+    registry = MetricAvailabilityRegistry(str(path))
+    # One tenant without data does not hide the metric from the others
+    registry.record(*TYPE, METRIC, SCOPE_TENANT, False)
+
+    assert should_query(registry)
+
+
+def test_expired_record_reprobed_once_per_run(path):
+    write_registry(path, available=False, age_days=10)
+    registry = MetricAvailabilityRegistry(str(path), ttl_days=7)
+
+    assert should_query(registry)
+    # Other instances and tenants of the type skip it while the probe is in flight...
+    assert not should_query(registry)
+    # ...and follow its outcome
+    registry.record(*TYPE, METRIC, SCOPE_TENANT, False, 'InvalidParameter')
+    assert not should_query(registry)
+
+    registry.new_run()
+    assert should_query(registry)
+
+
+def test_expired_record_available_again(path):
+    write_registry(path, available=False, age_days=10)
+    registry = MetricAvailabilityRegistry(str(path), ttl_days=7)
+    assert should_query(registry)
+    registry.record(*TYPE, METRIC, SCOPE_TENANT, True)
+
+    assert should_query(registry)
+    registry.save()
+    assert MetricAvailabilityRegistry(str(path)).unavailable() == {}
+
+
+def test_seeds_skip_until_recorded_and_never_replace_records(path):
+    registry = MetricAvailabilityRegistry(str(path))
+    assert registry.seed_unavailable(*TYPE, METRIC, SCOPE_TENANT, 'unavailable in testing')
+    assert registry.seed_unavailable(*TYPE, 'cache_hit', SCOPE_TENANT, 'unavailable in testing')
+    # Seeded keys keep being skipped for the rest of the run
+    assert registry.seed_unavailable(*TYPE, METRIC, SCOPE_TENANT, 'unavailable in testing')
+
+    # Another process recorded cache_hit as available in the meantime
+    other = MetricAvailabilityRegistry(str(path))
+    other.record(*TYPE, 'cache_hit', SCOPE_TENANT, True)
+    other.save()
+    registry.save()
+
+    reloaded = MetricAvailabilityRegistry(str(path))
+    assert list(reloaded.unavailable()) == [MetricAvailabilityRegistry.key(*TYPE, METRIC, SCOPE_TENANT)]
+    assert not reloaded.seed_unavailable(*TYPE, METRIC, SCOPE_TENANT, 'unavailable in testing')
+    assert not should_query(reloaded)
@@ -0,0 +1,155 @@
+"""
+Tests for the streaming metric statistics (QuantileSketch, MetricStats)
+"""
+import random
+
+import pytest
+
+from metric_stats import MetricStats, QuantileSketch
+
+
+def nearest_rank(values, q):
+    """Percentile as computed by the previous sort-based code"""
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def lognormal_series(count, seed):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(3, 1) for _ in range(count)]
+
+
+@pytest.mark.parametrize('accuracy', [0.01, 0.02, 0.05])
+@pytest.mark.parametrize('q', [0.05, 0.5, 0.95, 0.99])
+def test_sketch_quantiles_within_relative_accuracy(accuracy, q):
+    values = lognormal_series(20000, seed=7)
+    sketch = QuantileSketch(accuracy)
+    for value in values:
+        sketch.add(value)
+
+    rank = min(int(len(values) * q), len(values) - 1)
+    exact = sorted(values)[rank]
+    assert abs(sketch.quantile_at_rank(rank) - exact) <= accuracy * exact
+
+
+def test_sketch_handles_negative_and_zero_values():
+    values = [-50.0, -5.0, 0.0, 0.0, 5.0, 50.0]
+    sketch = QuantileSketch(0.01)
+    for value in values:
+        sketch.add(value)
+
+    for rank, exact in enumerate(values):
+        assert sketch.quantile_at_rank(rank) == pytest.approx(exact, rel=0.01)
+    assert QuantileSketch(0.01).quantile_at_rank(0) is None
+
+
+def test_sketch_merge_equals_single_sketch():
+    values = lognormal_series(5000, seed=3)
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert left.positive == whole.positive
+    with pytest.raises(ValueError):
+        left.merge(QuantileSketch(0.05))
+
+
+def test_sketch_round_trips_through_dict():
+    sketch = QuantileSketch(0.02)
+    for value in [-1.0, 0.0, 2.5, 2.5, 300.0]:
+        sketch.add(value)
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+
+    assert restored.count == sketch.count
+    assert [restored.quantile_at_rank(r) for r in range(5)] == [sketch.quantile_at_rank(r) for r in range(5)]
+
+
+@pytest.mark.parametrize('accuracy', [0, 1, -0.1])
+def test_sketch_rejects_invalid_accuracy(accuracy):
+    with pytest.raises(ValueError):
+        QuantileSketch(accuracy)
+
+
+def test_metric_stats_exact_below_limit():
+    values = lognormal_series(1000, seed=1)
+    stats = MetricStats(exact_limit=1024)
+    stats.update(values)
+
+    assert stats.is_exact
+    assert stats.p95() == nearest_rank(values, 0.95)
+    assert stats.p99() == nearest_rank(values, 0.99)
+    assert stats.mean == pytest.approx(sum(values) / len(values))
+    assert (stats.min, stats.max) == (min(values), max(values))
+
+
+@pytest.mark.parametrize('accuracy', [0.01, 0.05])
+def test_metric_stats_sketched_p95_within_bound(accuracy):
+    values = lognormal_series(50000, seed=11)
+    stats = MetricStats(relative_accuracy=accuracy, exact_limit=1024)
+    stats.update(values)
+
+    assert not stats.is_exact
+    exact = nearest_rank(values, 0.95)
+    assert abs(stats.p95() - exact) <= accuracy * exact
+    # count/min/max/mean stay exact after switching to the sketch
+    assert stats.count == len(values)
+    assert (stats.min, stats.max) == (min(values), max(values))
+    assert stats.mean == pytest.approx(sum(values) / len(values))
+
+
+def test_metric_stats_percentile_clamped_to_range():
+    stats = MetricStats(relative_accuracy=0.05, exact_limit=4)
+    stats.update([10.0] * 100)
+
+    assert stats.p95() == 10.0
+    assert stats.percentile(0.0) == 10.0
+
+
+def test_metric_stats_merge_matches_single_pass():
+    values = lognormal_series(6000, seed=5)
+    whole = MetricStats()
+    whole.update(values)
+    # Pages of a series merged into one accumulator, as across days or tenants
+    merged = MetricStats()
+    for offset in range(0, len(values), 700):
+        page = MetricStats()
+        page.update(values[offset:offset + 700])
+        merged.merge(page)
+
+    assert merged.count == whole.count
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    exact = nearest_rank(values, 0.95)
+    assert abs(merged.p95() - exact) <= merged.relative_accuracy * exact
+
+
+def test_metric_stats_merge_stays_exact_when_small():
+    left, right = MetricStats(), MetricStats()
+    left.update([1.0, 2.0, 3.0])
+    right.update([4.0, 5.0])
+    left.merge(right).merge(MetricStats())
+
+    assert left.is_exact
+    assert left.count == 5
+    assert left.percentile(0.5) == 3.0
+
+
+@pytest.mark.parametrize('count', [10, 5000])
+def test_metric_stats_round_trips_through_dict(count):
+    stats = MetricStats()
+    stats.update(lognormal_series(count, seed=2))
+    restored = MetricStats.from_dict(stats.to_dict())
+
+    assert restored.is_exact == stats.is_exact
+    assert restored.count == stats.count
+    assert restored.p95() == stats.p95()
+
+
+def test_empty_metric_stats():
+    stats = MetricStats()
+
+    assert not stats
+    assert stats.mean is None
+    assert stats.p95() is None
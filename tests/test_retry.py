@@ -0,0 +1,127 @@
+"""
+Tests for API error classification, backoff and the AIMD concurrency limit
+"""
+import socket
+
+import aiohttp
+import pytest
+from Tea.exceptions import RetryError, TeaException, UnretryableException
+
+from retry import (
+    AIMDController, ApiResponseError, PERMANENT, RETRYABLE, RetryPolicy, THROTTLED,
+    classify_error, is_permanent_error
+)
+
+
+def sdk_error(code, status_code=None):
+    """Error as raised by the SDK for an HTTP error response"""
+    data = {'statusCode': status_code} if status_code is not None else None
+    return TeaException({'code': code, 'message': 'test', 'data': data})
+
+
+class StatusError(Exception):
+    """Error carrying its HTTP status in another attribute spelling"""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+@pytest.mark.parametrize('error', [
+    sdk_error('Throttling.User', 400),
+    sdk_error('Throttling', 400),
+    sdk_error('ServiceUnavailable.Throttling', 503),
+    sdk_error('QpsLimitExceeded'),
+    sdk_error('SomeCode', 429),
+    ApiResponseError('TooManyRequests', 'slow down'),
+    StatusError(429),
+])
+def test_throttled_errors(error):
+    assert classify_error(error) == THROTTLED
+
+
+def test_retry_after_means_throttled():
+    error = sdk_error('Busy', 400)
+    error.retry_after = 1000
+    assert classify_error(error) == THROTTLED
+
+
+@pytest.mark.parametrize('error', [
+    sdk_error('InternalError', 500),
+    sdk_error('Unknown', 503),
+    sdk_error('ServiceTimeout', 400),
+    ApiResponseError('ServiceUnavailable', 'try later'),
+    StatusError('502'),
+])
+def test_server_errors_are_retryable(error):
+    assert classify_error(error) == RETRYABLE
+
+
+@pytest.mark.parametrize('error', [
+    RetryError('retry limit reached'),
+    ConnectionResetError('connection reset'),
+    socket.timeout('timed out'),
+    aiohttp.ServerDisconnectedError(),
+    aiohttp.ClientConnectionError('connection refused'),
+])
+def test_network_errors_are_retryable(error):
+    assert classify_error(error) == RETRYABLE
+    assert not is_permanent_error(error)
+
+
+def test_wrapped_network_error_is_retryable():
+    error = UnretryableException(None, ConnectionResetError('connection reset'))
+    assert classify_error(error) == RETRYABLE
+
+
+@pytest.mark.parametrize('error', [
+    sdk_error('InvalidParameter', 400),
+    sdk_error('MetricNotFound', 400),
+    sdk_error('Forbidden.RAM', 403),
+    ApiResponseError('ResourceNotFound', 'no such metric', status_code=200),
+    ValueError('unexpected response'),
+    StatusError('not a number'),
+])
+def test_permanent_errors(error):
+    assert classify_error(error) == PERMANENT
+    assert is_permanent_error(error)
+
+
+def test_backoff_is_capped_full_jitter():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=2.0)
+    for attempt, cap in [(1, 0.5), (2, 1.0), (3, 2.0), (6, 2.0)]:
+        for _ in range(50):
+            assert 0 <= policy.backoff(attempt) <= cap
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.1, max_delay=5.0)
+    error = sdk_error('Throttling.User', 400)
+    error.retry_after = 3000
+    assert 3.0 <= policy.backoff(1, error) <= 5.0
+    error.retry_after = 60000
+    assert policy.backoff(1, error) == 5.0
+
+
+def test_retry_policy_from_config():
+    policy = RetryPolicy.from_config({'max_attempts': 0, 'max_delay': 1.5})
+    assert policy.max_attempts == 1
+    assert policy.max_delay == 1.5
+
+
+def test_aimd_decreases_once_per_cooldown_and_recovers():
+    controller = AIMDController(16, minimum=2, increase=1, decrease=0.5, interval=0, cooldown=60)
+    controller.on_throttle()
+    controller.on_throttle()
+    assert controller.limit == 8
+
+    for _ in range(20):
+        controller.on_success()
+    assert controller.limit == 16
+
+
+def test_aimd_respects_minimum():
+    controller = AIMDController(4, minimum=3, cooldown=0)
+    for _ in range(5):
+        controller.on_throttle()
+    assert controller.limit == 3
@@ -0,0 +1,92 @@
+"""
+Tests for consistent-hash sharding and shard result files
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from sharding import ShardResultWriter, jump_hash, parse_shard_index, read_shard_results, shard_of
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+INSTANCE_IDS = [f'ob{i:012x}' for i in range(2000)]
+
+
+@pytest.mark.parametrize('key, buckets, expected', [
+    # Reference values of other jump hash implementations
+    (1, 1, 0),
+    (42, 57, 43),
+    (0xDEAD10CC, 1, 0),
+    (0xDEAD10CC, 666, 361),
+    (256, 1024, 520),
+])
+def test_jump_hash_reference_values(key, buckets, expected):
+    assert jump_hash(key, buckets) == expected
+
+
+def test_shard_of_pinned_values():
+    # Shards written by earlier versions or other hosts must keep their instances
+    assert [shard_of(instance_id, 8) for instance_id in ['ob000000000000', 'ob000000000001', 'ob4a2y0ciz1s1c']] == [3, 4, 2]
+
+
+def test_shard_of_stable_across_processes():
+    # str hashes are salted per process; shard_of must not depend on them
+    script = f"import sys; sys.path.insert(0, {str(SRC)!r}); from sharding import shard_of; " \
+             f"print([shard_of(i, 7) for i in {INSTANCE_IDS[:50]!r}])"
+    outputs = {
+        subprocess.run([sys.executable, '-c', script], env=dict(os.environ, PYTHONHASHSEED=seed),
+                       capture_output=True, text=True, check=True).stdout
+        for seed in ('1', '2')
+    }
+    assert outputs == {f"{[shard_of(i, 7) for i in INSTANCE_IDS[:50]]}\n"}
+
+
+@pytest.mark.parametrize('buckets', [1, 2, 7, 64])
+def test_jump_hash_in_range(buckets):
+    assert all(0 <= shard_of(instance_id, buckets) < buckets for instance_id in INSTANCE_IDS)
+
+
+def test_growing_shards_moves_keys_only_to_new_shard():
+    for count in range(1, 12):
+        moved = 0
+        for instance_id in INSTANCE_IDS:
+            before, after = shard_of(instance_id, count), shard_of(instance_id, count + 1)
+            if before != after:
+                assert after == count
+                moved += 1
+        # About 1/(N+1) of the instances move
+        assert abs(moved / len(INSTANCE_IDS) - 1 / (count + 1)) < 0.05
+
+
+def test_shards_balanced():
+    counts = Counter(shard_of(instance_id, 8) for instance_id in INSTANCE_IDS)
+    assert len(counts) == 8
+    assert max(counts.values()) - min(counts.values()) < len(INSTANCE_IDS) / 8 * 0.3
+
+
+@pytest.mark.parametrize('value, expected', [('0/1', (0, 1)), ('3/4', (3, 4))])
+def test_parse_shard_index(value, expected):
+    assert parse_shard_index(value) == expected
+
+
+@pytest.mark.parametrize('value', ['1', 'a/b', '4/4', '-1/4', '0/0'])
+def test_parse_shard_index_rejects_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard_index(value)
+
+
+def test_shard_results_round_trip(tmp_path):
+    path = tmp_path / 'shards' / 'daily' / 'shard-0-of-2.jsonl'
+    writer = ShardResultWriter(path)
+    writer.write({'instance_id': 'ob1'}, [{'tenant_id': 't1'}])
+    # Nothing is published until the shard closes
+    assert not path.exists()
+    writer.write({'instance_id': 'ob2'}, [])
+    writer.close()
+
+    assert writer.count == 2
+    assert list(read_shard_results([path])) == [({'instance_id': 'ob1'}, [{'tenant_id': 't1'}]), ({'instance_id': 'ob2'}, [])]